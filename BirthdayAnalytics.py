@@ -0,0 +1,108 @@
+'''
+Аналітика днів народження для всієї книги (NumPy): дні до наступного дня народження, вік,
+кількість днів народження за місяцями та розподіл за віком.
+
+Дати народження один раз переносяться у масив datetime64[D] (один прохід по записах без
+datetime та strptime), далі всі обчислення - векторні операції над масивами.
+29 лютого у невисокосний рік святкується 28 лютого (як RecordBook.birthday_in_year),
+день народження, що вже минув цього року, переноситься на наступний рік.
+'''
+
+import datetime
+from array import array
+
+from ExportFormats import EPOCH_ORDINAL
+
+try:
+    import numpy as np
+except ImportError:         # numpy потрібен лише для аналітики
+    np = None
+
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def is_leap(years):
+    return (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+
+
+# дати днів народження (months, days) у роках years; 29.02 у невисокосний рік -> 28.02
+def birthdays_in_years(months, days, years):
+    days = np.where((months == 2) & (days == 29) & ~is_leap(years), 28, days)
+    month_starts = ((years - 1970) * 12 + months - 1).astype("M8[M]").astype("M8[D]")
+    return month_starts + (days - 1).astype("m8[D]")
+
+
+# стовпці дат народження книги (лише записи з відомою датою)
+class BirthdayColumns():
+    def __init__(self, book) -> None:
+        self.names, ordinals, self.unknown = [], array("q"), 0
+        for record in book.iter_sorted():
+            if record._birthday:
+                self.names.append(record._name)
+                ordinals.append(record._birthday)
+            else: self.unknown += 1
+
+        self.births = (np.frombuffer(ordinals, dtype=np.int64) - EPOCH_ORDINAL).astype("M8[D]")
+        self.years = self.births.astype("M8[Y]").astype(np.int64) + 1970
+        month_starts = self.births.astype("M8[M]")
+        self.months = month_starts.astype(np.int64) % 12 + 1
+        self.days = (self.births - month_starts.astype("M8[D]")).astype(np.int64) + 1
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    # дата today, її рік та дні народження у цьому році
+    def _this_year(self, today):
+        today = np.datetime64(today, "D")
+        year = today.astype("M8[Y]").astype(np.int64) + 1970
+        return today, year, birthdays_in_years(self.months, self.days, year)
+
+    # кількість днів до наступного дня народження (0 - сьогодні)
+    def days_to_birthday(self, today: datetime.date):
+        today, year, this_year = self._this_year(today)
+        upcoming = np.where(this_year < today, birthdays_in_years(self.months, self.days, year + 1), this_year)
+        return (upcoming - today).astype(np.int64)
+
+    # повних років на дату today
+    def ages(self, today: datetime.date):
+        today, year, this_year = self._this_year(today)
+        return year - self.years - (this_year > today)
+
+    # кількість днів народження за місяцями (12 значень)
+    def per_month(self):
+        return np.bincount(self.months - 1, minlength=12)
+
+    # кількість осіб за віковими групами шириною width років: {початок групи: кількість}
+    def age_histogram(self, today: datetime.date, width=10) -> dict:
+        ages = self.ages(today)
+        ages = ages[ages >= 0]                  # дата народження у майбутньому не враховується
+        counts = np.bincount(ages // width)
+        return {group * width: int(count) for group, count in enumerate(counts) if count}
+
+    # count найближчих днів народження: список (днів, ім'я, дата народження)
+    def nearest(self, today: datetime.date, count=10) -> list[tuple]:
+        days = self.days_to_birthday(today)
+        count = min(count, len(days))
+        if not count: return []
+        chosen = np.argpartition(days, count - 1)[:count]
+        chosen = chosen[np.lexsort((chosen, days[chosen]))]
+        return [(int(days[i]), self.names[i], self.births[i].item()) for i in chosen]
+
+
+#-----------------------------------------
+# звіт команди report birthdays: найближчі дні народження, вік, розподіл за місяцями та віком
+#-------------------------------------------
+def birthday_report(book, today: datetime.date = None, top=10) -> str:
+    if np is None: return "The report needs numpy. Run >> pip install numpy"
+    today = today or datetime.date.today()
+    columns = BirthdayColumns(book)
+    if not len(columns): return f"There are no birthdays in the database ({columns.unknown} records without a birthday)"
+
+    ages = columns.ages(today)
+    lines = [f"Records with a birthday: {len(columns)}, without: {columns.unknown}",
+             f"Age: mean {ages.mean():.1f}, median {np.median(ages):.0f}, min {ages.min()}, max {ages.max()}",
+             "Nearest birthdays:"]
+    lines += [f"  {days:>4} days - {name} ({born.strftime('%d.%m.%Y')})" for days, name, born in columns.nearest(today, top)]
+    lines.append("Birthdays per month: " + ", ".join(f"{month} {count}" for month, count in zip(MONTHS, columns.per_month())))
+    lines.append("Age groups: " + ", ".join(f"{start}-{start + 9}: {count}" for start, count in columns.age_histogram(today).items()))
+    return "\n".join(lines)
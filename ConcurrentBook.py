@@ -0,0 +1,233 @@
+'''
+Потокобезпечна AddressBook для вбудовування у багатопотоковий сервіс.
+
+- RWLock: читачі працюють одночасно, записувач - сам; записувач, що чекає, має пріоритет
+  перед новими читачами (читачі не можуть нескінченно відкладати запис).
+- Записи у книзі не змінюються на місці: book[name] повертає копію запису, а зміна копії
+  (add_phone, del_phone, edit_phone, change_birthday) під блокуванням запису застосовується
+  до останньої версії запису, яка заміняє попередню разом з оновленням індексів.
+  Тому складені операції (edit_phone) атомарні, а одночасні зміни одного запису не губляться.
+- Перебір та посторінковий друк працюють із знімком - кортежем записів, створеним при
+  першому переборі після зміни (copy-on-write): перебір не тримає блокування і не заважає записувачам.
+
+Записувач може повторно захоплювати блокування (масові операції upsert_many, delete_many
+викликають add_record та del), інші методи книги не можна викликати зі спостерігача (observers).
+'''
+
+import datetime
+import itertools
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from RecordBook import AddressBook
+
+
+class RWLock():
+    def __init__(self) -> None:
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+        self._owner = None          # потік-записувач, що тримає блокування
+
+    @contextmanager
+    def read(self):
+        if self._owner == threading.get_ident():     # записувач читає під своїм блокуванням
+            yield
+            return
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers: self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        if self._owner == threading.get_ident():     # повторне захоплення тим самим записувачем
+            yield
+            return
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+            self._owner = threading.get_ident()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._owner = None
+                self._condition.notify_all()
+
+
+class ConcurrentAddressBook(AddressBook):
+    def __init__(self, *args, **kwargs):
+        self._lock = RWLock()
+        self._snapshot = None           # кортеж записів у порядку додавання (до наступної зміни)
+        self._sorted_snapshot = None    # кортеж записів в алфавітному порядку (до наступної зміни)
+        super().__init__(*args, **kwargs)
+        self.render_cache.identity = True
+
+    #-----------------------------------------
+    # індекси будуються на окремій книзі-помічнику і публікуються одним присвоєнням,
+    # тому інший читач ніколи не бачить частково побудований індекс
+    #-------------------------------------------
+    @property
+    def phone_index(self) -> dict:
+        if self._phone_index is None:
+            builder = AddressBook()
+            builder.data = self.data
+            self._phone_index = builder.phone_index
+        return self._phone_index
+
+    @property
+    def birthday_index(self) -> dict:
+        if self._birthday_index is None:
+            builder = AddressBook()
+            builder.data = self.data
+            self._birthday_index = builder.birthday_index
+        return self._birthday_index
+
+    # знімок записів у порядку додавання; записи у знімку не змінюються (див. _record_changed)
+    def snapshot(self) -> tuple:
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock.read():
+                snapshot = self._snapshot = tuple(self.data.values())
+        return snapshot
+
+    # знімок записів в алфавітному порядку
+    def sorted_snapshot(self) -> tuple:
+        snapshot = self._sorted_snapshot
+        if snapshot is None:
+            with self._lock.read():
+                data = self.data
+                snapshot = self._sorted_snapshot = tuple(data[name] for name in self.name_index)
+        return snapshot
+
+    def _changed(self):
+        self._snapshot = None
+        self._sorted_snapshot = None
+
+    #-----------------------------------------
+    # запис
+    #-------------------------------------------
+    def add_record(self, record):
+        with self._lock.write():
+            super().add_record(record)
+            self._changed()
+
+    def __delitem__(self, name):
+        with self._lock.write():
+            super().__delitem__(name)
+            self._changed()
+
+    def add_records(self, records):
+        with self._lock.write():
+            super().add_records(records)
+            self._changed()
+
+    # масові операції атомарні: виконуються під одним блокуванням запису
+    def upsert_many(self, records) -> tuple:
+        with self._lock.write():
+            return super().upsert_many(records)
+
+    def delete_many(self, names) -> int:
+        with self._lock.write():
+            return super().delete_many(names)
+
+    #-----------------------------------------
+    # зміна запису: record - копія, отримана через book[name]; зміна застосовується до
+    # останньої версії запису в книзі, нова версія заміняє стару (стара залишається у знімках)
+    #-------------------------------------------
+    def _record_changed(self, event, record, *args):
+        with self._lock.write():
+            current = self.data.get(record._name)
+            if current is None: return                  # запис видалено іншим потоком
+            if current is not record:
+                updated = current.copy()
+                if event == "add_phone": updated.add_phone(args[0])
+                elif event == "del_phone": updated.remove_phones(args[0])
+                elif event == "edit_phone": updated.edit_phone(*args)
+                elif event == "change_birthday":
+                    updated.change_birthday(record.birthday)
+                    args = (current.birthday,)      # з індексу прибирається дата останньої версії
+                if updated._phones == current._phones and updated._birthday == current._birthday: return
+
+                current._book = None
+                updated._book = self
+                self.data[updated._name] = updated
+                record = updated
+            super()._record_changed(event, record, *args)
+            self._changed()
+
+    #-----------------------------------------
+    # читання
+    #-------------------------------------------
+    def __getitem__(self, name):
+        with self._lock.read():
+            record = self.data[name].copy()
+        record._book = self
+        return record
+
+    def __contains__(self, name) -> bool:
+        with self._lock.read():
+            return name in self.data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def find_phone(self, phone):
+        with self._lock.read():
+            return super().find_phone(phone)
+
+    def has_phone(self, name, phone) -> bool:
+        with self._lock.read():
+            return super().has_phone(name, phone)
+
+    def find_duplicates(self, phones, name=None) -> dict:
+        with self._lock.read():
+            return super().find_duplicates(phones, name)
+
+    def search(self, text: str, limit: int = 10) -> list[tuple]:
+        with self._lock.read():
+            return super().search(text, limit)
+
+    def upcoming_birthdays(self, days: int, today=None) -> list:
+        with self._lock.read():
+            return super().upcoming_birthdays(days, today)
+
+    # у кеш потрапляють лише рядки поточних версій записів (не копій з book[name] та не старих версій)
+    def render(self, record, remember=True) -> str:
+        return super().render(record, remember and self.data.get(record._name) is record)
+
+    #-----------------------------------------
+    # перебір - за знімками, без блокування
+    #-------------------------------------------
+    def _iter_records(self, start=0, start_name=None):
+        if start_name is None:
+            return itertools.islice(self.snapshot(), start, None)
+        snapshot = self.sorted_snapshot()
+        position = bisect_left(snapshot, start_name.lower(), key=lambda record: record._name.lower())
+        return itertools.islice(snapshot, position + start, None)
+
+    def iter_sorted(self, key=None):
+        if key is None:
+            return iter(self.snapshot())
+        elif key == "name":
+            return iter(self.sorted_snapshot())
+        elif key == "birthday":
+            def calendar_day(record):
+                born = datetime.date.fromordinal(record._birthday)
+                return born.month, born.day, record._name
+            dated = sorted((record for record in self.snapshot() if record._birthday), key=calendar_day)
+            return itertools.chain(dated, (record for record in self.snapshot() if not record._birthday))
+        else: raise ValueError(f"Unknown sort key {key}")
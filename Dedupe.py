@@ -0,0 +1,235 @@
+'''
+Пошук та об'єднання дублікатів контактів (команда dedupe).
+
+Записи не порівнюються кожен з кожним (O(n²)): спочатку вони розкладаються у блоки за ключами
+    телефон                                 - спільний телефон
+    birthday:<дата>:<фонетичний ключ імені>  - однакова дата та схоже звучання імені
+    name:<ім'я без регістру та символів>     - Alex / alex / Alex-
+    sound:<фонетичний ключ імені>            - Kate / Katie / Катя
+і оцінюються лише пари всередині блоку. Блоки, більші за MAX_BLOCK, пропускаються (надто
+поширений ключ, наприклад ім'я Mike, не відрізняє записи), тому кількість пар і час роботи
+ростуть майже лінійно з розміром книги.
+
+Оцінка пари (0..1): 0.45 * частка спільних телефонів + 0.35 * схожість імен (триграми)
++ 0.2 за однакову дату народження; різні відомі дати народження - мінус 0.3.
+Пара, схожа лише спільним телефоном (імена несхожі - нижче NAME_EVIDENCE, дати не збігаються),
+потрапляє у звіт для ручної перевірки, але не об'єднується: Alex та Oleksandr з одним номером
+можуть бути однією людиною, а Ivan та Olga з одним домашнім номером - різними.
+Інші пари з оцінкою від порогу об'єднуються у групи (union-find). При об'єднанні групи основним
+стає запис з найбільшою кількістю телефонів (далі - з відомою датою, далі - за іменем),
+він отримує телефони та дату народження лише тих записів групи, оцінка яких з основним записом
+досягає порогу (одна слабка пара не приєднує до основного запису не пов'язані з ним записи),
+ці записи видаляються.
+
+Звіт <база даних>.dedupe:
+    pair|<оцінка>|<ім'я>|<ім'я>|<спільні телефони>|<дати народження>
+    review|<оцінка>|<ім'я>|<ім'я>|<спільні телефони>|<дати народження>   - лише спільний телефон
+    merge|<основний запис>|<об'єднані записи>|<телефони>|<дата народження>
+    skip|<основний запис>|<записи групи, не схожі на основний запис>
+'''
+
+import re
+import time
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+
+from RecordBook import Birthday, Phone, ordinal_to_birthday, unpack_phone
+
+# найбільший розмір блоку, пари якого оцінюються
+MAX_BLOCK = 100
+# оцінка, з якої пара записів вважається дублікатом
+THRESHOLD = 0.45
+# схожість імен, нижче якої пара без однакової дати народження схожа лише спільним телефоном
+NAME_EVIDENCE = 0.3
+
+# транслітерація кирилиці для порівняння імен (Олександр -> oleksandr)
+TRANSLIT = str.maketrans({"а": "a", "б": "b", "в": "v", "г": "h", "ґ": "g", "д": "d", "е": "e", "є": "ie", "ж": "zh",
+                          "з": "z", "и": "y", "і": "i", "ї": "i", "й": "i", "к": "k", "л": "l", "м": "m", "н": "n",
+                          "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts",
+                          "ч": "ch", "ш": "sh", "щ": "shch", "ь": "", "ю": "iu", "я": "ia", "ы": "y", "э": "e", "ё": "io"})
+NON_ALNUM = re.compile(r"[^a-z0-9]")
+# класи приголосних Soundex; голосні - "0", h та w не розділяють однакові приголосні
+SOUNDEX = str.maketrans("bfpvcgjkqsxzdtlmnraeiouy", "111122222222334556000000", "hw0123456789")
+
+
+# ім'я для порівняння: нижній регістр, латиниця, лише літери та цифри
+def normalize_name(name) -> str:
+    name = name.lower()
+    if name.isascii() and name.isalnum(): return name          # найчастіший випадок - без перетворень
+    return NON_ALNUM.sub("", name.translate(TRANSLIT))
+
+
+# фонетичний ключ імені (Soundex: перша літера та до трьох класів приголосних)
+# normalized=True - ім'я вже нормалізоване (normalize_name)
+def phonetic_key(name, normalized=False) -> str:
+    letters = (name if normalized else normalize_name(name)).strip("0123456789")
+    if not letters: return ""
+    key, previous = letters[0], letters[0].translate(SOUNDEX)
+    for code in letters[1:].translate(SOUNDEX):
+        if code != previous and code != "0": key += code
+        previous = code
+    return key[:4]
+
+
+# триграми нормалізованого імені (кешуються: запис блоку порівнюється з кожним іншим записом блоку)
+@lru_cache(maxsize=1 << 16)
+def name_trigrams(name) -> frozenset:
+    text = f"  {normalize_name(name)} "
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+# схожість імен 0..1 (коефіцієнт Жаккара за триграмами)
+def name_similarity(first, second) -> float:
+    first, second = name_trigrams(first), name_trigrams(second)
+    return len(first & second) / len(first | second)
+
+
+# оцінка схожості двох записів 0..1
+def score_pair(first, second) -> float:
+    phones_first, phones_second = set(first._phones) - {0}, set(second._phones) - {0}
+    shared = len(phones_first & phones_second)
+    score = 0.45 * (shared / min(len(phones_first), len(phones_second)) if shared else 0.0)
+    score += 0.35 * name_similarity(first._name, second._name)
+    if first._birthday and second._birthday: score += 0.2 if first._birthday == second._birthday else -0.3
+    return score
+
+
+# пара схожа лише спільним телефоном: імена несхожі, дати народження не збігаються (ручна перевірка)
+def phone_only_pair(first, second) -> bool:
+    if first._birthday and first._birthday == second._birthday: return False
+    return name_similarity(first._name, second._name) < NAME_EVIDENCE
+
+
+# ключі блоків запису: телефон - упаковане число, інші ключі - рядки з префіксом виду ключа
+def block_keys(record):
+    keys = [packed for packed in set(record._phones) if packed]
+    name = normalize_name(record._name)
+    sound = phonetic_key(name, normalized=True)
+    if record._birthday: keys.append(f"birthday:{record._birthday}:{sound}")
+    keys.append(f"name:{name}")
+    if sound: keys.append(f"sound:{sound}")
+    return keys
+
+
+#-----------------------------------------
+# кандидати у дублікати: множина пар номерів записів з однакових блоків розміром до max_block
+# повертає (пари, кількість пропущених великих блоків)
+# блок з одного запису зберігається номером запису, список створюється для другого запису
+#-------------------------------------------
+def candidate_pairs(records, max_block=MAX_BLOCK) -> tuple:
+    blocks = {}
+    for i, record in enumerate(records):
+        for key in block_keys(record):
+            members = blocks.get(key)
+            if members is None: blocks[key] = i
+            elif members.__class__ is int: blocks[key] = [members, i]
+            else: members.append(i)
+
+    pairs, skipped = set(), 0
+    for members in blocks.values():
+        if members.__class__ is int: continue
+        if len(members) > max_block:
+            skipped += 1
+            continue
+        for position, i in enumerate(members):
+            for j in members[position + 1:]:
+                pairs.add((i, j))
+    return pairs, skipped
+
+
+# групи дублікатів (списки номерів записів) із пар дублікатів (union-find)
+def duplicate_groups(pairs, size) -> list[list]:
+    parent = list(range(size))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in pairs:
+        parent[root(i)] = root(j)
+    groups = defaultdict(list)
+    for i in {index for pair in pairs for index in pair}:
+        groups[root(i)].append(i)
+    return [sorted(group) for group in groups.values()]
+
+
+# основний запис групи: найбільше телефонів, далі - відома дата народження, далі - за іменем
+def primary_record(records):
+    return min(records, key=lambda record: (-len(record._phones), not record._birthday, record._name))
+
+
+#-----------------------------------------
+# об'єднує записи групи в основний: телефони (без повторів, спочатку основного запису),
+# дата народження основного запису або перша відома дата інших; інші записи видаляються.
+# Зміни проходять через методи книги та Record, тому індекси та журнал оновлюються.
+# повертає (основний запис, імена об'єднаних записів)
+#-------------------------------------------
+def merge_group(book, names) -> tuple:
+    records = [book[name] for name in names]
+    primary = primary_record(records)
+    others = [record for record in records if record is not primary]
+
+    phones = list(dict.fromkeys(list(primary._phones) + [packed for record in others for packed in record._phones if packed]))
+    birthday = primary._birthday or next((record._birthday for record in others if record._birthday), 0)
+
+    book.delete_many([record._name for record in others])
+    if phones != list(primary._phones): primary.replace_phones([Phone.trusted(unpack_phone(packed)) for packed in phones])
+    if birthday != primary._birthday: primary.change_birthday(Birthday.trusted(ordinal_to_birthday(birthday)))
+    return primary, [record._name for record in others]
+
+
+def phones_text(packed_phones) -> str:
+    return ", ".join(unpack_phone(packed) for packed in packed_phones)
+
+
+#-----------------------------------------
+# пошук дублікатів у книзі, звіт у report_path; merge=True - групи об'єднуються
+#-------------------------------------------
+def dedupe(book, report_path, threshold=THRESHOLD, merge=False, max_block=MAX_BLOCK) -> str:
+    started = time.perf_counter()
+    records = list(book.iter_sorted())
+    candidates, skipped = candidate_pairs(records, max_block)
+
+    # пари впорядковані за першим записом, тому його триграми беруться з кешу
+    scored = [(score_pair(records[i], records[j]), i, j) for i, j in sorted(candidates)]
+    found = sorted((item for item in scored if item[0] >= threshold), key=lambda item: -item[0])
+    duplicates, review = [], []
+    for item in found:
+        (review if phone_only_pair(records[item[1]], records[item[2]]) else duplicates).append(item)
+    groups = duplicate_groups([(i, j) for _, i, j in duplicates], len(records))
+    merged_count = merged_groups = 0
+
+    with open(report_path, "w", encoding="utf-8") as f_report:
+        f_report.write(f"# threshold {threshold}, {len(records)} records, {len(candidates)} candidate pairs, "
+                       f"{len(duplicates)} duplicate pairs, {len(review)} pairs to review, {len(groups)} groups, "
+                       f"{skipped} blocks over {max_block} skipped\n")
+        for kind, items in (("pair", duplicates), ("review", review)):
+            for score, i, j in items:
+                first, second = records[i], records[j]
+                second_phones = set(second._phones)
+                shared = [packed for packed in first._phones if packed and packed in second_phones]
+                f_report.write(f"{kind}|{score:.2f}|{first._name}|{second._name}|{phones_text(shared)}|"
+                               f"{ordinal_to_birthday(first._birthday)} / {ordinal_to_birthday(second._birthday)}\n")
+        if merge:
+            for group in groups:
+                members = [records[i] for i in group]
+                primary = primary_record(members)
+                similar = [record._name for record in members if record is not primary and
+                           score_pair(primary, record) >= threshold and not phone_only_pair(primary, record)]
+                distant = [record._name for record in members if record is not primary and record._name not in similar]
+                if distant: f_report.write(f"skip|{primary._name}|{', '.join(distant)}\n")
+                if not similar: continue
+                primary, merged = merge_group(book, [primary._name] + similar)
+                merged_count, merged_groups = merged_count + len(merged), merged_groups + 1
+                f_report.write(f"merge|{primary._name}|{', '.join(merged)}|{phones_text(primary._phones)}|"
+                               f"{ordinal_to_birthday(primary._birthday)}\n")
+
+    elapsed = time.perf_counter() - started
+    result = (f"Found {len(duplicates)} duplicate pairs in {len(groups)} groups "
+              f"({len(candidates)} candidate pairs checked in {elapsed:.2f} s), the report is written to {Path(report_path)}")
+    if review: result += f"\n{len(review)} pairs share only a phone - check them in the report (review), they aren't merged"
+    if merge: result += f"\n{merged_count} records were merged into {merged_groups} - [bold green]success[/bold green]"
+    return result
@@ -0,0 +1,234 @@
+'''
+Експорт та імпорт AddressBook у форматах для аналітики (вибір за розширенням файлу):
+
+*.jsonl - JSON Lines, один запис у рядку:
+    {"name": "Lisa", "birthday": "15.08.1984", "phones": ["+44345345345", "+380954448899"]}
+    невідома дата та невірний телефон - null (а не рядки "None" / "Error phone")
+
+*.npz   - стовпцевий формат NumPy (np.load(path) повертає масиви), потрібен numpy:
+    names         uint8         - імена в UTF-8 підряд
+    name_offsets  uint64 n + 1  - зміщення імен у names
+    birthdays     datetime64[D] - дати народження (NaT - невідома)
+    phone_counts  uint16        - кількість телефонів запису
+    phones        uint64        - упаковані телефони всіх записів підряд (380501113330, 0 - невірний)
+
+Запис і читання - конвеєр генераторів блоками по chunk_records записів: книга не копіюється,
+а пам'ять обмежена розміром блоку. Стовпці *.npz пишуться у zip потоково, кожен окремим
+проходом по записах (заголовок .npy містить розмір стовпця, тому спочатку рахуються розміри).
+'''
+
+import json
+import os
+import time
+import zipfile
+from array import array
+from pathlib import Path
+
+from PhoneRules import normalizer
+from RecordBook import (LOAD_CHUNK_SIZE, Record, birthday_to_ordinal, normalize_birthday, ordinal_to_birthday,
+                        pack_phone, write_records)
+
+try:
+    import numpy as np
+except ImportError:         # numpy потрібен лише для формату *.npz
+    np = None
+
+JSONL_SUFFIXES = (".jsonl",)
+NPZ_SUFFIXES = (".npz",)
+
+# datetime64[D] рахує дні від 01.01.1970, NaT - найменше int64
+EPOCH_ORDINAL = 719163          # datetime.date(1970, 1, 1).toordinal()
+NAT = -2**63
+
+# стовпці *.npz: назва -> (typecode масиву array, dtype numpy)
+NPZ_COLUMNS = {"names": ("B", "u1"), "name_offsets": ("Q", "u8"), "birthdays": ("q", "M8[D]"),
+               "phone_counts": ("H", "u2"), "phones": ("Q", "u8")}
+
+
+def is_jsonl_path(path) -> bool:
+    return Path(path).suffix.lower() in JSONL_SUFFIXES
+
+
+def is_npz_path(path) -> bool:
+    return Path(path).suffix.lower() in NPZ_SUFFIXES
+
+
+# чи є файл файлом експорту (за розширенням)
+def is_export_path(path) -> bool:
+    return is_jsonl_path(path) or is_npz_path(path)
+
+
+# повідомлення, якщо для формату файлу не встановлено залежність, інакше None
+def missing_dependency(path):
+    if is_npz_path(path) and np is None: return "The *.npz format needs numpy. Run >> pip install numpy"
+    return None
+
+
+#-----------------------------------------
+# JSON Lines
+#-------------------------------------------
+def jsonl_line(record) -> str:
+    birthday = f'"{ordinal_to_birthday(record._birthday)}"' if record._birthday else "null"
+    phones = ", ".join(f'"+{packed}"' if packed else "null" for packed in record._phones)
+    return f'{{"name": {json.dumps(record._name, ensure_ascii=False)}, "birthday": {birthday}, "phones": [{phones}]}}'
+
+
+# розбір блоку рядків JSON Lines у записи; trusted=True - файл записала книга (без перевірки значень)
+def parse_jsonl(lines, trusted=False) -> list[Record]:
+    records = []
+    make_record, normalize_many = Record.packed, normalizer.normalize_many
+
+    for line in lines:
+        if not line.strip(): continue
+        item = json.loads(line)
+        if not isinstance(item, dict): raise ValueError(f"A JSON Lines row must be an object: {line.strip()[:80]}")
+        birthday, phones = item.get("birthday"), item.get("phones") or []
+        if not isinstance(phones, list): raise ValueError(f"The phones must be a list: {line.strip()[:80]}")
+
+        if trusted:
+            phones = array("Q", [int(phone[1:]) if phone else 0 for phone in phones])
+        else:
+            birthday = normalize_birthday(str(birthday)) if birthday else None
+            phones = array("Q", [pack_phone(phone) for phone in normalize_many([str(phone or "") for phone in phones], cache=False)])
+        records.append(make_record(str(item["name"]), birthday_to_ordinal(birthday), phones))
+    return records
+
+
+def read_jsonl(path, trusted=False, chunk_size=LOAD_CHUNK_SIZE):
+    with open(path, "r", encoding="utf-8", buffering=chunk_size) as f_read:
+        while True:
+            lines = f_read.readlines(chunk_size)
+            if not lines: break
+            yield parse_jsonl(lines, trusted)
+
+
+def write_jsonl(records, path, chunk_records=10_000) -> int:
+    with open(path, "w", encoding="utf-8") as f_out:
+        count = write_records(records, f_out.write, chunk_records, line=jsonl_line)
+        f_out.flush()
+        os.fsync(f_out.fileno())
+    return count
+
+
+#-----------------------------------------
+# стовпці *.npz: блоки значень стовпця для записів records (генератор масивів array)
+#-------------------------------------------
+def column_chunks(records, column, chunk_records=10_000):
+    typecode = NPZ_COLUMNS[column][0]
+    chunk, offset, count = array(typecode), 0, 0
+    if column == "name_offsets": chunk.append(0)
+
+    for record in records:
+        if column == "names": chunk.frombytes(record._name.encode("utf-8"))
+        elif column == "name_offsets":
+            offset += len(record._name.encode("utf-8"))
+            chunk.append(offset)
+        elif column == "birthdays": chunk.append(record._birthday - EPOCH_ORDINAL if record._birthday else NAT)
+        elif column == "phone_counts": chunk.append(len(record._phones))
+        else: chunk.extend(record._phones)
+
+        count += 1
+        if count >= chunk_records:
+            yield chunk
+            chunk, count = array(typecode), 0
+    if chunk: yield chunk
+
+
+def write_npz(records_factory, path, chunk_records=10_000) -> int:
+    # перший прохід - розміри стовпців для заголовків .npy
+    count = heap = phones = 0
+    for record in records_factory():
+        count += 1
+        heap += len(record._name.encode("utf-8"))
+        phones += len(record._phones)
+    sizes = {"names": heap, "name_offsets": count + 1, "birthdays": count, "phone_counts": count, "phones": phones}
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for column, (_, dtype) in NPZ_COLUMNS.items():
+            with archive.open(f"{column}.npy", "w", force_zip64=True) as f_out:
+                np.lib.format.write_array_header_1_0(f_out, {"descr": np.dtype(dtype).str, "fortran_order": False,
+                                                             "shape": (sizes[column],)})
+                for chunk in column_chunks(records_factory(), column, chunk_records):
+                    f_out.write(chunk.tobytes())
+    return count
+
+
+# стовпець *.npy у архіві, що читається блоками у масиви array
+class NpyColumn():
+    def __init__(self, archive, column) -> None:
+        self.typecode, self.expected = NPZ_COLUMNS[column][0], np.dtype(NPZ_COLUMNS[column][1])
+        self._file = archive.open(f"{column}.npy")
+        version = np.lib.format.read_magic(self._file)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran_order, self.dtype = read_header(self._file)
+        if len(shape) != 1 or self.dtype.kind != self.expected.kind:
+            raise ValueError(f"{column}.npy isn't a column of an address book")
+        self.size = shape[0]
+
+    def read(self, count) -> array:
+        data = self._file.read(count * self.dtype.itemsize)
+        # інший порядок байтів або розмір елемента (файл записано не книгою) - перетворення через numpy
+        if self.dtype != self.expected: data = np.frombuffer(data, self.dtype).astype(self.expected).tobytes()
+        return array(self.typecode, data)
+
+    def close(self):
+        self._file.close()
+
+
+def read_npz(path, chunk_records=100_000):
+    with zipfile.ZipFile(path, "r") as archive:
+        columns = {column: NpyColumn(archive, column) for column in NPZ_COLUMNS}
+        try:
+            count, make_record = columns["birthdays"].size, Record.packed
+            start = columns["name_offsets"].read(1)[0]
+            for position in range(0, count, chunk_records):
+                size = min(chunk_records, count - position)
+                offsets, birthdays = columns["name_offsets"].read(size), columns["birthdays"].read(size)
+                counts = columns["phone_counts"].read(size)
+                heap = columns["names"].read(offsets[-1] - start).tobytes()
+                phones = columns["phones"].read(sum(counts)).tobytes()
+
+                records, name_at, phone_at = [], start, 0
+                for end, birthday, phones_count in zip(offsets, birthdays, counts):
+                    name = heap[name_at - start:end - start].decode("utf-8")
+                    ordinal = birthday + EPOCH_ORDINAL if birthday != NAT else 0
+                    records.append(make_record(name, ordinal, array("Q", phones[8 * phone_at:8 * (phone_at + phones_count)])))
+                    name_at, phone_at = end, phone_at + phones_count
+                start = offsets[-1]
+                yield records
+        finally:
+            for column in columns.values(): column.close()
+
+
+#-----------------------------------------
+# експорт записів книги у файл path (*.jsonl або *.npz) через тимчасовий файл, як save_database
+#-------------------------------------------
+def export_book(book, path, chunk_records=10_000) -> str:
+    started = time.perf_counter()
+    tmp_path = f"{path}.tmp"
+    if is_npz_path(path): count = write_npz(book.iter_sorted, tmp_path, chunk_records)
+    else: count = write_jsonl(book.iter_sorted(), tmp_path, chunk_records)
+    os.replace(tmp_path, path)
+
+    elapsed = time.perf_counter() - started
+    return f"The database is exported to {path} = {count} records ({count / elapsed if elapsed else 0:.0f} records/s)"
+
+
+#-----------------------------------------
+# імпорт записів з файлу path (*.jsonl або *.npz) у книгу блоками (add_records)
+# progress(count, seconds) - як у load_database
+#-------------------------------------------
+def import_book(book, path, trusted=False, progress=None, progress_every=100_000) -> str:
+    started = time.perf_counter()
+    count, next_report = 0, progress_every
+
+    chunks = read_npz(path) if is_npz_path(path) else read_jsonl(path, trusted)
+    for records in chunks:
+        book.add_records(records)
+        count += len(records)
+        if progress and count >= next_report:
+            progress(count, time.perf_counter() - started)
+            next_report = count + progress_every
+
+    elapsed = time.perf_counter() - started
+    return f"The database has been loaded from {path} = {count} records ({count / elapsed if elapsed else 0:.0f} records/s)"
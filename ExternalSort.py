@@ -0,0 +1,179 @@
+'''
+Злиття та порівняння файлів бази даних (формат Name|Birthday|phone, phone), більших за пам'ять,
+без завантаження у AddressBook (команди merge та diff).
+
+Зовнішнє сортування за іменем: файл читається блоками, розмір яких обмежено memory_mb,
+кожен блок сортується у пам'яті та записується у тимчасовий файл (run); далі runs зливаються
+k-шляховим злиттям через купу (heapq.merge), тому пам'ять не залежить від розміру файлів,
+а час - O(n log n). Якщо runs більше за MAX_FANIN, вони спочатку зливаються групами.
+
+Рядки з однаковим іменем (з різних файлів або з одного) об'єднуються у один контакт:
+телефони - без повторів у порядку файлів, дата народження - перша відома (у порядку файлів);
+інші відомі дати записуються у звіт як конфлікти.
+'''
+
+import heapq
+import itertools
+import os
+import tempfile
+import time
+from pathlib import Path
+
+# пам'ять (МБ) для сортування одного блоку рядків
+MEMORY_MB = 64
+# найбільша кількість runs, що зливаються одночасно (відкритих файлів)
+MAX_FANIN = 64
+# оцінка пам'яті на один рядок у блоці понад його довжину (об'єкт str та елемент списку)
+LINE_OVERHEAD = 100
+
+
+# ключ сортування рядка - ім'я
+def line_name(line) -> str:
+    return line.partition("|")[0]
+
+
+#-----------------------------------------
+# ділить файл path на відсортовані за іменем runs у каталозі run_dir
+# повертає (шляхи runs, кількість пропущених рядків без трьох полів)
+#-------------------------------------------
+def sort_runs(path, run_dir, memory_mb=MEMORY_MB) -> tuple:
+    budget, runs, skipped = memory_mb * 2**20, [], 0
+    chunk, size = [], 0
+    with open(path, "r", encoding="utf-8") as f_read:
+        for line in f_read:
+            line = line.rstrip("\n")
+            if line.count("|") < 2:
+                if line.strip(): skipped += 1
+                continue
+            chunk.append(line)
+            size += len(line) + LINE_OVERHEAD
+            if size >= budget:
+                runs.append(write_run(chunk, run_dir))
+                chunk, size = [], 0
+    if chunk: runs.append(write_run(chunk, run_dir))
+    return runs, skipped
+
+
+# сортує рядки за іменем (стабільно - порядок рядків з однаковим іменем зберігається) та записує run
+def write_run(lines, run_dir) -> str:
+    lines.sort(key=line_name)
+    handle, path = tempfile.mkstemp(suffix=".run", dir=run_dir)
+    with os.fdopen(handle, "w", encoding="utf-8") as f_out:
+        f_out.writelines(line + "\n" for line in lines)
+    return path
+
+
+#-----------------------------------------
+# k-шляхове злиття відсортованих runs у потік рядків, відсортований за іменем;
+# рядки з однаковим іменем ідуть у порядку runs (heapq.merge стабільний)
+#-------------------------------------------
+def merge_runs(runs, run_dir):
+    while len(runs) > MAX_FANIN:                # злиття групами, щоб не відкривати забагато файлів
+        merged = []
+        for start in range(0, len(runs), MAX_FANIN):
+            group = runs[start:start + MAX_FANIN]
+            handle, path = tempfile.mkstemp(suffix=".run", dir=run_dir)
+            with os.fdopen(handle, "w", encoding="utf-8") as f_out:
+                f_out.writelines(line + "\n" for line in merge_runs(group, run_dir))
+            for run in group: os.remove(run)
+            merged.append(path)
+        runs = merged
+
+    files = [open(run, "r", encoding="utf-8") for run in runs]
+    try:
+        yield from heapq.merge(*[(line.rstrip("\n") for line in f_read) for f_read in files], key=line_name)
+    finally:
+        for f_read in files: f_read.close()
+
+
+# контакти потоку рядків, відсортованого за іменем: (ім'я, дата народження, телефони, конфліктні дати)
+def contacts(lines):
+    for name, group in itertools.groupby(lines, key=line_name):
+        birthday, phones, conflicts = "None", {}, []
+        for line in group:
+            _, line_birthday, line_phones = line.split("|", 2)
+            if line_birthday != "None":
+                if birthday == "None": birthday = line_birthday
+                elif line_birthday != birthday and line_birthday not in conflicts: conflicts.append(line_birthday)
+            for phone in line_phones.split(", "):
+                phone = phone.strip()
+                if phone: phones[phone] = None
+        yield name, birthday, list(phones), conflicts
+
+
+# потік контактів файлу path, відсортованих за іменем (runs - у run_dir)
+def sorted_contacts(path, run_dir, memory_mb=MEMORY_MB) -> tuple:
+    runs, skipped = sort_runs(path, run_dir, memory_mb)
+    return contacts(merge_runs(runs, run_dir)), skipped
+
+
+def contact_line(name, birthday, phones) -> str:
+    return f"{name}|{birthday}|{', '.join(phones)}"
+
+
+#-----------------------------------------
+# об'єднує файли sources у файл target (через тимчасовий файл);
+# конфлікти дат народження - у звіт <target>.merge:  birthday|<ім'я>|<залишена дата>|<інші дати>
+#-------------------------------------------
+def merge_files(sources, target, memory_mb=MEMORY_MB) -> str:
+    started = time.perf_counter()
+    target = Path(target)
+    count = conflicted = skipped = 0
+
+    with tempfile.TemporaryDirectory(prefix="hw_merge_") as run_dir:
+        runs = []
+        for source in sources:                  # runs у порядку файлів - дані першого файлу мають пріоритет
+            source_runs, source_skipped = sort_runs(source, run_dir, memory_mb)
+            runs += source_runs
+            skipped += source_skipped
+
+        tmp_path = f"{target}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f_out, \
+             open(target.with_name(target.name + ".merge"), "w", encoding="utf-8") as f_report:
+            for name, birthday, phones, conflicts in contacts(merge_runs(runs, run_dir)):
+                f_out.write(contact_line(name, birthday, phones) + "\n")
+                count += 1
+                if conflicts:
+                    conflicted += 1
+                    f_report.write(f"birthday|{name}|{birthday}|{', '.join(conflicts)}\n")
+        os.replace(tmp_path, target)
+
+    elapsed = time.perf_counter() - started
+    return (f"{len(sources)} files were merged into {target} = {count} contacts in {elapsed:.2f} s, "
+            f"{conflicted} birthday conflicts, {skipped} lines skipped")
+
+
+#-----------------------------------------
+# порівнює файли old та new, звіт у report (контакти в алфавітному порядку):
+#   + Name|Birthday|phones                       - доданий контакт
+#   - Name|Birthday|phones                       - видалений контакт
+#   ~ Name|Birthday|phones -> Name|Birthday|phones  - змінена дата народження або набір телефонів
+#-------------------------------------------
+def diff_files(old, new, report, memory_mb=MEMORY_MB) -> str:
+    started = time.perf_counter()
+    added = removed = changed = 0
+    missing = (None, None, None, None)
+
+    with tempfile.TemporaryDirectory(prefix="hw_diff_") as run_dir, open(report, "w", encoding="utf-8") as f_report:
+        old_contacts, old_skipped = sorted_contacts(old, run_dir, memory_mb)
+        new_contacts, new_skipped = sorted_contacts(new, run_dir, memory_mb)
+        old_item, new_item = next(old_contacts, missing), next(new_contacts, missing)
+
+        while old_item[0] is not None or new_item[0] is not None:
+            if new_item[0] is None or (old_item[0] is not None and old_item[0] < new_item[0]):
+                f_report.write(f"- {contact_line(*old_item[:3])}\n")
+                removed += 1
+                old_item = next(old_contacts, missing)
+            elif old_item[0] is None or new_item[0] < old_item[0]:
+                f_report.write(f"+ {contact_line(*new_item[:3])}\n")
+                added += 1
+                new_item = next(new_contacts, missing)
+            else:
+                if old_item[1] != new_item[1] or set(old_item[2]) != set(new_item[2]):
+                    f_report.write(f"~ {contact_line(*old_item[:3])} -> {contact_line(*new_item[:3])}\n")
+                    changed += 1
+                old_item, new_item = next(old_contacts, missing), next(new_contacts, missing)
+
+    elapsed = time.perf_counter() - started
+    return (f"{added} added, {removed} removed, {changed} changed ({elapsed:.2f} s, "
+            f"{old_skipped + new_skipped} lines skipped), the report is written to {report}")
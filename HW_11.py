@@ -1,495 +1,1143 @@
-'''
-Вимоги здачі ДЗ #11:
-- AddressBook реализует метод iterator, который возвращает генератор по записям AddressBook и за одну итерацию возвращает представление для N записей.
-- Класс Record принимает ещё один дополнительный (опциональный) аргумент класса Birthday
-- Класс Record реализует метод days_to_birthday, который возвращает количество дней до следующего дня рождения контакта, если день рождения задан.
-- setter и getter логику для атрибутов value наследников Field.
-- Проверку на корректность веденного номера телефона в setter для value класса Phone.
-- Проверку на корректность веденного дня рождения в setter для value класса Birthday.
-'''
-
-
-
-from pathlib import Path
-import os
-import platform  # для clearscrean()
-from RecordBook import AddressBook, Record, Name, Phone, Field, Birthday
-import re
-import datetime
-
-from rich import print
-
-
-#-----------------------------------------
-# формат збереження даних у файлі:
-#
-# Lisa|None|+44345345345, +89777111222, +99222333
-# Alex|02.05.1974|+380954448899, +450342233     
-#-------------------------------------------
-path = Path("D:\Git\HW_09\database_09.csv")
-book = AddressBook()
-
-
-# Головна функція роботи CLI(Command Line Interface - консольного скрипту)  
-def main():
-    cmd = ""
-    clear_screen("")
-    print("[bold white]CLI version 11.0[/bold white]")  
-    print("[white]Run >> [/white] [bold red]help[/bold red] - list of the commands")
-    
-    # головний цикл обробки команд користувача
-    while True:
-        # 1. Отримаємо команду від користувача
-        cmd = input(">> ")    
-        
-        # 2. Виконуємо розбір командної строки
-        cmd, prm = parcer_commands(cmd)
-        
-        # 3. Отримуємо handler_functions тобто ДІЮ
-        if cmd: handler = get_handler(cmd)
-        else: 
-            print("Command was not recognized")
-            continue
-            
-        # 4. Визначемо параметри для handler() 
-        #    та виконаємо Команду користувача
-        if run_handler(handler, cmd, prm) == "Good bye!":
-            print("Good bye!")
-            break
-        
-        
-# Декоратор для Обробки командної строки
-def input_error(func):
-    def inner(handler, cmd, prm):
-        try:
-            result = func(handler, cmd, prm)
-            if not result == "Good bye!": print(result) 
-            else: return result
-        
-        # Обробка виключних ситуацій
-        except FileNotFoundError:    # Файл бази даних Відсутній
-            print("The database isn't found")
-        except ValueError:
-            print("Incorect data or unsupported format while writing to the file")
-        except KeyError:
-            print("Record isn't in the database")
-    return inner
-
-
-# Декоратор для Додавання нової людини у базу
-def dec_func_add_rec(func):
-    def inner(prm):
-        return func(prm)
-    return inner
-
-
-# Декоратор для Друкування всієї бази даних
-def dec_func_all_phone(func):
-    def inner(_):
-        return func(_)
-    return inner
-
-
-# Декоратор для Внесення змін у базу даних
-def dec_func_change_phone(func):
-    def inner(prm):
-        return func(prm)
-    return inner
-
-
-# Декоратор для Завершення роботи      
-def dec_func_exit(func):
-    def inner(_):
-        return func(_)  
-    return inner
-
-
-# Декоратор для команди Вітання      
-def dec_func_greeting(func):
-    def inner(_):
-        return func(_)
-    return inner
- 
-
-# Декоратор для Знайденя телефону за Ім'ям особи
-def dec_func_phone(func):
-    def inner(prm):
-        return func(prm)
-    return inner
- 
-
- # Декоратор для Завантаження бази даних із файлу
-def dec_load_phoneDB(func):
-    def inner(_):
-        return book.load_database(book, path)
-    return inner
-
-
-# Декоратор для Збереження бази даних у файл
-def dec_save_phoneDB(func):
-    def inner(_):
-        return book.save_database(book, path)   
-    return inner 
-
-
-# Декоратор для друкування книги по N сторінок
-def dec_func_book_pages(func):
-    def inner(prm):
-        return func(prm)
-    return inner
- 
- 
-# Функція викликає оброботчик команд
-@input_error 
-def run_handler(handler, cmd, prm):
-
-    if cmd in ["add", "phone", "add phone", "del phone", "change phone", "show book", "change birthday", "birthday"]:
-        result = handler(prm)
-    elif cmd in ["close", "exit", "good bye"]:
-        result = handler("")
-    elif cmd in ["save", "load"]:
-        result = handler(path)            
-    elif cmd in ["show all", "hello", "cls", "help"]:
-        result = handler("")
-    return result
-     
-     
-# Повертає адресу функції, що обробляє команду користувача
-def get_handler(operator):
-    return OPERATIONS[operator]    
-
-
-#=========================================================
-# >> add ...  DONE
-# По этой команде бот сохраняет в памяти (в словаре например) новый контакт. 
-# Вместо ... пользователь вводит ИМЯ и НОМЕР телефона, обязательно через пробел.
-# example >> add Mike 02.10.1990 +380504995876
-#         >> add Mike None +380504995876
-#         >> add Mike None None
-#=========================================================
-@dec_func_add_rec
-def func_add_rec(prm):
-    
-    # порахуємо кількість параметрів
-    count_prm = get_count_prm(prm)
-        
-    if prm and (count_prm >= 3):
-        # Якщо ключ (ІМ'Я) що користувач хоче ДОДАТИ не ІСНУЄ тобто можемо додавати
-        if not prm.partition(" ")[0].capitalize() in book.keys():
-            new_name = Name(prm.partition(" ")[0].capitalize())
-            prm = prm.removeprefix(f"{new_name.value} ")
-            
-            new_birthday = Birthday(prm.partition(" ")[0])
-            # формуємо список телефонів
-            lst_phones = list(map(lambda phone: Phone(phone.strip()), prm.partition(" ")[2].split(",")))
-            rec = Record(name=new_name, birthday=new_birthday, phones=lst_phones)
-            book.add_record(rec)
-            
-            return "1 record was successfully added"
-        else: return "The person is already in database"  # Повернемо помилку -> "Неможливо дадати існуючу людину"
-    else:
-        return f"Expected 3 arguments, but {count_prm} was given.\nHer's an example >> add Mike 02.10.1990 +380504995876"
-     
-     
-#=========================================================
-# >> show all         Done
-# По этой команде бот выводит все сохраненные контакты 
-# с номерами телефонов в консоль. 
-#=========================================================
-@dec_func_all_phone
-def func_all_phone(_)->str:
-    result = ""
-    result = "\n".join([f"{n}|{record.birthday.value}|{', '.join(map(lambda phone: phone.value, record.phones))}" for n, record in book.data.items()])
-        
-    if result == "": return "The database is empty"
-    else: return result
-    
-
-#=========================================================
-# >> show book /N
-# Команда "show book" друкує книгу контактів по N записів
-# де N - це кількість записів на одній сторінці
-#=========================================================
-@dec_func_book_pages
-def func_book_pages(prm):
-    # Итерируемся по адресной книге и выводим представление для каждой записи
-    n = int(re.sub("\D", "", prm))
-    for batch in book._record_generator(N=n):
-        print("="*40)
-        for record in batch:
-            print("\n".join([f"{record.name.value}|{record.birthday.value}|{', '.join(map(lambda phone: phone.value, record.phones))}"]))
-        print("="*40)    
-        print("Press [bold red]Enter [/bold red]", end="")
-        input("to continue next page...")
-    return f"End of the book" 
-
-
-#=========================================================
-# >> change phone... Done
-# По этой команде бот сохраняет в памяти новый номер телефона 
-# для существующего контакта. 
-# Вместо [...] пользователь вводит [Ім'я] [старий Номер телефона] [Новий номер], 
-# Увага: обязательно через пробел!!!
-# >> change phone Mike +38099 +38050777
-#=========================================================
-@dec_func_change_phone  
-def func_change_phone(prm):
-    # порахуємо кількість параметрів
-    count_prm = get_count_prm(prm)
-    if prm and (count_prm >= 3):
-        name = prm.partition(" ")[0].lower().capitalize()
-            
-        if name in book.keys():
-            lst = prm.split()
-            
-            # перевіремо наявність телефону що будемо замінювати у базі даних
-            number_exists = any(phone.value == lst[1] for phone in book[name].phones)
-            if number_exists:
-                return book[name].edit_phone(Phone(lst[1]), Phone(lst[2]))
-            else:
-                return f"The phone {lst[1]} for {name} isn't in the database"
-        else:
-            return f"The record {name} wasn't found in the database"
-    else: 
-        return f"Expected 3 arguments, but {count_prm} was given.\nHer's an example >> change phone Mike +0449587612 +380995437856"
-
-
-#=========================================================
-# >> "good bye", "close", "exit"
-# По любой из этих команд бот завершает свою роботу 
-# после того, как выведет в консоль "Good bye!".
-#=========================================================
-@dec_func_exit
-def func_exit(_):
-    return "Good bye!"
-
-
-#=========================================================
-# >> hello
-# Отвечает в консоль "How can I help you?"
-#=========================================================
-@dec_func_greeting
-def func_greeting(_):
-    return "How can I help you?"
-
-
-#=========================================================
-# >> phone ... Done
-# По этой команде бот выводит в консоль номер телефона для указанного контакта.
-# Вместо ... пользователь вводит Имя контакта, чей номер нужно показать.
-# >> phone Ben
-#=========================================================
-@dec_func_phone
-def func_phone(prm):
-    prm = prm.split(" ")
-    if prm[0] == "": return f'Missed "Name" of the person'
-    name = prm[0].lower().capitalize()
-    if name in book.keys():   
-        if prm: return ", ".join([phone.value for phone in book[name].phones])
-        else: return f"Expected 1 argument, but 0 was given.\nHer's an example >> phone Name"
-    else:
-        return f"The {name} isn't in the database"  
-    
-
-#=========================================================
-# >> add phone    Done
-# функція розширює новіми телефонами існуючий запис особи Mike   
-# >> add phone Mike +380509998877, +380732225566
-#=========================================================
-def func_add_phone(prm):
-    # порахуємо кількість параметрів
-    count_prm = get_count_prm(prm)
-    
-    prm = prm.split(" ")
-    if prm[0] == "": return f'Missed "Name" of the person'
-    
-    if prm and (count_prm >= 2):
-        name = prm[0].lower().capitalize()
-        if name in book.keys():   
-            prm.remove(prm[0])  
-            # приберемо коми із телефонів
-            lst_add_phones = list(map(lambda phone: Phone(re.sub(",", "", phone)), prm))
-            return book[name].add_phone(lst_add_phones)  # викликаємо Метод класу 
-        else:
-            return f"The {name} isn't in a database"
-    else: return f"Expected 2 arguments, but {count_prm} was given.\nHer's an example >> add phone Mike +380509998877"
-
-
-#=========================================================
-# >> change birthday    Done
-# функція змінює день народження для особи    
-# Example >> change birthday Mike 12.05.1990
-#=========================================================
-def func_change_birthday(prm):
-    # порахуємо кількість параметрів
-    count_prm = get_count_prm(prm)
-    prm = prm.split(" ")
-    if prm[0] == "": return f'Missed "Birthday" of the person'
-    
-    if prm and (count_prm >= 2):
-        name = prm[0].lower().capitalize()
-        if name in book.keys():
-            date = prm[1]
-            return book[name].change_birthday(Birthday(date))
-        else: return f"The {name} isn't in a database"
-    else: return f"Expected 2 arguments, but {count_prm} was given.\nHer's an example >> change birthday Mike 12.05.1990"
-
-
-#=========================================================
-# >> birthday    Done
-# функція повертає кількість днів до Дня Народження особи    
-# Example >> birthday Mike
-#=========================================================
-def func_get_day_birthday(prm):
-    # порахуємо кількість параметрів
-    count_prm = get_count_prm(prm)
-    prm = prm.split(" ")
-    if prm[0] == "": return f'Missed "Name" of the person'
-        
-    if prm and (count_prm >= 1):
-        name = prm[0].lower().capitalize()
-        if name in book.keys():
-            return book[name].days_to_birthday(datetime.datetime.now()) 
-        else: return f"The {name} isn't in a database"
-    else: return f"Expected 1 arguments, but {count_prm} was given.\nHer's an example >> birthday Mike"
-
-
-#=========================================================
-# >> del phone    Done
-# функція видаляє телефон або список телефонів в існуючому записі особи Mike   
-# >> del phone Mike +380509998877, +380732225566
-#=========================================================    
-def func_del_phone(prm):
-    # порахуємо кількість параметрів
-    count_prm = get_count_prm(prm)
-    
-    prm = prm.split(" ")
-    if prm[0] == "": return f'Missed "Name" of the person'
-    
-    if prm and (count_prm >= 2):
-        name = prm[0].lower().capitalize()
-        if name in book.keys():
-            prm.remove(prm[0])  
-            
-            # перевіремо наявність телефону що будемо видаляти із бази даних
-            number_exists = any(phone.value == prm[0] for phone in book[name].phones)
-            if number_exists:
-                # приберемо коми із телефонів
-                # формуємо список  об'єктів Phone, тому що на майбутнє хочу реалізувати видалення декількох телефонів 
-                lst_del_phones = list(map(lambda phone: Phone(re.sub(",", "", phone)), prm)) 
-                return book[name].del_phone(lst_del_phones[0])
-            else:
-                return f"The phone {prm[0]} isn't in the database"
-            
-        else:
-            return f"The name {name} isn't in database."
-    else: return f"Expected 2 arguments, but {count_prm} was given.\nHer's an example >> del phone Mike +380509998877"
-
-
-#=========================================================
-# Функція читає базу даних з файлу - ОК
-#========================================================= 
-@dec_load_phoneDB
-def load_phoneDB(path):
-    return book.load_database(book, path)
-
-
-#=========================================================
-# Функція виконує збереження бази даних у файл *.csv - OK
-#========================================================= 
-@dec_save_phoneDB
-def save_phoneDB(path):
-    return book.save_database(book, path)
-    
-    
-#=========================================================
-# Функція виконує парсер команд та відповідних параметрів
-#=========================================================
-def parcer_commands(cmd_line):
-    lst, tmp, cmd, prm  = [[], [], "", ""]
-    
-    if cmd_line:
-        tmp = cmd_line.split()
-        
-        # перевіремо ПОДВІЙНУ команду
-        if len(tmp) > 1 and f"{tmp[0]} {tmp[1]}".lower() in COMMANDS:
-            cmd = f"{tmp[0]} {tmp[1]}".lower()
-            prm = cmd_line.partition(cmd)[2].strip()
-            
-        # перевіремо ОДИНАРНУ команду
-        elif tmp[0].lower() in COMMANDS:
-            cmd = tmp[0].lower()
-            prm = cmd_line.partition(" ")[2]
-    return cmd, prm
-
-
-def func_help(_):
-    return """[bold red]cls[/bold red] - очищення екрану від інформації
-[bold red]hello[/bold red] - вітання
-[bold red]good bye, close, exit[/bold red] - завершення програми
-[bold red]load[/bold red] - завантаження інформації про користувачів із файлу
-[bold red]save[/bold red] - збереження інформації про користувачів у файл
-[bold red]show all[/bold red] - друкування всієї наявної інформації про користувачів
-[bold red]show book /N[/bold red]  - друкування інформації посторінково, де [bold red]N[/bold red] - кількість записів на 1 сторінку
-[bold red]add[/bold red] - додавання користувача до бази даних. 
-      example >> [bold blue]add Mike 02.10.1990 +380504995876[/bold blue]
-              >> [bold blue]add Mike None +380504995876[/bold blue]
-              >> [bold blue]add Mike None None[/bold blue]
-[bold red]phone[/bold red] - повертає перелік телефонів для особи
-      example >> [bold blue]phone Mike[/bold blue]
-[bold red]add phone[/bold red] - додавання телефону для користувача
-      example >> [bold blue]add phone Mike +380504995876[/bold blue]
-[bold red]change phone[/bold red] - зміна номеру телефону для користувача
-      Формат запису телефону: [bold green]+38ХХХ ХХХ ХХ ХХ[/bold green]
-      example >> [bold blue]change phone Mike +380504995876 +380665554433[/bold blue]
-[bold red]del phone[/bold red] - видаляє телефон для особи
-      example >> [bold blue]del phone Mike +380509998877, +380732225566[/bold blue]
-[bold red]birthday[/bold red] - повертає кількість днів до Дня народження
-      example >> [bold blue]birthday Mike[/bold blue]
-[bold red]change birthday[/bold red] - змінює/додає Дату народження для особи
-      example >> [bold blue]change birthday Mike 02.03.1990[/bold blue]
-"""
-    
-
-def clear_screen(_):
-    os_name = platform.system().lower()
-    
-    if os_name == 'windows':
-        os.system('cls')
-    elif os_name == 'linux' or os_name == 'darwin':
-        os.system('clear')
-    return ""
-
-
-# Рахує та повертає кількість параметрів
-def get_count_prm(prm: list):
-    if len(prm) > 0: 
-        count_prm = prm.count(" ", 0, -1) + 1
-    else: count_prm = 0
-    return count_prm
-
-
-COMMANDS = ["good bye", "close", "exit",
-            "hello", "add", "phone", "show all", "save", "load", 
-            "cls", "add phone", "del phone", "change phone", "show book",
-            "change birthday", "birthday", "help"]
-
-OPERATIONS = {"good bye": func_exit, "close": func_exit, "exit": func_exit,
-              "hello": func_greeting, 
-              "add": func_add_rec,
-              "phone": func_phone, 
-              "show all": func_all_phone,
-              "save": save_phoneDB,
-              "load": load_phoneDB,
-              "cls": clear_screen,
-              "add phone": func_add_phone,
-              "del phone": func_del_phone,              
-              "change phone": func_change_phone,
-              "show book": func_book_pages,
-              "change birthday": func_change_birthday,
-              "birthday": func_get_day_birthday,
-              "help": func_help}
-
-if __name__ == "__main__":
-    main()
+'''
+Вимоги здачі ДЗ #11:
+- AddressBook реализует метод iterator, который возвращает генератор по записям AddressBook и за одну итерацию возвращает представление для N записей.
+- Класс Record принимает ещё один дополнительный (опциональный) аргумент класса Birthday
+- Класс Record реализует метод days_to_birthday, который возвращает количество дней до следующего дня рождения контакта, если день рождения задан.
+- setter и getter логику для атрибутов value наследников Field.
+- Проверку на корректность веденного номера телефона в setter для value класса Phone.
+- Проверку на корректность веденного дня рождения в setter для value класса Birthday.
+'''
+
+
+
+from pathlib import Path
+import os
+import platform  # для clearscrean()
+import argparse
+import builtins
+import itertools
+import sys
+import threading
+import time
+from RecordBook import AddressBook, Record, Name, Phone, Birthday, is_valid_phone, write_records
+from Journal import Journal
+from History import History
+from Reminders import BirthdayScheduler, FileSink, StdoutSink
+from ParallelImport import import_parallel
+from PhoneRules import normalizer
+from SQLiteStorage import SQLiteAddressBook, is_sqlite_path
+from Snapshot import SnapshotAddressBook, is_snapshot_path
+from BirthdayAnalytics import birthday_report
+from Dedupe import THRESHOLD, dedupe
+from ExternalSort import MEMORY_MB, diff_files, merge_files
+from ExportFormats import export_book, import_book, is_export_path, missing_dependency
+from Server import BookServer, run_server
+from ConcurrentBook import ConcurrentAddressBook
+from Metrics import Metrics, Profiler
+import re
+import datetime
+
+from rich import print
+
+
+#-----------------------------------------
+# формат збереження даних у файлі:
+#
+# Lisa|None|+44345345345, +89777111222, +99222333
+# Alex|02.05.1974|+380954448899, +450342233     
+#-------------------------------------------
+path = Path("D:\Git\HW_09\database_09.csv")
+book = AddressBook()
+journal = None      # журнал змін (write-ahead log), вмикається командою "journal on"
+SEARCH_LIMIT = 10   # максимальна кількість результатів команди search
+STREAM_CHUNK = 1000 # кількість записів в одному блоці потокового друку (show all)
+INTERACTIVE = True  # False у пакетному режимі: без очищення екрану, rich-форматування та пауз між сторінками
+FAILED = "Failed"   # результат команди, що завершилася помилкою
+MARKUP = re.compile(r"\[/?[a-z ]+\]")   # розмітка rich, наприклад [bold red]...[/bold red]
+metrics = Metrics()     # статистика команд (команда stats)
+profiler = Profiler()   # профілювання обробників (команда profile on/off)
+history = History()     # версії книги для команд undo, redo, checkpoint, history
+reminders = None        # планувальник нагадувань про дні народження, вмикається командою "remind on"
+book_lock = threading.RLock()   # команди запису змінюють книгу під цим блокуванням, потік нагадувань читає її під ним же
+
+
+# Головна функція роботи CLI(Command Line Interface - консольного скрипту)  
+def main():
+    cmd = ""
+    clear_screen("")
+    print("[bold white]CLI version 11.0[/bold white]")  
+    print("[white]Run >> [/white] [bold red]help[/bold red] - list of the commands")
+    
+    # головний цикл обробки команд користувача
+    while True:
+        # 1. Отримаємо команду від користувача
+        cmd = input(">> ")    
+        
+        # 2. Виконуємо розбір командної строки
+        cmd, prm = parcer_commands(cmd)
+        
+        # 3. Отримуємо handler_functions тобто ДІЮ
+        if cmd: handler = get_handler(cmd)
+        else: 
+            print("Command was not recognized")
+            continue
+            
+        # 4. Визначемо параметри для handler() 
+        #    та виконаємо Команду користувача
+        if run_handler(handler, cmd, prm) == "Good bye!":
+            print("Good bye!")
+            break
+
+
+#=========================================================
+# Пакетний режим: виконує команди з файлу (або stdin, якщо "-")
+# >> python HW_11.py --batch cmds.txt
+# - порожні рядки та рядки, що починаються з "#", пропускаються;
+# - помилка в команді друкується з номером рядка і не зупиняє виконання;
+# - команди "save" не виконуються одразу: база зберігається один раз наприкінці.
+#=========================================================
+def run_batch(lines) -> str:
+    global INTERACTIVE, print
+    INTERACTIVE, print = False, plain_print
+    
+    count, errors, save_requested = 0, 0, False
+    started = time.perf_counter()
+    
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"): continue
+        count += 1
+        
+        cmd, prm = parcer_commands(line)
+        if not cmd:
+            errors += 1
+            print(f"line {number}: Command was not recognized - {line}")
+            continue
+        if cmd == "save" and not prm.strip():      # збереження бази - один раз наприкінці (експорт - одразу)
+            save_requested = True
+            continue
+        
+        # помилки обробника (як у input_error) друкуються з номером рядка
+        try:
+            result = call_handler(get_handler(cmd), cmd, prm)
+            if result is not None and result != "Good bye!": print(result)
+        except (OSError, ValueError, KeyError) as error:
+            result = FAILED
+            print(f"line {number}: {error_message(error)} - {line}")
+        except Exception as error:
+            result = FAILED
+            print(f"line {number}: {type(error).__name__} {error} - {line}")
+        if result == FAILED: errors += 1
+        elif result == "Good bye!": break
+    
+    if save_requested and run_handler(get_handler("save"), "save", "") == FAILED: errors += 1
+    elapsed = time.perf_counter() - started
+    return f"{count} commands in {elapsed:.2f} s ({count / elapsed if elapsed else 0:.0f} commands/s), {errors} errors"
+
+
+# Друк без rich-форматування (пакетний режим)
+def plain_print(*values, **kwargs):
+    builtins.print(*[MARKUP.sub("", str(value)) for value in values], **kwargs)
+        
+        
+# Декоратор для Обробки командної строки
+def input_error(func):
+    def inner(handler, cmd, prm):
+        try:
+            result = func(handler, cmd, prm)
+            if result is None: return      # результат вже надруковано потоком (show all)
+            if not result == "Good bye!": print(result) 
+            return result
+        
+        # Обробка виключних ситуацій
+        except (OSError, ValueError, KeyError) as error:
+            print(error_message(error))
+        return FAILED
+    return inner
+
+
+# Повідомлення про виключну ситуацію в обробнику команди
+def error_message(error) -> str:
+    if isinstance(error, FileNotFoundError): return "The database isn't found"    # Файл бази даних Відсутній
+    if isinstance(error, OSError): return f"The file can't be written or read: {error.strerror} - {error.filename}"   # каталог, немає прав, ...
+    if isinstance(error, ValueError): return "Incorect data or unsupported format while writing to the file"
+    return "Record isn't in the database"
+
+
+# Функція викликає оброботчик команд
+@input_error 
+def run_handler(handler, cmd, prm):
+    return call_handler(handler, cmd, prm)
+
+
+# Визначає параметри для handler() та викликає його
+# (єдина точка, через яку проходять всі команди: статистика, профілювання та версії книги)
+def call_handler(handler, cmd, prm):
+    if cmd == "save": argument = prm.strip() or path
+    elif cmd in NO_PRM_COMMANDS: argument = ""
+    else: argument = prm
+    
+    if cmd in WRITE_COMMANDS:
+        with book_lock:
+            return run_command(handler, cmd, prm, argument)
+    return run_command(handler, cmd, prm, argument)
+
+
+# Виконує обробник команди зі статистикою та профілюванням
+def run_command(handler, cmd, prm, argument):
+    started, error = time.perf_counter(), None
+    try:
+        if profiler.enabled and cmd != "profile": return profiler.run(handler, argument)
+        return handler(argument)
+    except Exception as exception:
+        error = exception
+        raise
+    finally:
+        metrics.record(cmd, time.perf_counter() - started, error)
+        if cmd in WRITE_COMMANDS: after_write(cmd, prm)
+
+
+# Фіксує зміни книги командою cmd як версію історії (undo скасовує команду цілком);
+# після масового завантаження (load, import, migrate) записи додаються без спостерігачів,
+# тому історія починається заново, а нагадування плануються заново
+def after_write(cmd, prm):
+    if cmd in BULK_COMMANDS:
+        history.reset()
+        if reminders: reminders.reschedule()
+    elif cmd not in HISTORY_COMMANDS: history.commit(f"{cmd} {prm}".strip())
+     
+     
+# Повертає адресу функції, що обробляє команду користувача
+def get_handler(operator):
+    return OPERATIONS[operator]    
+
+
+#=========================================================
+# >> add ...  DONE
+# По этой команде бот сохраняет в памяти (в словаре например) новый контакт. 
+# Вместо ... пользователь вводит ИМЯ и НОМЕР телефона, обязательно через пробел.
+# example >> add Mike 02.10.1990 +380504995876
+#         >> add Mike None +380504995876
+#         >> add Mike None None
+# декілька записів - через ";" (додаються одним пакетом, AddressBook.upsert_many)
+#         >> add Mike 02.10.1990 +380504995876; Ann None +380671112233, +380501112233
+#=========================================================
+def func_add_rec(prm):
+    parts = [part.strip() for part in prm.split(";") if part.strip()] or [""]
+    if len(parts) == 1:
+        record = parse_new_record(parts[0], {}, {})
+        if isinstance(record, str): return record
+        book.add_record(record)
+        return "1 record was successfully added"
+    
+    batch, claimed, errors = {}, {}, []
+    for part in parts:
+        record = parse_new_record(part, batch, claimed)
+        if isinstance(record, str):
+            errors.append(f"{part.partition(' ')[0]}: {record}")
+            continue
+        batch[record.name.value] = record
+        claimed.update((phone.value, record.name.value) for phone in record.phones)
+    book.upsert_many(batch.values())
+    return "\n".join(errors + [f"{len(batch)} records were successfully added"])
+
+
+# Розбирає "Name Birthday phone, phone" у новий запис або повертає повідомлення про помилку
+# batch, claimed - записи та їх телефони, вже прийняті в цьому ж пакеті команди add
+def parse_new_record(prm, batch: dict, claimed: dict):
+    # порахуємо кількість параметрів
+    count_prm = get_count_prm(prm)
+    if not (prm and (count_prm >= 3)):
+        return f"Expected 3 arguments, but {count_prm} was given.\nHer's an example >> add Mike 02.10.1990 +380504995876"
+    
+    # Якщо ключ (ІМ'Я) що користувач хоче ДОДАТИ ІСНУЄ - повернемо помилку "Неможливо дадати існуючу людину"
+    name, _, prm = prm.partition(" ")
+    new_name = Name(name.capitalize())
+    if new_name.value in book.keys() or new_name.value in batch: return "The person is already in database"
+    
+    new_birthday = Birthday(prm.partition(" ")[0])
+    # формуємо список телефонів
+    lst_phones = list(map(lambda phone: Phone(phone.strip()), prm.partition(" ")[2].split(",")))
+    duplicates = book.find_duplicates(lst_phones, new_name.value)
+    for phone in lst_phones:
+        if phone.value in claimed: duplicates.setdefault(phone.value, []).append(claimed[phone.value])
+    if duplicates: return format_duplicates(duplicates)
+    return Record(name=new_name, birthday=new_birthday, phones=lst_phones)
+     
+     
+#=========================================================
+# >> show all         Done
+# По этой команде бот выводит все сохраненные контакты 
+# с номерами телефонов в консоль. 
+# Записи друкуються потоком блоками по STREAM_CHUNK записів, тому пам'ять не залежить від розміру книги
+# >> show all sort name        - в алфавітному порядку
+# >> show all sort birthday    - в календарному порядку днів народження
+# >> show all > contacts.txt   - у файл замість консолі
+#=========================================================
+def func_all_phone(prm):
+    prm, _, target = prm.partition(">")
+    prm, target = prm.split(), target.strip()
+    sort_key = prm[1].lower() if len(prm) == 2 and prm[0].lower() == "sort" else None
+    if prm and not sort_key: return f"Unknown parameters.\nHer's an example >> show all sort name > contacts.txt"
+    
+    if len(book) == 0: return "The database is empty"
+    records = book.iter_sorted(sort_key)
+    
+    # рядки записів - з кешу друку; книга, більша за кеш, друкується повз кеш (не витісняє з нього рядки)
+    remember = len(book) <= book.render_cache.maxsize
+    render = lambda record: book.render(record, remember)
+    
+    if target:
+        with open(target, "w") as f_out:
+            count = write_records(records, f_out.write, STREAM_CHUNK, line=render)
+        return f"{count} records were written to {target}"
+    
+    # у термінал - через rich, інакше (перенаправлений вивід) - без форматування
+    if sys.stdout.isatty(): write_records(records, lambda text: print(text, end=""), STREAM_CHUNK, line=render)
+    else: write_records(records, sys.stdout.write, STREAM_CHUNK, line=render)
+    sys.stdout.flush()
+    
+
+#=========================================================
+# >> show book /N
+# Команда "show book" друкує книгу контактів по N записів
+# де N - це кількість записів на одній сторінці
+# >> show book /N from Name - друкує книгу в алфавітному порядку, починаючи з Name
+#=========================================================
+def func_book_pages(prm):
+    pages = book_pages(prm)
+    if isinstance(pages, str): return pages
+    
+    # Итерируемся по адресной книге и выводим представление для каждой записи
+    for batch in pages:
+        print(format_page(batch))
+        if INTERACTIVE: print("Press [bold red]Enter [/bold red]", end="")
+        if INTERACTIVE and input("to continue next page or q to stop...").strip().lower() == "q": break
+    return f"End of the book" 
+
+
+# Генератор сторінок для "show book /N from Name" або повідомлення про невірні параметри
+def book_pages(prm):
+    size, _, start_name = prm.partition("from")
+    size = re.sub("\D", "", size)
+    if not size: return f"Expected number of records on a page.\nHer's an example >> show book /10 from Mike"
+    start_name = start_name.strip().capitalize() or None
+    if start_name is None: return book._record_generator(N=int(size))
+    return sorted_pages(int(size), start_name)
+
+
+#-----------------------------------------
+# сторінки в алфавітному порядку, починаючи з name: кожна сторінка шукається заново
+# за іменем останнього показаного запису (O(log n + N)), тому зміни книги між сторінками
+# (інші клієнти сервера) не збивають посторінковий друк
+#-------------------------------------------
+def sorted_pages(size, name):
+    shown = None
+    while batch := [record for record in itertools.islice(book._iter_records(start_name=name), size + 1) if record._name != shown][:size]:
+        yield batch
+        name = shown = batch[-1]._name
+
+
+# Представлення однієї сторінки книги
+def format_page(batch) -> str:
+    page = "\n".join(map(book.render, batch))
+    return "="*40 + "\n" + page + "\n" + "="*40
+
+
+#=========================================================
+# >> change phone... Done
+# По этой команде бот сохраняет в памяти новый номер телефона 
+# для существующего контакта. 
+# Вместо [...] пользователь вводит [Ім'я] [старий Номер телефона] [Новий номер], 
+# Увага: обязательно через пробел!!!
+# >> change phone Mike +38099 +38050777
+#=========================================================
+def func_change_phone(prm):
+    # порахуємо кількість параметрів
+    count_prm = get_count_prm(prm)
+    if prm and (count_prm >= 3):
+        name = prm.partition(" ")[0].lower().capitalize()
+            
+        if name in book.keys():
+            lst = prm.split()
+            
+            # перевіремо наявність телефону що будемо замінювати у базі даних
+            old_phone, new_phone = Phone(lst[1]), Phone(lst[2])
+            if book.has_phone(name, old_phone):
+                duplicates = book.find_duplicates([new_phone], name)
+                if duplicates: return format_duplicates(duplicates)
+                return book[name].edit_phone(old_phone, new_phone)
+            else:
+                return f"The phone {lst[1]} for {name} isn't in the database"
+        else:
+            return f"The record {name} wasn't found in the database"
+    else: 
+        return f"Expected 3 arguments, but {count_prm} was given.\nHer's an example >> change phone Mike +0449587612 +380995437856"
+
+
+#=========================================================
+# >> "good bye", "close", "exit"
+# По любой из этих команд бот завершает свою роботу 
+# после того, как выведет в консоль "Good bye!".
+#=========================================================
+def func_exit(_):
+    if isinstance(book, SQLiteAddressBook): book.commit()   # незафіксовані зміни SQLite не губляться
+    return "Good bye!"
+
+
+#=========================================================
+# >> hello
+# Отвечает в консоль "How can I help you?"
+#=========================================================
+def func_greeting(_):
+    return "How can I help you?"
+
+
+#=========================================================
+# >> phone ... Done
+# По этой команде бот выводит в консоль номер телефона для указанного контакта.
+# Вместо ... пользователь вводит Имя контакта, чей номер нужно показать.
+# >> phone Ben
+#=========================================================
+def func_phone(prm):
+    prm = prm.split(" ")
+    if prm[0] == "": return f'Missed "Name" of the person'
+    name = prm[0].lower().capitalize()
+    if name in book.keys():   
+        if prm: return book.render(book[name]).rpartition("|")[2]
+        else: return f"Expected 1 argument, but 0 was given.\nHer's an example >> phone Name"
+    else:
+        return f"The {name} isn't in the database"  
+    
+
+#=========================================================
+# >> add phone    Done
+# функція розширює новіми телефонами існуючий запис особи Mike   
+# >> add phone Mike +380509998877, +380732225566
+#=========================================================
+def func_add_phone(prm):
+    # порахуємо кількість параметрів
+    count_prm = get_count_prm(prm)
+    
+    prm = prm.split(" ")
+    if prm[0] == "": return f'Missed "Name" of the person'
+    
+    if prm and (count_prm >= 2):
+        name = prm[0].lower().capitalize()
+        if name in book.keys():   
+            prm.remove(prm[0])  
+            # приберемо коми із телефонів та нормалізуємо їх одним пакетом
+            lst_add_phones = [Phone.trusted(phone) for phone in normalizer.normalize_many([raw.replace(",", "") for raw in prm])]
+            duplicates = book.find_duplicates(lst_add_phones, name)
+            if duplicates: return format_duplicates(duplicates)
+            return book[name].add_phone(lst_add_phones)  # викликаємо Метод класу 
+        else:
+            return f"The {name} isn't in a database"
+    else: return f"Expected 2 arguments, but {count_prm} was given.\nHer's an example >> add phone Mike +380509998877"
+
+
+#=========================================================
+# >> change birthday    Done
+# функція змінює день народження для особи    
+# Example >> change birthday Mike 12.05.1990
+#=========================================================
+def func_change_birthday(prm):
+    # порахуємо кількість параметрів
+    count_prm = get_count_prm(prm)
+    prm = prm.split(" ")
+    if prm[0] == "": return f'Missed "Birthday" of the person'
+    
+    if prm and (count_prm >= 2):
+        name = prm[0].lower().capitalize()
+        if name in book.keys():
+            date = prm[1]
+            return book[name].change_birthday(Birthday(date))
+        else: return f"The {name} isn't in a database"
+    else: return f"Expected 2 arguments, but {count_prm} was given.\nHer's an example >> change birthday Mike 12.05.1990"
+
+
+#=========================================================
+# >> birthday    Done
+# функція повертає кількість днів до Дня Народження особи    
+# Example >> birthday Mike
+#=========================================================
+def func_get_day_birthday(prm):
+    # порахуємо кількість параметрів
+    count_prm = get_count_prm(prm)
+    prm = prm.split(" ")
+    if prm[0] == "": return f'Missed "Name" of the person'
+        
+    if prm and (count_prm >= 1):
+        name = prm[0].lower().capitalize()
+        if name in book.keys():
+            return book[name].days_to_birthday(datetime.datetime.now()) 
+        else: return f"The {name} isn't in a database"
+    else: return f"Expected 1 arguments, but {count_prm} was given.\nHer's an example >> birthday Mike"
+
+
+#=========================================================
+# >> birthdays N
+# функція повертає всіх, у кого День Народження в найближчі N днів (включно з сьогодні)
+# Example >> birthdays 7
+#=========================================================
+def func_upcoming_birthdays(prm):
+    prm = prm.strip()
+    if not prm.isdigit(): return f"Expected number of days.\nHer's an example >> birthdays 7"
+    
+    upcoming = book.upcoming_birthdays(int(prm))
+    if upcoming:
+        return "\n".join([f"{date.strftime('%d.%m.%Y')} - {book.render(record)}" for date, record in upcoming])
+    else: return f"There are no birthdays in the next {prm} days"
+
+
+#=========================================================
+# >> report birthdays N
+# звіт за всією книгою (NumPy): N найближчих днів народження (за замовчуванням 10),
+# середній вік, кількість днів народження за місяцями та за віковими групами
+# Example >> report birthdays 5
+#=========================================================
+def func_report_birthdays(prm):
+    prm = prm.strip()
+    if prm and not prm.isdigit(): return f"Expected number of the nearest birthdays.\nHer's an example >> report birthdays 5"
+    return birthday_report(book, top=int(prm) if prm else 10)
+
+
+#=========================================================
+# >> del phone    Done
+# функція видаляє телефон або список телефонів в існуючому записі особи Mike   
+# >> del phone Mike +380509998877, +380732225566
+#=========================================================    
+def func_del_phone(prm):
+    # порахуємо кількість параметрів
+    count_prm = get_count_prm(prm)
+    
+    prm = prm.split(" ")
+    if prm[0] == "": return f'Missed "Name" of the person'
+    
+    if prm and (count_prm >= 2):
+        name = prm[0].lower().capitalize()
+        if name in book.keys():
+            # приберемо коми із телефонів та перевіремо наявність кожного телефону у записі
+            raw_phones = [raw for raw in (re.sub(",", "", phone) for phone in prm[1:]) if raw]
+            lst_del_phones, missing = [], []
+            for raw in raw_phones:
+                phone = Phone(raw)
+                if book.has_phone(name, phone): lst_del_phones.append(phone)
+                else: missing.append(f"The phone {raw} isn't in the database")
+            
+            # всі телефони видаляються за один прохід
+            if lst_del_phones: missing.append(book[name].remove_phones(lst_del_phones))
+            return "\n".join(missing)
+        else:
+            return f"The name {name} isn't in database."
+    else: return f"Expected 2 arguments, but {count_prm} was given.\nHer's an example >> del phone Mike +380509998877"
+
+
+#=========================================================
+# >> find phone
+# функція повертає власника (власників) телефону за зворотним індексом
+# Example >> find phone +380501113330
+#=========================================================
+def func_find_phone(prm):
+    prm = prm.strip()
+    if prm == "": return f"Expected 1 argument, but 0 was given.\nHer's an example >> find phone +380501113330"
+    
+    phone = Phone(prm)
+    if not is_valid_phone(phone.value): return f"The phone {prm} has an incorrect format"
+    
+    records = book.find_phone(phone)
+    if records:
+        return "\n".join(map(book.render, records))
+    else: return f"The phone {phone.value} isn't in the database"
+
+
+#=========================================================
+# >> search
+# пошук за префіксом імені, частиною номера телефону та з помилками в імені (до 2 символів)
+# Example >> search ol
+#         >> search 50111
+#         >> search Lias
+#=========================================================
+def func_search(prm):
+    prm = prm.strip()
+    if prm == "": return f"Expected 1 argument, but 0 was given.\nHer's an example >> search Mi"
+    
+    results = book.search(prm, limit=SEARCH_LIMIT)
+    if results:
+        return "\n".join([f"{book.render(record)}  ({kind})" for kind, record in results])
+    else: return f"Nothing was found for {prm}"
+
+
+# Формує повідомлення про телефони, що вже належать іншим особам
+def format_duplicates(duplicates: dict) -> str:
+    return "\n".join([f"The phone {phone} already belongs to {', '.join(owners)}" for phone, owners in duplicates.items()])
+
+
+#=========================================================
+# Функція читає базу даних з файлу - ОК
+# >> load                   - з перевіркою кожного телефону та дати
+# >> load trusted           - швидкий шлях для файлу, який записала сама книга
+# >> load book.jsonl        - імпорт з іншого файлу; формат - за розширенням (*.jsonl, *.npz, інакше - текстовий)
+# >> load book.jsonl trusted
+#========================================================= 
+def load_phoneDB(prm):
+    prm = prm.split()
+    trusted = "trusted" in map(str.lower, prm)
+    source = next((Path(item) for item in prm if item.lower() != "trusted"), path)
+    
+    if is_export_path(source):
+        result = missing_dependency(source) or import_book(book, source, trusted=trusted, progress=print_load_progress)
+    else:
+        result = book.load_database(book, source, trusted=trusted, progress=print_load_progress)
+    metrics.add_io("load", len(book), os.path.getsize(source))
+    if source != path or is_export_path(source): return imported_to_journal(result)
+    
+    # відтворимо зміни з журналу, які ще не згорнуті у файл бази даних
+    replayed = (journal or Journal(path)).replay(book)
+    if replayed: result += f", {replayed} changes replayed from the journal"
+    return result
+
+
+# Друкує прогрес завантаження бази даних
+def print_load_progress(count, seconds):
+    print(f"... loaded {count} records ({count / seconds:.0f} records/s)")
+
+
+#=========================================================
+# Функція виконує збереження бази даних у файл *.csv - OK
+# >> save book.jsonl, >> save book.npz - експорт в інший файл; формат - за розширенням
+#========================================================= 
+def save_phoneDB(target):
+    target = Path(target)
+    if is_export_path(target):
+        missing = missing_dependency(target)
+        if missing: return missing
+        result = export_book(book, target)
+    elif journal and target == path: result = journal.compact(book)
+    else: result = book.save_database(book, target)
+    metrics.add_io("save", len(book), os.path.getsize(target))
+    return result
+
+
+#=========================================================
+# >> stats                  - статистика команд: виклики, помилки, затримки (p50/p99), load/save
+# >> stats > metrics.json   - у файл JSON (інакше, наприклад metrics.prom, - формат Prometheus)
+# >> stats reset            - очищення статистики
+#=========================================================
+def func_stats(prm):
+    prm, _, target = prm.partition(">")
+    if target.strip(): return metrics.export(target.strip())
+    if prm.strip().lower() == "reset":
+        metrics.reset()
+        book.render_cache.hits = book.render_cache.misses = 0
+        return "The statistics are reset"
+    return metrics.report() + "\n" + book.render_cache.report()
+
+
+#=========================================================
+# >> profile on                 - профілювання обробників команд (cProfile)
+# >> profile off                - зупиняє профілювання та друкує найгарячіші функції
+# >> profile off > hot.prof     - також зберігає профіль для pstats/snakeviz
+#=========================================================
+def func_profile(prm):
+    mode, _, target = prm.partition(">")
+    mode = mode.strip().lower()
+    if mode == "on":
+        if profiler.enabled: return "The profiler is already on"
+        profiler.start()
+        return "The profiler is on"
+    elif mode == "off":
+        if not profiler.enabled: return "The profiler is already off"
+        return profiler.stop(dump_path=target.strip() or None)
+    else: return f"Expected on or off.\nHer's an example >> profile on"
+
+
+#=========================================================
+# >> journal on | off
+# журнальний режим: кожна зміна дописується у файл <база>.wal
+# замість перезапису всієї бази даних
+#=========================================================
+def func_journal(prm):
+    global journal
+    mode = prm.strip().lower()
+    
+    if mode == "on":
+        if journal: return "The journal is already on"
+        if isinstance(book, SQLiteAddressBook): return "SQLite storage writes every change itself, the journal isn't needed"
+        if is_export_path(path): return "The journal works with the text database (*.csv). Run >> python HW_11.py --db book.csv"
+        journal = Journal(path)
+        journal.attach(book)
+        return f"The journal is on - changes are written to {journal.wal_path}"
+    elif mode == "off":
+        if not journal: return "The journal is already off"
+        journal.detach(book)
+        journal = None
+        return "The journal is off"
+    else: return f"Expected on or off.\nHer's an example >> journal on"
+
+
+#=========================================================
+# >> migrate database_09.csv
+# імпортує файл формату Name|Birthday|phones у базу даних SQLite
+# (python HW_11.py --db book.sqlite) або у бінарний знімок (--db book.snap, далі >> save)
+#=========================================================
+def func_migrate(prm):
+    source = prm.strip()
+    if not source: return f"Expected 1 argument, but 0 was given.\nHer's an example >> migrate database_09.csv"
+    if not isinstance(book, (SQLiteAddressBook, SnapshotAddressBook)):
+        return "Migration needs SQLite or snapshot storage. Run >> python HW_11.py --db book.sqlite (or book.snap)"
+    return book.load_database(book, Path(source), progress=print_load_progress)
+
+
+#=========================================================
+# >> import --workers N database.csv
+# паралельний імпорт великого файлу: діапазони файлу розбираються в N процесах
+# (без --workers - за кількістю ядер); рядки з невірним телефоном або датою
+# не імпортуються, а записуються у звіт database.csv.rejected
+#=========================================================
+def func_import(prm):
+    prm = prm.split()
+    workers = None
+    if len(prm) >= 2 and prm[0] == "--workers":
+        if not prm[1].isdigit() or int(prm[1]) < 1: return f"Expected number of workers.\nHer's an example >> import --workers 4 database.csv"
+        workers = int(prm[1])
+        prm = prm[2:]
+    if len(prm) != 1: return f"Expected 1 file name, but {len(prm)} was given.\nHer's an example >> import --workers 4 database.csv"
+    
+    result = import_parallel(book, Path(prm[0]), workers, progress=print_load_progress)
+    if isinstance(book, SQLiteAddressBook): book.commit()
+    return imported_to_journal(result)
+
+
+# імпортовані записи додаються масово (add_records), без спостерігачів, тобто не потрапляють
+# у журнал змін: при увімкненому журналі книга одразу згортається у файл бази даних
+def imported_to_journal(result) -> str:
+    if not journal: return result
+    return f"{result}\n{journal.compact(book)}"
+
+
+#=========================================================
+# >> dedupe                         - пошук дублікатів, звіт у файл <база даних>.dedupe
+# >> dedupe merge                   - також об'єднує знайдені дублікати
+# >> dedupe --threshold 0.6 merge   - поріг оцінки схожості пари записів (0..1)
+#=========================================================
+def func_dedupe(prm):
+    prm = prm.lower().split()
+    threshold = THRESHOLD
+    if "--threshold" in prm:
+        position = prm.index("--threshold")
+        try:
+            threshold = float(prm[position + 1])
+        except (IndexError, ValueError):
+            return f"Expected a threshold from 0 to 1.\nHer's an example >> dedupe --threshold 0.6 merge"
+        del prm[position:position + 2]
+    if prm not in ([], ["merge"]): return f"Unknown parameters {' '.join(prm)}.\nHer's an example >> dedupe merge"
+    
+    result = dedupe(book, path.with_name(path.name + ".dedupe"), threshold, merge=bool(prm))
+    if prm and isinstance(book, SQLiteAddressBook): book.commit()
+    return result
+
+
+#=========================================================
+# >> merge merged.csv branch1.csv branch2.csv [--memory 64]
+# об'єднує файли бази даних без завантаження у книгу (зовнішнє сортування за іменем,
+# --memory - пам'ять у МБ для сортування); телефони контакту об'єднуються,
+# конфлікти дат народження - у звіт merged.csv.merge
+#=========================================================
+def func_merge(prm):
+    memory, prm = memory_option(prm)
+    if memory is None: return f"Expected memory in MB.\nHer's an example >> merge merged.csv branch1.csv branch2.csv --memory 64"
+    if len(prm) < 3: return f"Expected a target and at least 2 files, but {len(prm)} was given.\nHer's an example >> merge merged.csv branch1.csv branch2.csv"
+    return merge_files([Path(source) for source in prm[1:]], Path(prm[0]), memory)
+
+
+#=========================================================
+# >> diff yesterday.csv today.csv [> report.txt] [--memory 64]
+# порівнює два файли бази даних без завантаження у книгу: додані (+), видалені (-)
+# та змінені (~) контакти; звіт за замовчуванням - today.csv.diff
+#=========================================================
+def func_diff(prm):
+    prm, _, report = prm.partition(">")
+    memory, prm = memory_option(prm)
+    if memory is None: return f"Expected memory in MB.\nHer's an example >> diff yesterday.csv today.csv --memory 64"
+    if len(prm) != 2: return f"Expected 2 files, but {len(prm)} was given.\nHer's an example >> diff yesterday.csv today.csv > changes.txt"
+    old, new = Path(prm[0]), Path(prm[1])
+    return diff_files(old, new, Path(report.strip()) if report.strip() else new.with_name(new.name + ".diff"), memory)
+
+
+# виділяє з параметрів --memory N: повертає (N або MEMORY_MB; None - невірне значення, інші параметри)
+def memory_option(prm) -> tuple:
+    prm = prm.split()
+    if "--memory" not in prm: return MEMORY_MB, prm
+    position = prm.index("--memory")
+    memory = prm[position + 1] if position + 1 < len(prm) else ""
+    del prm[position:position + 2]
+    return (int(memory) if memory.isdigit() and int(memory) > 0 else None), prm
+
+
+#=========================================================
+# >> remind on                      - нагадування про дні народження у консоль (о 9:00 у день народження)
+# >> remind on 3 > reminders.txt    - за 3 дні до дня народження, у файл
+# >> remind next 10                 - найближчі 10 запланованих нагадувань
+# >> remind off
+#=========================================================
+def func_remind(prm):
+    global reminders
+    prm, _, target = prm.partition(">")
+    prm = prm.lower().split()
+    mode = prm[0] if prm else ""
+    
+    if mode == "on":
+        if reminders: return "The reminders are already on"
+        if isinstance(book, SQLiteAddressBook): return "The reminders work with the book in memory. Run >> python HW_11.py --db book.csv"
+        days = prm[1] if len(prm) > 1 else "0"
+        if len(prm) > 2 or not days.isdigit() or int(days) > 364: return f"Expected number of days before the birthday.\nHer's an example >> remind on 3 > reminders.txt"
+        sink = FileSink(target.strip()) if target.strip() else StdoutSink(lambda text: print(text))
+        reminders = BirthdayScheduler(book, sink, int(days), lock=book_lock)
+        reminders.start()
+        return f"The reminders are on - {reminders.report()}"
+    elif mode == "off":
+        if not reminders: return "The reminders are already off"
+        reminders.stop()
+        result, reminders = reminders.report(), None
+        return f"The reminders are off - {result}"
+    elif mode == "next":
+        if not reminders: return "The reminders are off. Run >> remind on"
+        if len(prm) > 1 and not prm[1].isdigit(): return f"Expected number of reminders.\nHer's an example >> remind next 10"
+        upcoming = reminders.upcoming(int(prm[1]) if len(prm) > 1 else 10)
+        if not upcoming: return "There are no scheduled reminders"
+        return "\n".join(f"{date.strftime('%d.%m.%Y')} {book.render(record)}" for date, record in upcoming)
+    else: return f"Expected on, off or next.\nHer's an example >> remind on 3"
+
+
+#=========================================================
+# >> undo                   - скасовує останню команду, що змінила книгу
+# >> undo 3                 - скасовує 3 останні команди
+# >> undo before-dedupe     - повертає книгу до контрольної точки before-dedupe
+# >> redo, redo 3, redo before-dedupe - повторює скасовані команди
+# нова зміна книги після undo відкидає скасовані команди (redo більше недоступне)
+#=========================================================
+def func_undo(prm):
+    return move_history(prm, history.undo, "undo")
+
+
+def func_redo(prm):
+    return move_history(prm, history.redo, "redo")
+
+
+# переходить на prm версій (число) або до контрольної точки prm, move - history.undo або history.redo
+def move_history(prm, move, cmd):
+    prm = prm.strip()
+    if not prm: result = move(book)
+    elif prm.isdigit() and int(prm) > 0: result = move(book, int(prm))
+    else:
+        target = history.find_checkpoint(prm)
+        if target is None: return f"The checkpoint {prm} isn't found.\nHer's an example >> {cmd} 2"
+        result = move(book, target=target)
+    if isinstance(book, SQLiteAddressBook): book.commit()
+    return result
+
+
+#=========================================================
+# >> checkpoint before-dedupe   - називає поточну версію книги (далі >> undo before-dedupe)
+#=========================================================
+def func_checkpoint(prm):
+    label = prm.strip()
+    if not label or label.isdigit(): return f"Expected a checkpoint name.\nHer's an example >> checkpoint before-dedupe"
+    return history.checkpoint(label)
+
+
+#=========================================================
+# >> history        - останні 20 версій книги (команда, час, кількість змін, контрольні точки)
+# >> history 100    - останні 100 версій
+#=========================================================
+def func_history(prm):
+    prm = prm.strip()
+    if prm and not prm.isdigit(): return f"Expected number of versions.\nHer's an example >> history 100"
+    return history.report(int(prm) if prm else 20)
+
+
+#=========================================================
+# >> compact
+# згортає журнал змін у файл бази даних (атомарна заміна файлу)
+#=========================================================
+def func_compact(_):
+    if not journal: return "The journal is off. Run >> journal on"
+    return journal.compact(book)
+    
+    
+#=========================================================
+# Серверний режим: python HW_11.py --serve --port 8765
+# Клієнт надсилає команди CLI рядками (або JSON {"id": 1, "command": "phone Mike"})
+# та отримує результат JSON-рядком. Особливості сесії клієнта:
+# >> show book /N from Name - повертає першу сторінку, >> next - наступну сторінку
+# >> show all, cls          - недоступні (друк у консоль сервера)
+# файли в параметрах команд (save, load, import, migrate, merge, diff, > файл) - лише в каталозі бази даних
+#=========================================================
+def serve_command(line, session) -> tuple:
+    line = line.strip()
+    if line.lower() == "next":
+        if session.pages is None: return False, "There are no pages. Run >> show book /10"
+        try:
+            batch = next(session.pages, None)
+        except RuntimeError:                    # книга змінилася під час друку в порядку додавання
+            session.pages = None
+            return False, "The book was changed while paging. Run >> show book /10 again (or >> show book /10 from A - it isn't affected by changes)"
+        if batch is None:
+            session.pages = None
+            return True, "End of the book"
+        return True, format_page(batch)
+    
+    cmd, prm = parcer_commands(line)
+    if not cmd: return False, "Command was not recognized"
+    if cmd in ("show all", "cls"): return False, f"The command {cmd} isn't available on the server. Run >> show book /10"
+    outside = next((item for item in command_paths(cmd, prm) if not in_database_dir(item)), None)
+    if outside: return False, f"The server works only with files in the database directory {path.resolve().parent}, not {outside}"
+    try:
+        if cmd == "show book":
+            pages = book_pages(prm)
+            if isinstance(pages, str): return False, pages
+            session.pages = pages
+            return serve_command("next", session)
+        result = call_handler(get_handler(cmd), cmd, prm)
+    except (OSError, ValueError, KeyError) as error:
+        return False, error_message(error)
+    return True, MARKUP.sub("", str(result))
+
+
+# Файли в параметрах команди: файл після ">" та імена файлів команд save, load, import, migrate, merge, diff
+def command_paths(cmd, prm) -> list[str]:
+    prm, _, target = prm.partition(">")
+    paths = [target.strip()] if target.strip() else []
+    if cmd == "save": return paths + ([prm.strip()] if prm.strip() else [])
+    if cmd not in ("load", "import", "migrate", "merge", "diff"): return paths
+    words = iter(prm.split())
+    for word in words:
+        if word in ("--workers", "--memory"): next(words, None)       # значення параметра
+        elif not (cmd == "load" and word.lower() == "trusted"): paths.append(word)
+    return paths
+
+
+# Чи знаходиться файл у каталозі бази даних (після розкриття "..", символьних посилань)
+def in_database_dir(name) -> bool:
+    return Path(name).resolve().is_relative_to(path.resolve().parent)
+
+
+# Чи змінює команда книгу (такі команди виконує єдиний записувач сервера)
+def is_write_command(line) -> bool:
+    return parcer_commands(line)[0] in WRITE_COMMANDS
+
+
+# Чи завершує команда сесію клієнта
+def is_exit_command(line) -> bool:
+    return parcer_commands(line)[0] in ("good bye", "close", "exit")
+
+
+# Фіксує групу змін сервера: fsync журналу, commit SQLite або збереження файлу бази даних
+# (файл *.jsonl, *.npz переписується цілком - O(книги) на кожну групу змін; текстова база
+# на сервері працює з журналом, див. serve_database)
+def commit_changes():
+    if journal: journal.sync()
+    elif isinstance(book, SQLiteAddressBook): book.commit()
+    elif isinstance(book, SnapshotAddressBook): return     # знімок зберігається командою save
+    else: save_phoneDB(path)
+
+
+#-----------------------------------------
+# готує книгу до серверного режиму: текстова база (*.csv) та *.jsonl, *.npz завантажуються
+# (з відтворенням журналу), інакше перша група змін переписала б файл лише новими записами;
+# для текстової бази вмикається журнал, щоб група змін дописувала O(змін), а не переписувала файл
+#-------------------------------------------
+def serve_database() -> str:
+    if isinstance(book, (SQLiteAddressBook, SnapshotAddressBook)): return f"The database {path} is open"
+    result = load_phoneDB("") if path.exists() else f"The database {path} isn't found, a new one will be created"
+    if not is_export_path(path): result += "\n" + func_journal("on")
+    history.reset()                 # зміни, відтворені з журналу, не скасовуються командою undo
+    return MARKUP.sub("", result)
+
+
+#=========================================================
+# Функція виконує парсер команд та відповідних параметрів
+#=========================================================
+def parcer_commands(cmd_line):
+    cmd, prm = "", ""
+    
+    tmp = cmd_line.split(maxsplit=2)
+    if tmp:
+        # перевіремо ПОДВІЙНУ команду (COMMANDS - множина, перевірка за O(1))
+        if len(tmp) > 1 and f"{tmp[0]} {tmp[1]}".lower() in COMMANDS:
+            cmd = f"{tmp[0]} {tmp[1]}".lower()
+            prm = tmp[2].strip() if len(tmp) > 2 else ""
+            
+        # перевіремо ОДИНАРНУ команду
+        elif tmp[0].lower() in COMMANDS:
+            cmd = tmp[0].lower()
+            prm = cmd_line.split(maxsplit=1)[1] if len(tmp) > 1 else ""
+    return cmd, prm
+
+
+def func_help(_):
+    return """[bold red]cls[/bold red] - очищення екрану від інформації
+[bold red]hello[/bold red] - вітання
+[bold red]good bye, close, exit[/bold red] - завершення програми
+[bold red]load[/bold red] - завантаження інформації про користувачів із файлу
+      example >> [bold blue]load trusted[/bold blue] - швидке завантаження файлу, збереженого командою save
+      example >> [bold blue]load book.jsonl[/bold blue] - імпорт з файлу JSON Lines ([bold blue]*.jsonl[/bold blue]) або стовпців NumPy ([bold blue]*.npz[/bold blue])
+[bold red]save[/bold red] - збереження інформації про користувачів у файл
+      example >> [bold blue]save book.npz[/bold blue] - експорт у файл, формат - за розширенням ([bold blue]*.jsonl[/bold blue], [bold blue]*.npz[/bold blue], інакше - текстовий)
+[bold red]journal on/off[/bold red] - журнальний режим: зміни дописуються у файл [bold red]*.wal[/bold red] замість перезапису бази
+[bold red]compact[/bold red] - згортання журналу змін у файл бази даних
+[bold red]undo[/bold red] - скасування останньої команди, що змінила книгу ([bold red]redo[/bold red] - повторення скасованої)
+      example >> [bold blue]undo 3[/bold blue] - 3 останні команди, [bold blue]undo before-dedupe[/bold blue] - до контрольної точки
+[bold red]checkpoint[/bold red] - назва для поточної версії книги, до якої можна повернутися командою undo
+      example >> [bold blue]checkpoint before-dedupe[/bold blue]
+[bold red]history[/bold red] - останні версії книги: команда, час, кількість змін (load починає історію заново)
+      example >> [bold blue]history 100[/bold blue]
+[bold red]dedupe[/bold red] - пошук дублікатів (спільні телефони, схожі імена, дата народження), звіт у файл [bold red]*.dedupe[/bold red]
+      example >> [bold blue]dedupe merge[/bold blue] - також об'єднує дублікати, [bold blue]dedupe --threshold 0.6[/bold blue] - поріг схожості
+[bold red]merge[/bold red] - об'єднання файлів бази даних, більших за пам'ять (без завантаження у книгу)
+      example >> [bold blue]merge merged.csv branch1.csv branch2.csv --memory 64[/bold blue]
+[bold red]diff[/bold red] - порівняння двох файлів бази даних: додані, видалені та змінені контакти
+      example >> [bold blue]diff yesterday.csv today.csv > changes.txt[/bold blue]
+[bold red]migrate[/bold red] - імпорт файлу бази даних у SQLite або бінарний знімок (запуск з [bold blue]--db book.sqlite[/bold blue] або [bold blue]--db book.snap[/bold blue])
+      example >> [bold blue]migrate database_09.csv[/bold blue]
+[bold red]import[/bold red] - паралельний імпорт великого файлу в N процесах, невірні рядки - у звіт [bold red]*.rejected[/bold red]
+      example >> [bold blue]import --workers 4 database.csv[/bold blue]
+[bold red]stats[/bold red] - статистика команд: кількість викликів, помилки, затримки, обсяг load/save
+      example >> [bold blue]stats > metrics.json[/bold blue] (або [bold blue]metrics.prom[/bold blue] - формат Prometheus), [bold blue]stats reset[/bold blue]
+[bold red]profile on/off[/bold red] - профілювання команд, [bold blue]profile off[/bold blue] друкує найгарячіші функції
+[bold red]show all[/bold red] - друкування всієї наявної інформації про користувачів
+      example >> [bold blue]show all sort name[/bold blue]  (або [bold blue]sort birthday[/bold blue])
+              >> [bold blue]show all > contacts.txt[/bold blue] - друкування у файл
+[bold red]show book /N[/bold red]  - друкування інформації посторінково, де [bold red]N[/bold red] - кількість записів на 1 сторінку
+      example >> [bold blue]show book /10 from Mike[/bold blue] - посторінково в алфавітному порядку, починаючи з Mike
+[bold red]add[/bold red] - додавання користувача до бази даних. 
+      example >> [bold blue]add Mike 02.10.1990 +380504995876[/bold blue]
+              >> [bold blue]add Mike 02.10.1990 +380504995876; Ann None +380671112233[/bold blue] - декілька записів
+              >> [bold blue]add Mike None +380504995876[/bold blue]
+              >> [bold blue]add Mike None None[/bold blue]
+[bold red]phone[/bold red] - повертає перелік телефонів для особи
+      example >> [bold blue]phone Mike[/bold blue]
+[bold red]add phone[/bold red] - додавання телефону для користувача
+      example >> [bold blue]add phone Mike +380504995876[/bold blue]
+[bold red]change phone[/bold red] - зміна номеру телефону для користувача
+      Формат запису телефону: [bold green]+38ХХХ ХХХ ХХ ХХ[/bold green]
+      example >> [bold blue]change phone Mike +380504995876 +380665554433[/bold blue]
+[bold red]del phone[/bold red] - видаляє телефон для особи
+      example >> [bold blue]del phone Mike +380509998877, +380732225566[/bold blue]
+[bold red]birthday[/bold red] - повертає кількість днів до Дня народження
+      example >> [bold blue]birthday Mike[/bold blue]
+[bold red]birthdays[/bold red] - повертає всіх, у кого День народження в найближчі N днів
+      example >> [bold blue]birthdays 7[/bold blue]
+[bold red]report birthdays[/bold red] - звіт за всією книгою: найближчі дні народження, вік, розподіл за місяцями та віком
+      example >> [bold blue]report birthdays 5[/bold blue]
+[bold red]remind on/off[/bold red] - нагадування про дні народження о 9:00 у консоль або у файл
+      example >> [bold blue]remind on 3 > reminders.txt[/bold blue] - за 3 дні до дня народження, [bold blue]remind next 10[/bold blue] - найближчі нагадування
+[bold red]change birthday[/bold red] - змінює/додає Дату народження для особи
+      example >> [bold blue]change birthday Mike 02.03.1990[/bold blue]
+[bold red]find phone[/bold red] - повертає власника телефону
+      example >> [bold blue]find phone +380501113330[/bold blue]
+[bold red]search[/bold red] - пошук за початком імені, частиною номера телефону або іменем з помилками
+      example >> [bold blue]search Mi[/bold blue]
+              >> [bold blue]search 50111[/bold blue]
+"""
+    
+
+def clear_screen(_):
+    if not INTERACTIVE: return ""
+    os_name = platform.system().lower()
+    
+    if os_name == 'windows':
+        os.system('cls')
+    elif os_name == 'linux' or os_name == 'darwin':
+        os.system('clear')
+    return ""
+
+
+# Рахує та повертає кількість параметрів
+def get_count_prm(prm: list):
+    if len(prm) > 0: 
+        count_prm = prm.count(" ", 0, -1) + 1
+    else: count_prm = 0
+    return count_prm
+
+
+OPERATIONS = {"good bye": func_exit, "close": func_exit, "exit": func_exit,
+              "hello": func_greeting, 
+              "add": func_add_rec,
+              "phone": func_phone, 
+              "show all": func_all_phone,
+              "save": save_phoneDB,
+              "load": load_phoneDB,
+              "cls": clear_screen,
+              "add phone": func_add_phone,
+              "del phone": func_del_phone,              
+              "change phone": func_change_phone,
+              "show book": func_book_pages,
+              "change birthday": func_change_birthday,
+              "birthday": func_get_day_birthday,
+              "birthdays": func_upcoming_birthdays,
+              "report birthdays": func_report_birthdays,
+              "remind": func_remind,
+              "find phone": func_find_phone,
+              "search": func_search,
+              "journal": func_journal,
+              "compact": func_compact,
+              "undo": func_undo,
+              "redo": func_redo,
+              "checkpoint": func_checkpoint,
+              "history": func_history,
+              "migrate": func_migrate,
+              "dedupe": func_dedupe,
+              "merge": func_merge,
+              "diff": func_diff,
+              "import": func_import,
+              "stats": func_stats,
+              "profile": func_profile,
+              "help": func_help}
+
+# множина команд для розбору командного рядка
+COMMANDS = frozenset(OPERATIONS)
+
+# команди, обробники яких не отримують параметрів
+NO_PRM_COMMANDS = frozenset(["good bye", "close", "exit", "hello", "cls", "help", "compact"])
+
+# команди, що змінюють книгу
+WRITE_COMMANDS = frozenset(["add", "add phone", "del phone", "change phone", "change birthday",
+                            "load", "save", "journal", "compact", "migrate", "import", "dedupe",
+                            "undo", "redo", "checkpoint"])
+
+# команди масового завантаження (записи додаються без спостерігачів - історія починається заново)
+BULK_COMMANDS = frozenset(["load", "import", "migrate"])
+
+# команди історії, що самі керують версіями
+HISTORY_COMMANDS = frozenset(["undo", "redo", "checkpoint"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CLI version 11.0 - address book")
+    parser.add_argument("--batch", metavar="FILE", help='execute commands from FILE ("-" - from stdin) and exit')
+    parser.add_argument("--serve", action="store_true", help="run the network server (JSON lines protocol)")
+    parser.add_argument("--host", default="127.0.0.1", help="server host (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="server port (default 8765)")
+    parser.add_argument("--db", metavar="PATH", help="path to the database file (*.sqlite, *.db - SQLite storage, *.snap - binary snapshot, *.jsonl, *.npz - export formats)")
+    args = parser.parse_args()
+    
+    if args.db: path = Path(args.db)
+    if is_sqlite_path(path): book = SQLiteAddressBook(path)
+    elif is_snapshot_path(path): book = SnapshotAddressBook(path)   # відкривається одразу, без load
+    elif args.serve: book = ConcurrentAddressBook()     # команди читання сервера виконуються у потоках
+    history.attach(book)
+    if args.serve:
+        INTERACTIVE, print = False, plain_print
+        print(serve_database())
+        server = BookServer(serve_command, is_write_command, is_exit_command, commit_changes,
+                            threaded=isinstance(book, ConcurrentAddressBook))
+        run_server(server, args.host, args.port, ready=lambda _: print(f"Serving {path} on {args.host}:{args.port}"))
+    elif args.batch:
+        if args.batch == "-": print(run_batch(sys.stdin))
+        else:
+            with open(args.batch, "r") as f_cmds:
+                print(run_batch(f_cmds))
+    else: main()
     
\ No newline at end of file
@@ -0,0 +1,290 @@
+'''
+Історія змін книги для команд undo, redo, checkpoint та history.
+
+Версія книги - незмінний (persistent) словник ім'я -> стан запису: HAMT (hash array mapped trie),
+дерево вузлів по 32 нащадки за 5 бітами хешу імені. Зміна запису копіює лише вузли на шляху
+від кореня до імені (O(log32 n), для мільйона записів - 4-5 вузлів), решта дерева спільна
+з попередньою версією. Тому версія коштує O(зміни) пам'яті, а зафіксувати її - O(1): зберегти корінь.
+
+Словник містить лише записи, змінені після reset (завантаження книги): стан запису до першої
+зміни зберігається у base, тому історія не копіює книгу і не сповільнює load.
+Повернення до версії (undo/redo) порівнює два дерева, пропускаючи спільні піддерева,
+і застосовує до книги лише відмінні записи - O(змін між версіями).
+'''
+
+import time
+from array import array
+
+from RecordBook import Record
+
+# найбільша кількість версій в історії (найстаріші версії відкидаються)
+HISTORY_SIZE = 10_000
+
+BITS = 5                            # біт хешу на рівень дерева (32 нащадки вузла)
+MASK = (1 << BITS) - 1
+HASH_BITS = 60                      # використовувані біти хешу (12 рівнів), далі - кошик колізій
+HASH_MASK = (1 << HASH_BITS) - 1
+MISSING = object()
+
+
+# вузол HAMT: bitmap - зайняті позиції з 32, children - нащадки лише зайнятих позицій:
+# лист (хеш, ключ, значення), вузол або кошик колізій
+class _Node():
+    __slots__ = ("bitmap", "children")
+
+    def __init__(self, bitmap, children) -> None:
+        self.bitmap = bitmap
+        self.children = children
+
+
+# ключі з однаковими HASH_BITS бітами хешу
+class _Bucket():
+    __slots__ = ("leaves",)
+
+    def __init__(self, leaves) -> None:
+        self.leaves = leaves
+
+
+EMPTY_NODE = _Node(0, ())
+
+
+#-----------------------------------------
+# новий вузол з листом (h, key, value) замість вузла node (path copying);
+# повертає (новий вузол, чи додано новий ключ)
+#-------------------------------------------
+def _set(node, shift, h, key, value) -> tuple:
+    if type(node) is _Bucket:
+        leaves = node.leaves
+        for i, leaf in enumerate(leaves):
+            if leaf[1] == key: return _Bucket(leaves[:i] + ((h, key, value),) + leaves[i + 1:]), False
+        return _Bucket(leaves + ((h, key, value),)), True
+
+    bit = 1 << ((h >> shift) & MASK)
+    index = (node.bitmap & (bit - 1)).bit_count()
+    children = node.children
+    if not node.bitmap & bit:
+        return _Node(node.bitmap | bit, children[:index] + ((h, key, value),) + children[index:]), True
+
+    child = children[index]
+    if type(child) is tuple:
+        if child[1] == key: child, added = (h, key, value), False
+        else: child, added = _pair(shift + BITS, child, (h, key, value)), True
+    else:
+        child, added = _set(child, shift + BITS, h, key, value)
+    return _Node(node.bitmap, children[:index] + (child,) + children[index + 1:]), added
+
+
+# вузол з двома листами, хеші яких збігаються до рівня shift
+def _pair(shift, first, second):
+    if shift >= HASH_BITS: return _Bucket((first, second))
+    first_bit, second_bit = (first[0] >> shift) & MASK, (second[0] >> shift) & MASK
+    if first_bit == second_bit: return _Node(1 << first_bit, (_pair(shift + BITS, first, second),))
+    return _Node((1 << first_bit) | (1 << second_bit), (first, second) if first_bit < second_bit else (second, first))
+
+
+# всі пари (ключ, значення) піддерева
+def _items(node):
+    if node is None: return
+    if type(node) is tuple: yield node[1], node[2]
+    elif type(node) is _Bucket: yield from ((leaf[1], leaf[2]) for leaf in node.leaves)
+    else:
+        for child in node.children: yield from _items(child)
+
+
+#-----------------------------------------
+# ключі з різними значеннями у піддеревах first та second (або присутні лише в одному з них);
+# спільні піддерева (той самий об'єкт) пропускаються без обходу
+#-------------------------------------------
+def _diff(first, second, keys):
+    if first is second: return
+    if type(first) is _Node and type(second) is _Node:
+        bitmap = first.bitmap | second.bitmap
+        while bitmap:
+            bit = bitmap & -bitmap
+            bitmap ^= bit
+            _diff(first.children[(first.bitmap & (bit - 1)).bit_count()] if first.bitmap & bit else None,
+                  second.children[(second.bitmap & (bit - 1)).bit_count()] if second.bitmap & bit else None, keys)
+        return
+
+    first_items, second_items = dict(_items(first)), dict(_items(second))
+    for key in first_items.keys() | second_items.keys():
+        first_value, second_value = first_items.get(key, MISSING), second_items.get(key, MISSING)
+        if first_value is not second_value and first_value != second_value: keys.append(key)
+
+
+#=========================================================
+# Незмінний словник (HAMT): set повертає новий словник, старий залишається без змін
+#=========================================================
+class PersistentMap():
+    __slots__ = ("_root", "_len")
+
+    def __init__(self, root=EMPTY_NODE, length=0) -> None:
+        self._root = root
+        self._len = length
+
+    def __len__(self) -> int:
+        return self._len
+
+    def get(self, key, default=None):
+        h, node, shift = hash(key) & HASH_MASK, self._root, 0
+        while True:
+            if type(node) is _Bucket:
+                return next((leaf[2] for leaf in node.leaves if leaf[1] == key), default)
+            bit = 1 << ((h >> shift) & MASK)
+            if not node.bitmap & bit: return default
+            node = node.children[(node.bitmap & (bit - 1)).bit_count()]
+            if type(node) is tuple: return node[2] if node[1] == key else default
+            shift += BITS
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, MISSING) is not MISSING
+
+    def set(self, key, value):
+        root, added = _set(self._root, 0, hash(key) & HASH_MASK, key, value)
+        return PersistentMap(root, self._len + added)
+
+    def items(self):
+        return _items(self._root)
+
+    # ключі, значення яких у other інші (або відсутні в одному зі словників)
+    def diff(self, other) -> list:
+        keys = []
+        _diff(self._root, other._root, keys)
+        return keys
+
+
+# стан запису у версії: (дата народження, упаковані телефони); None - запису немає
+def record_state(record):
+    if record is None: return None
+    return record._birthday, record._phones.tobytes()
+
+
+# одна версія книги в історії
+class Version():
+    __slots__ = ("state", "label", "changes", "created", "checkpoint")
+
+    def __init__(self, state, label, changes) -> None:
+        self.state = state          # PersistentMap змінених записів
+        self.label = label          # команда, що створила версію
+        self.changes = changes      # кількість змін записів
+        self.created = time.time()
+        self.checkpoint = None      # назва контрольної точки (команда checkpoint)
+
+
+class History():
+    def __init__(self, limit=HISTORY_SIZE) -> None:
+        self.limit = limit
+        self.replaying = False      # під час undo/redo зміни книги не записуються в історію
+        self.reset()
+
+    #-----------------------------------------
+    # починає історію заново з поточного стану книги
+    # (після load/import: масове додавання записів не проходить через спостерігачів)
+    #-------------------------------------------
+    def reset(self):
+        self.base = {}                      # ім'я -> стан запису до першої зміни після reset
+        self.state = PersistentMap()        # поточний стан змінених записів
+        self.pending = 0                    # зміни, ще не зафіксовані у версію
+        self.versions = [Version(self.state, "start", 0)]
+        self.position = 0                   # поточна версія (далі - версії для redo)
+        self.dropped = 0                    # кількість відкинутих найстаріших версій (для нумерації)
+
+    # підключає історію до книги
+    def attach(self, book):
+        book.observers.append(self)
+
+    def detach(self, book):
+        if self in book.observers:
+            book.observers.remove(self)
+
+    # запис name зараз зміниться (спостерігач AddressBook): запам'ятовує стан до першої зміни
+    def before_change(self, book, name):
+        if self.replaying or name in self.base: return
+        self.base[name] = record_state(book.data.get(name))
+
+    # зміна запису (спостерігач AddressBook) - нова версія словника змінених записів
+    def on_change(self, event, record, *args):
+        if self.replaying: return
+        self.state = self.state.set(record._name, None if event == "del_record" else record_state(record))
+        self.pending += 1
+
+    #-----------------------------------------
+    # фіксує незафіксовані зміни як нову версію (label - команда); версії для redo відкидаються
+    # повертає True, якщо версію створено
+    #-------------------------------------------
+    def commit(self, label) -> bool:
+        if self.state is self.versions[self.position].state: return False
+        del self.versions[self.position + 1:]
+        self.versions.append(Version(self.state, label, self.pending))
+        self.pending = 0
+        if len(self.versions) > self.limit:
+            del self.versions[0]
+            self.dropped += 1
+        self.position = len(self.versions) - 1
+        return True
+
+    # називає поточну версію контрольною точкою label
+    def checkpoint(self, label) -> str:
+        self.commit("changes")
+        self.versions[self.position].checkpoint = label
+        return f"The checkpoint {label} is version {self.position + self.dropped} - [bold green]success[/bold green]"
+
+    # номер версії (без відкинутих) за назвою контрольної точки, останньої з такою назвою
+    def find_checkpoint(self, label):
+        for i in range(len(self.versions) - 1, -1, -1):
+            if self.versions[i].checkpoint == label: return i
+        return None
+
+    # повертається на steps версій назад (або до версії target)
+    def undo(self, book, steps=1, target=None) -> str:
+        self.commit("changes")
+        target = max(self.position - steps, 0) if target is None else target
+        if target >= self.position: return "There is nothing to undo"
+        labels = [version.label for version in self.versions[target + 1:self.position + 1]]
+        restored = self._restore(book, target)
+        return f"Undone: {'; '.join(reversed(labels[-3:]))}{' ...' if len(labels) > 3 else ''} ({restored} records restored) - [bold green]success[/bold green]"
+
+    # повторює steps скасованих версій (або до версії target)
+    def redo(self, book, steps=1, target=None) -> str:
+        self.commit("changes")
+        target = min(self.position + steps, len(self.versions) - 1) if target is None else target
+        if target <= self.position: return "There is nothing to redo"
+        labels = [version.label for version in self.versions[self.position + 1:target + 1]]
+        restored = self._restore(book, target)
+        return f"Redone: {'; '.join(labels[:3])}{' ...' if len(labels) > 3 else ''} ({restored} records restored) - [bold green]success[/bold green]"
+
+    # версії історії, останні count (поточна позначена ">")
+    def report(self, count=20) -> str:
+        first = max(len(self.versions) - count, 0)
+        lines = [f"{len(self.versions)} versions, {len(self.state)} records changed since the start"]
+        for i in range(first, len(self.versions)):
+            version = self.versions[i]
+            marker = ">" if i == self.position else " "
+            checkpoint = f" [bold blue]({version.checkpoint})[/bold blue]" if version.checkpoint else ""
+            lines.append(f"{marker} {i + self.dropped:>5} {time.strftime('%H:%M:%S', time.localtime(version.created))} "
+                         f"{version.label}{checkpoint} - {version.changes} changes")
+        return "\n".join(lines)
+
+    #-----------------------------------------
+    # приводить книгу до версії index: змінюються лише записи, що відрізняються від поточної версії;
+    # зміни проходять через методи книги, тому індекси, кеш друку та журнал (journal on) оновлюються
+    #-------------------------------------------
+    def _restore(self, book, index) -> int:
+        target = self.versions[index].state
+        names = self.state.diff(target)
+        self.replaying = True
+        try:
+            for name in names:
+                state = target.get(name, MISSING)
+                if state is MISSING: state = self.base[name]
+                if state is None:
+                    if name in book: del book[name]
+                else:
+                    phones = array("Q")
+                    phones.frombytes(state[1])
+                    book.add_record(Record.packed(name, state[0], phones))
+        finally:
+            self.replaying = False
+        self.state = target
+        self.position = index
+        return len(names)
@@ -0,0 +1,153 @@
+'''
+Журнальний (write-ahead log) режим зберігання AddressBook.
+
+Кожна зміна книги (add_record, del_record, add_phone, del_phone, edit_phone, change_birthday)
+дописується одним рядком у файл <база>.wal, тому запис коштує O(зміни), а не O(книги).
+Команда compact згортає журнал у знімок (звичайний файл бази даних) та починає новий журнал.
+
+Перший рядок журналу - заголовок зі знімком, до якого він належить:
+    snapshot|<crc32 знімка>|<розмір знімка>
+Якщо збій стався між заміною знімка та скиданням журналу, заголовок не збігається
+з новим знімком і такий (вже згорнутий) журнал при завантаженні ігнорується.
+'''
+
+import os
+import zlib
+from pathlib import Path
+
+from RecordBook import Birthday, Phone, parse_lines, record_line
+
+
+class Journal():
+    def __init__(self, path, fsync=False) -> None:
+        self.path = Path(path)
+        self.wal_path = self.path.with_name(self.path.name + ".wal")
+        self.fsync = fsync          # fsync після кожного запису (повільніше, але надійніше)
+        self.replaying = False      # під час відтворення журналу зміни не записуються повторно
+        self._file = None
+
+    # підключає журнал до книги: далі всі зміни книги дописуються у журнал
+    def attach(self, book):
+        if not self._is_current():
+            self._reset()
+        self._file = open(self.wal_path, "a")
+        book.observers.append(self)
+
+    # відключає журнал від книги
+    def detach(self, book):
+        if self in book.observers:
+            book.observers.remove(self)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    #-----------------------------------------
+    # дописує зміну у журнал (спостерігач AddressBook)
+    # формат рядків:
+    #   add_record|Name|Birthday|phone, phone
+    #   del_record|Name
+    #   add_phone|Name|phone, phone
+    #   del_phone|Name|phone, phone
+    #   edit_phone|Name|old phone|new phone
+    #   change_birthday|Name|Birthday
+    #-------------------------------------------
+    def on_change(self, event, record, *args):
+        if self.replaying or self._file is None: return
+
+        if event == "add_record":
+            line = f"{event}|{record_line(record)}"
+        elif event == "del_record":
+            line = f"{event}|{record.name.value}"
+        elif event in ("add_phone", "del_phone"):
+            line = f"{event}|{record.name.value}|{', '.join(phone.value for phone in args[0])}"
+        elif event == "edit_phone":
+            line = f"{event}|{record.name.value}|{args[0].value}|{args[1].value}"
+        elif event == "change_birthday":
+            line = f"{event}|{record.name.value}|{record.birthday.value}"
+        else: return
+
+        self._file.write(line + "\n")
+        self._file.flush()
+        if self.fsync: os.fsync(self._file.fileno())
+
+    # гарантує, що дописані зміни записані на диск (одна фіксація для групи змін)
+    def sync(self):
+        if self._file is None: return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    # відтворює журнал поверх завантаженого знімка, повертає кількість застосованих змін
+    def replay(self, book) -> int:
+        if not self.wal_path.exists() or not self._is_current(): return 0
+
+        count = 0
+        self.replaying = True
+        try:
+            with open(self.wal_path, "r") as f_read:
+                f_read.readline()                   # заголовок
+                for line in f_read:
+                    if not line.endswith("\n"): break   # недописаний рядок (збій під час запису)
+                    self._apply(book, line[:-1])
+                    count += 1
+        finally:
+            self.replaying = False
+        return count
+
+    # згортає журнал у новий знімок та починає порожній журнал
+    def compact(self, book) -> str:
+        result = book.save_database(book, self.path)
+        attached = self._file is not None
+        if attached: self._file.close()
+        self._reset()
+        if attached: self._file = open(self.wal_path, "a")
+        return f"{result}, the journal is compacted"
+
+    # застосовує один рядок журналу до книги
+    def _apply(self, book, line):
+        event, _, rest = line.partition("|")
+
+        if event == "add_record":
+            book.add_record(parse_lines([rest], trusted=True)[0])
+            return
+
+        name, _, rest = rest.partition("|")
+        record = book.data.get(name)
+        if record is None: return
+        if event == "del_record":
+            del book[name]
+            return
+
+        if event == "add_phone":
+            record.add_phone([Phone.trusted(phone) for phone in rest.split(", ")])
+        elif event == "del_phone":
+            record.remove_phones([Phone.trusted(phone) for phone in rest.split(", ")])
+        elif event == "edit_phone":
+            old_phone, _, new_phone = rest.partition("|")
+            record.edit_phone(Phone.trusted(old_phone), Phone.trusted(new_phone))
+        elif event == "change_birthday":
+            record.change_birthday(Birthday.trusted(None if rest == "None" else rest))
+
+    # заголовок журналу для поточного знімка
+    def _header(self) -> str:
+        crc, size = 0, 0
+        if self.path.exists():
+            with open(self.path, "rb") as f_read:
+                while block := f_read.read(1024 * 1024):
+                    crc = zlib.crc32(block, crc)
+                    size += len(block)
+        return f"snapshot|{crc}|{size}"
+
+    # чи належить існуючий журнал поточному знімку
+    def _is_current(self) -> bool:
+        if not self.wal_path.exists(): return False
+        with open(self.wal_path, "r") as f_read:
+            return f_read.readline().rstrip("\n") == self._header()
+
+    # атомарно заміняє журнал порожнім журналом для поточного знімка
+    def _reset(self):
+        tmp_path = f"{self.wal_path}.tmp"
+        with open(tmp_path, "w") as f_out:
+            f_out.write(self._header() + "\n")
+            f_out.flush()
+            os.fsync(f_out.fileno())
+        os.replace(tmp_path, self.wal_path)
@@ -0,0 +1,153 @@
+'''
+Статистика виконання команд CLI: лічильники, гістограми затримок, помилки за типами,
+кількість записів та байтів для load/save; експорт у JSON або текстовий формат Prometheus.
+Профілювання обробників команд через cProfile (команда profile on/off).
+'''
+
+import cProfile
+import io
+import json
+import pstats
+import time
+from pathlib import Path
+
+# межі кошиків гістограми затримок (секунди), як у Prometheus: кошик рахує виклики <= межі
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, float("inf"))
+
+
+# статистика однієї команди
+class CommandStats():
+    __slots__ = ("calls", "failures", "total", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.failures = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    # наближений перцентиль за кошиками гістограми (верхня межа кошика)
+    def percentile(self, fraction) -> float:
+        rank, seen = fraction * self.calls, 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank: return min(bound, self.max)
+        return self.max
+
+
+class Metrics():
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self):
+        self.started = time.time()
+        self.commands = {}          # команда -> CommandStats
+        self.errors = {}            # тип виключення -> кількість
+        self.io = {}                # "load"/"save" -> {"records": ..., "bytes": ..., "calls": ...}
+
+    # реєструє виконання команди cmd тривалістю seconds (error - виключення або None)
+    def record(self, cmd, seconds, error=None):
+        stats = self.commands.get(cmd)
+        if stats is None: stats = self.commands[cmd] = CommandStats()
+        stats.calls += 1
+        stats.total += seconds
+        if seconds > stats.max: stats.max = seconds
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                stats.buckets[i] += 1
+                break
+        if error is not None:
+            stats.failures += 1
+            name = type(error).__name__
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    # реєструє кількість записів та байтів, прочитаних або записаних командою (load/save)
+    def add_io(self, operation, records, size):
+        io_stats = self.io.setdefault(operation, {"calls": 0, "records": 0, "bytes": 0})
+        io_stats["calls"] += 1
+        io_stats["records"] += records
+        io_stats["bytes"] += size
+
+    # таблиця для команди stats
+    def report(self) -> str:
+        if not self.commands: return "No commands were executed yet"
+        lines = [f"{'command':18}{'calls':>8}{'failed':>8}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for cmd, stats in sorted(self.commands.items(), key=lambda item: -item[1].total):
+            lines.append(f"{cmd:18}{stats.calls:>8}{stats.failures:>8}{stats.total / stats.calls * 1000:>10.3f}"
+                         f"{stats.percentile(0.5) * 1000:>10.3f}{stats.percentile(0.99) * 1000:>10.3f}{stats.max * 1000:>10.3f}")
+        if self.errors:
+            lines.append("errors: " + ", ".join(f"{name} = {count}" for name, count in sorted(self.errors.items())))
+        for operation, io_stats in sorted(self.io.items()):
+            lines.append(f"{operation}: {io_stats['calls']} times, {io_stats['records']} records, {io_stats['bytes']} bytes")
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        return json.dumps({"uptime_seconds": round(time.time() - self.started, 3),
+                           "commands": {cmd: {"calls": stats.calls, "failures": stats.failures,
+                                              "seconds_total": stats.total, "seconds_max": stats.max,
+                                              "p50_seconds": stats.percentile(0.5), "p99_seconds": stats.percentile(0.99),
+                                              "buckets": dict(zip(map(str, LATENCY_BUCKETS), stats.buckets))}
+                                        for cmd, stats in self.commands.items()},
+                           "errors": self.errors, "io": self.io}, indent=2)
+
+    # текстовий формат Prometheus (exposition format)
+    def to_prometheus(self) -> str:
+        lines = ["# HELP addressbook_command_seconds Command latency.", "# TYPE addressbook_command_seconds histogram"]
+        for cmd, stats in sorted(self.commands.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'addressbook_command_seconds_bucket{{command="{cmd}",le="{le}"}} {cumulative}')
+            lines.append(f'addressbook_command_seconds_sum{{command="{cmd}"}} {stats.total}')
+            lines.append(f'addressbook_command_seconds_count{{command="{cmd}"}} {stats.calls}')
+        lines += ["# HELP addressbook_command_failures_total Commands that raised an exception.",
+                  "# TYPE addressbook_command_failures_total counter"]
+        lines += [f'addressbook_command_failures_total{{command="{cmd}"}} {stats.failures}' for cmd, stats in sorted(self.commands.items())]
+        lines += ["# HELP addressbook_errors_total Exceptions by type.", "# TYPE addressbook_errors_total counter"]
+        lines += [f'addressbook_errors_total{{type="{name}"}} {count}' for name, count in sorted(self.errors.items())]
+        lines += ["# HELP addressbook_io_records_total Records read by load / written by save.", "# TYPE addressbook_io_records_total counter"]
+        lines += [f'addressbook_io_records_total{{operation="{operation}"}} {io_stats["records"]}' for operation, io_stats in sorted(self.io.items())]
+        lines += ["# HELP addressbook_io_bytes_total Bytes read by load / written by save.", "# TYPE addressbook_io_bytes_total counter"]
+        lines += [f'addressbook_io_bytes_total{{operation="{operation}"}} {io_stats["bytes"]}' for operation, io_stats in sorted(self.io.items())]
+        return "\n".join(lines) + "\n"
+
+    # записує статистику у файл: *.json - JSON, інакше - текстовий формат Prometheus
+    def export(self, path) -> str:
+        path = Path(path)
+        text = self.to_json() if path.suffix.lower() == ".json" else self.to_prometheus()
+        with open(path, "w") as f_out:
+            f_out.write(text)
+        return f"The statistics are written to {path}"
+
+
+# профілювання обробників команд (cProfile)
+class Profiler():
+    def __init__(self) -> None:
+        self.profile = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.profile is not None
+
+    def start(self):
+        self.profile = cProfile.Profile()
+
+    # виконує func(*args) під профілюванням
+    def run(self, func, *args):
+        return self.profile.runcall(func, *args)
+
+    #-----------------------------------------
+    # зупиняє профілювання, повертає найгарячіші функції (за власним часом)
+    # якщо профіль не вдалося зберегти у dump_path, профілювання триває (дані не втрачаються)
+    #-------------------------------------------
+    def stop(self, top=15, dump_path=None) -> str:
+        profile = self.profile
+        if not profile.getstats():
+            self.profile = None
+            return "No commands were profiled"
+        if dump_path: profile.dump_stats(dump_path)
+        self.profile = None
+        text = io.StringIO()
+        pstats.Stats(profile, stream=text).strip_dirs().sort_stats("tottime").print_stats(top)
+        return text.getvalue().strip()
@@ -0,0 +1,141 @@
+'''
+Паралельний імпорт великого файлу бази даних (формат Name|Birthday|phone, phone).
+
+Файл ділиться на діапазони байтів, вирівняні по межах рядків; кожен діапазон розбирається
+та перевіряється в окремому процесі (ProcessPoolExecutor). Процес повертає не об'єкти Record,
+а компактні стовпці (імена, дати, кількість телефонів, упаковані телефони), з яких батьківський
+процес збирає записи та додає їх у книгу у порядку файлу.
+
+Рядки з невірним телефоном ("Error phone"), неіснуючою датою або без полів не імпортуються,
+а потрапляють у звіт <файл>.rejected:
+    <номер рядка>|<причина>|<рядок>
+'''
+
+import os
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PhoneRules import ERROR_PHONE, normalizer
+from RecordBook import Record, birthday_to_ordinal, normalize_birthday
+
+# розмір діапазону (в байтах), який розбирає один процес за одне завдання
+RANGE_SIZE = 8 * 1024 * 1024
+
+
+# ділить файл на діапазони (start, end) розміром близько range_size байт, що починаються з початку рядка
+def split_ranges(path, range_size=RANGE_SIZE) -> list[tuple]:
+    size = os.path.getsize(path)
+    ranges, start = [], 0
+    with open(path, "rb") as f_read:
+        while start < size:
+            f_read.seek(min(start + range_size, size))
+            f_read.readline()                   # дочитуємо рядок до кінця
+            end = min(f_read.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+#-----------------------------------------
+# розбирає та перевіряє рядки діапазону байтів (виконується в процесі-виконавці)
+# повертає (names, birthdays, counts, phones, rejected, lines):
+#   names     - імена записів
+#   birthdays - array("l") порядкових номерів дат (0 - невідома)
+#   counts    - array("B") кількості телефонів кожного запису
+#   phones    - array("Q") упакованих телефонів всіх записів підряд
+#   rejected  - список (номер рядка в діапазоні, причина, рядок)
+#   lines     - кількість рядків у діапазоні
+#-------------------------------------------
+def parse_range(path, start, end) -> tuple:
+    with open(path, "rb") as f_read:
+        f_read.seek(start)
+        lines = f_read.read(end - start).decode("utf-8").split("\n")
+    if lines and lines[-1] == "": lines.pop()
+
+    names, birthdays, counts, phones, rejected = [], array("l"), array("B"), array("Q"), []
+    normalize_many = normalizer.normalize_many
+
+    for number, line in enumerate(lines):
+        line = line.rstrip("\r")
+        if not line: continue
+        fields = line.split("|", 2)
+        if len(fields) != 3 or not fields[0]:
+            rejected.append((number, "format", line))
+            continue
+        name, birthday, raw_phones = fields
+
+        if birthday == "None": ordinal = 0
+        else:
+            birthday = normalize_birthday(birthday)
+            if birthday is None:
+                rejected.append((number, "birthday", line))
+                continue
+            ordinal = birthday_to_ordinal(birthday)
+
+        raw_phones = [phone.replace(",", "").strip() for phone in raw_phones.split(", ")]
+        normalized = normalize_many([phone for phone in raw_phones if phone], cache=False)
+        if ERROR_PHONE in normalized or len(normalized) > 255:
+            rejected.append((number, "phone", line))
+            continue
+
+        names.append(name)
+        birthdays.append(ordinal)
+        counts.append(len(normalized))
+        phones.extend(int(phone[1:]) for phone in normalized)
+    return names, birthdays, counts, phones, rejected, len(lines)
+
+
+# збирає записи із стовпців, які повернув parse_range
+def build_records(names, birthdays, counts, phones) -> list[Record]:
+    records, make_record, position = [], Record.packed, 0
+    for name, ordinal, count in zip(names, birthdays, counts):
+        records.append(make_record(name, ordinal, phones[position:position + count]))
+        position += count
+    return records
+
+
+#-----------------------------------------
+# паралельний імпорт файлу path у книгу book
+# workers - кількість процесів (1 - розбір у поточному процесі)
+# одночасно в роботі не більше 2 * workers діапазонів, тому пам'ять не залежить від розміру файлу
+# progress(count, seconds) - викликається після кожного злитого діапазону
+#-------------------------------------------
+def import_parallel(book, path, workers=None, range_size=RANGE_SIZE, progress=None) -> str:
+    started = time.perf_counter()
+    path = Path(path)
+    workers = workers or os.cpu_count() or 1
+    report_path = path.with_name(path.name + ".rejected")
+    ranges = split_ranges(path, range_size)
+    count, rejected_count, line_offset = 0, 0, 0
+
+    with open(report_path, "w") as f_report:
+        def merge(result):
+            nonlocal count, rejected_count, line_offset
+            names, birthdays, counts, phones, rejected, lines = result
+            book.add_records(build_records(names, birthdays, counts, phones))
+            for number, reason, line in rejected:
+                f_report.write(f"{line_offset + number + 1}|{reason}|{line}\n")
+            count += len(names)
+            rejected_count += len(rejected)
+            line_offset += lines
+            if progress: progress(count, time.perf_counter() - started)
+
+        if workers == 1:
+            for start, end in ranges: merge(parse_range(path, start, end))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for start, end in ranges:
+                    pending.append(executor.submit(parse_range, path, start, end))
+                    if len(pending) >= 2 * workers: merge(pending.popleft().result())
+                while pending: merge(pending.popleft().result())
+
+    if not rejected_count: report_path.unlink()
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed else 0
+    result = f"The database has been imported = {count} records with {workers} workers ({rate:.0f} records/s)"
+    if rejected_count: result += f", {rejected_count} lines rejected - see {report_path}"
+    return result
@@ -0,0 +1,122 @@
+'''
+Нормалізація телефонів за таблицею правил країн.
+
+Рядок таблиці правил (поля через "|"):
+    країна|код країни|довжини номера в міжнародному форматі|локальні префікси|довжина локального номера|локальна частина, що відкидається
+
+Приклад: UA|38|12|050,066,...|10|
+    +380501113330, 380501113330 -> +380501113330   (12 цифр, починається з 38)
+    050 111 33 30               -> +380501113330   (10 цифр, локальний префікс 050 -> "38" + номер)
+Приклад: GB|44|12|07|11|0
+    07911 123456                -> +447911123456   (локальний "0" відкидається)
+'''
+
+import re
+
+# лише ASCII-цифри: \d та str.isdigit приймають також "²", "５" тощо, які не перетворюються на int
+NON_DIGITS = re.compile(r"[^0-9]")
+ERROR_PHONE = "Error phone"     # невірний формат телефона
+
+DEFAULT_RULES = """\
+UA|38|12|039,050,063,066,067,068,073,093,095,096,097,098,099|10|
+PL|48|11|||
+GB|44|12|07|11|0
+DE|49|12,13|015,016,017|11,12|0
+US|1|11|||
+MD|373|11|06,07|9|0
+RO|40|11|07|10|0
+CZ|420|12|||
+SK|421|12|09|10|0
+LT|370|11|||
+LV|371|11|||
+EE|372|10,11|||
+HU|36|11|||
+IL|972|12|05|10|0
+"""
+
+
+class PhoneNormalizer():
+    def __init__(self, rules: str = DEFAULT_RULES, cache_size: int = 100_000) -> None:
+        self.countries = []
+        self._international = {}    # код країни -> frozenset допустимих довжин
+        self._local = {}            # довжина локального номера -> {локальний префікс: (код країни, що відкидається)}
+        self._local_prefix_lengths = set()
+
+        for line in rules.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"): continue
+            country, code, lengths, local_prefixes, local_lengths, trunk = line.split("|")
+            self.countries.append(country)
+            self._international[code] = self._international.get(code, frozenset()) | frozenset(map(int, lengths.split(",")))
+            for local_length in filter(None, local_lengths.split(",")):
+                for prefix in filter(None, local_prefixes.split(",")):
+                    self._local.setdefault(int(local_length), {}).setdefault(prefix, (code, trunk))
+                    self._local_prefix_lengths.add(len(prefix))
+
+        # довжина номера -> ((довжина коду, множина кодів), ...) - перевіряються лише можливі коди
+        by_length = {}
+        for code, lengths in self._international.items():
+            for length in lengths:
+                by_length.setdefault(length, {}).setdefault(len(code), set()).add(code)
+        self._codes_by_length = {length: tuple((code_length, frozenset(codes)) for code_length, codes in sorted(groups.items()))
+                                 for length, groups in by_length.items()}
+        self._local_prefix_lengths = sorted(self._local_prefix_lengths, reverse=True)   # найдовший префікс перший
+        # кеш результатів для повторних номерів (очищується, коли заповнений)
+        self.cache_size = cache_size
+        self._cache = {}
+
+    # таблиця правил з файлу того ж формату, що й DEFAULT_RULES
+    @classmethod
+    def from_file(cls, path, cache_size: int = 100_000):
+        with open(path, "r") as f_read:
+            return cls(f_read.read(), cache_size)
+
+    # нормалізує телефон до формату +<код країни><номер> або повертає "Error phone"
+    def normalize(self, raw: str) -> str:
+        result = self._cache.get(raw)
+        if result is None:
+            result = self._normalize(raw)
+            self._remember(raw, result)
+        return result
+
+    # пакетна нормалізація списку телефонів
+    # cache=False - для потоку переважно унікальних номерів (завантаження бази), де кеш лише заважає
+    def normalize_many(self, raws, cache=True) -> list[str]:
+        if not cache: return list(map(self._normalize, raws))
+        cache_get, normalize, remember = self._cache.get, self._normalize, self._remember
+        result = []
+        for raw in raws:
+            phone = cache_get(raw)
+            if phone is None:
+                phone = normalize(raw)
+                remember(raw, phone)
+            result.append(phone)
+        return result
+
+    def _remember(self, raw, phone):
+        if len(self._cache) >= self.cache_size:
+            if not self.cache_size: return
+            self._cache.clear()
+        self._cache[raw] = phone
+
+    def _normalize(self, raw: str) -> str:
+        # звичайні роздільники прибираються str.replace, регулярний вираз - лише для решти
+        digits = raw.replace(" ", "").replace("-", "").replace("(", "").replace(")", "").lstrip("+")
+        if not (digits.isascii() and digits.isdigit()): digits = NON_DIGITS.sub("", raw)
+        length = len(digits)
+
+        # міжнародний формат: номер починається з коду країни
+        for code_length, codes in self._codes_by_length.get(length, ()):
+            if digits[:code_length] in codes: return "+" + digits
+
+        # локальний формат: префікс оператора, код країни додається
+        prefixes = self._local.get(length)
+        if prefixes:
+            for prefix_length in self._local_prefix_lengths:
+                rule = prefixes.get(digits[:prefix_length])
+                if rule is not None: return f"+{rule[0]}{digits[len(rule[1]):]}"
+        return ERROR_PHONE
+
+
+# нормалізатор за замовчуванням (таблиця DEFAULT_RULES)
+normalizer = PhoneNormalizer()
@@ -1,173 +1,691 @@
-
-from collections import UserDict
-from collections.abc import Iterator
-import re
-import datetime
-
-# батьківський клас
-class Field():
-    def __init__(self, value) -> None:
-        self.__value = None
-        self.value = value
-    
-    
-# клас Ім'я
-class Name(Field):
-    @property
-    def value(self):
-        return self.__value
-    
-    @value.setter
-    def value(self, new_value):
-        self.__value = new_value
-
-
-# клас Телефон
-class Phone(Field): 
-    @property
-    def value(self):
-        return self.__value 
-    
-    @value.setter
-    def value(self, new_value):
-        result = re.sub("\D", "", new_value) 
-        
-        if len(result) == 12 and result.startswith("38"): self.__value = f"+{result}"
-        elif len(result) == 10 and result[:3] in ["093", "073", "063",\
-                                                "050", "066", "099", "095", "097", "067",\
-                                                "039", "068", "096", "098"]: self.__value = f"+38{result}"
-        elif len(result) != 12: 
-            self.__value = "Error phone"   # невірний формат телефона
-        
-        
-# клас День народження        
-class Birthday(Field):
-    @property
-    def value(self):
-        return self.__value
-    
-    @value.setter
-    def value(self, new_birthday:str):
-        pattern = r"^\d{2}(\.|\-|\/)\d{2}\1\d{4}$"  # дозволені дати формату DD.MM.YYYY 
-        if re.match(pattern, new_birthday):         # альтернатива для крапки: "-" "/"
-            self.__value = re.sub("[-/]", ".", new_birthday)  # комбінувати символи ЗАБОРОНЕНО DD.MM-YYYY 
-        else: self.__value = None
-
-
-#========================================================
-# Класс Record, который отвечает за логику 
-#  - добавления/удаления/редактирования
-# необязательных полей и хранения обязательного поля Name
-#=========================================================
-class Record():
-    def __init__(self, name: Name, birthday: Birthday=None, phones: list[Phone]=None) -> None:
-        self.name = name            
-        self.birthday = birthday
-        self.phones = []            
-        self.phones.extend(phones)
-    
-    # Done - розширюємо існуючий список телефонів особи - Done
-    # НОВИМ телефоном або декількома телефонами для особи - Done
-    def add_phone(self, new_phone: list[Phone]) -> str:
-        self.phones.extend(new_phone)
-        return f"The phones was/were added - [bold green]success[/bold green]"
-    
-    # Done - видаляємо телефони із списку телефонів особи - Done!
-    def del_phone(self, del_phone: Phone) -> str:
-        error = True
-        for phone in self.phones:
-                if phone.value == del_phone.value: 
-                    self.phones.remove(phone) 
-                    error = False  #видалення пройшло з успіхом
-                    break
-        if error: return f"The error has occurred. You entered an incorrect phone number."
-        else: return f"The phone {phone.value} was deleted - [bold green]success[/bold green]"
-    
-    # Done = редагування запису(телефону) у книзі особи - Done
-    def edit_phone(self, old_phone: Phone, new_phone: Phone) -> str:
-        index = next((i for i, obj in enumerate(self.phones) if obj.value == old_phone.value), -1)
-        self.phones[index]= new_phone
-        return f"The person {self.name.value} has a new phone {new_phone.value} - [bold green]success[/bold green]"
-    
-    # повертає кількість днів до наступного дня народження
-    def days_to_birthday(self, now_date: datetime):
-        if self.birthday.value:
-            now_year = now_date.year
-            
-             # Определяем формат строки для Даты
-            date_format = "%d.%m.%Y %H:%M:%S"
-            # Строка с Датой народження
-            date_string = f"{self.birthday.value} 00:00:00"  
-            dt = datetime.datetime.strptime(date_string, date_format)
-            
-            birthday = datetime.datetime(day=dt.day, month=dt.month, year=now_year)
-            
-            if now_date > birthday:
-                birthday = birthday.replace(year=now_date.year + 1)
-                dif = birthday - now_date
-                return f"до {birthday.strftime('%d.%m.%Y')} залишилося = {dif}"
-            else:
-                dif = birthday - now_date
-                return f"до {self.birthday.value} залишилося = {dif}"
-        else: return f"We have no information about {self.name.value}'s birthday."
-    
-    # змінює день народження для особи
-    def change_birthday(self, birthday: Birthday):
-        self.birthday = birthday
-        return f"Birthday for {self.name.value} is changed - [bold green]success[/bold green]"
-        
-
-    
-class AddressBook(UserDict):
-    
-    def add_record(self, record):
-        self.data[record.name.value] = record
-    
-    # завантаження записів книги із файлу
-    def load_database(self, book, path):
-        with open(path, "r") as f_read:
-            while True:                
-                line = f_read.readline()
-                if not line:
-                    break
-                if line[-1] == "\n":
-                    line = line[:-1]
-                
-                rec = line.split("|")    
-                rec = Record(name=Name(rec[0]),
-                             birthday=Birthday(rec[1]),
-                             phones=list(map(lambda phone : Phone(re.sub(",", "", phone).strip()), rec[2].split(", "))))
-                self.add_record(rec)
-        return f"The database has been loaded = {len(book)} records"
-    
-    #-----------------------------------------
-    # збереження записів книги у файл  
-    # формат збереження даних:
-    #
-    # Lisa|15.08.1984|+44345345345, +89777111222, +99222333
-    # Alex|None|+380954448899, +450342233     
-    #-------------------------------------------
-    def save_database(self, book, path):
-        with open(path, "w") as f_out:
-            f_out.write("\n".join(["|".join([name, str(record.birthday.value), ", ".join(phone.value for phone in record.phones)]) for name, record in book.data.items()]))
-        return f"The database is saved = {len(book)} records"  
-    
-    # ітератор посторінкового друку
-    def __iter__(self):
-        return self._record_generator()
-    
-    # генератор посторінкового друку
-    def _record_generator(self, N=1):
-        records = list(self.data.values())
-        total_records = len(records)
-        current_index = 0
-        
-        while current_index < total_records:
-            batch = records[current_index: current_index + N]
-            current_index += N
-            yield batch
-    
-    
-    
-          
-        
+
+from array import array
+from collections import UserDict
+from collections.abc import Iterator
+import calendar
+import re
+import datetime
+import itertools
+import os
+import time
+
+from PhoneRules import NON_DIGITS, normalizer
+from RenderCache import RenderCache
+from SearchIndex import NameIndex, PhoneDigitsIndex
+
+# розмір блоку (в байтах), яким читається файл бази даних
+LOAD_CHUNK_SIZE = 4 * 1024 * 1024
+# з якої кількості записів масові операції будують індекс імен заново, а не змінюють його по одному
+BULK_REINDEX = 100
+# найбільша кількість рядків записів у кеші друку (AddressBook.render)
+RENDER_CACHE_SIZE = 100_000
+# нечіткий пошук (search): найкоротший запит та найбільша кількість переглянутих імен за один обхід індексу
+FUZZY_MIN_LENGTH = 3
+FUZZY_BUDGET = 500
+
+# прекомпільовані шаблони для нормалізації дат
+BIRTHDAY_PATTERN = re.compile(r"^\d{2}(\.|\-|\/)\d{2}\1\d{4}$")  # дозволені дати формату DD.MM.YYYY 
+BIRTHDAY_SEPARATORS = re.compile("[-/]")
+
+
+# нормалізує телефон до формату +<код країни><номер> або повертає "Error phone"
+# (правила країн та операторів - PhoneRules.DEFAULT_RULES)
+def normalize_phone(raw: str) -> str:
+    return normalizer.normalize(raw)
+
+
+# нормалізує дату народження до формату DD.MM.YYYY або повертає None
+def normalize_birthday(raw: str):
+    if BIRTHDAY_PATTERN.match(raw):                      # альтернатива для крапки: "-" "/"
+        birthday = BIRTHDAY_SEPARATORS.sub(".", raw)     # комбінувати символи ЗАБОРОНЕНО DD.MM-YYYY 
+        try:
+            birthday_to_ordinal(birthday)                # неіснуюча дата, наприклад 31.02.1990
+        except ValueError:
+            return None
+        return birthday
+    return None
+
+
+#-----------------------------------------
+# компактне зберігання полів у Record:
+#   телефон  -> ціле число з цифр E.164 (+380501113330 -> 380501113330), 0 - "Error phone"
+#   день народження -> порядковий номер дати (date.toordinal()), 0 - невідомий
+#-------------------------------------------
+def pack_phone(value) -> int:
+    return int(value[1:]) if is_valid_phone(value) else 0
+
+
+def unpack_phone(packed: int) -> str:
+    return f"+{packed}" if packed else "Error phone"
+
+
+def birthday_to_ordinal(value) -> int:
+    if not value: return 0
+    day, month, year = value.split(".")
+    return datetime.date(int(year), int(month), int(day)).toordinal()
+
+
+def ordinal_to_birthday(ordinal: int):
+    if not ordinal: return None
+    date = datetime.date.fromordinal(ordinal)
+    return f"{date.day:02d}.{date.month:02d}.{date.year:04d}"
+
+
+# дата дня народження (month, day) у році year; 29 лютого у невисокосний рік святкується 28 лютого
+def birthday_in_year(month: int, day: int, year: int) -> datetime.date:
+    if month == 2 and day == 29 and not calendar.isleap(year): day = 28
+    return datetime.date(year, month, day)
+
+
+# найближчий (сьогодні або пізніше) день народження для дати народження з порядковим номером ordinal
+def next_birthday(ordinal: int, today: datetime.date) -> datetime.date:
+    born = datetime.date.fromordinal(ordinal)
+    birthday = birthday_in_year(born.month, born.day, today.year)
+    if birthday < today: birthday = birthday_in_year(born.month, born.day, today.year + 1)
+    return birthday
+
+
+# батьківський клас
+class Field():
+    __slots__ = ("_value",)
+    
+    def __init__(self, value) -> None:
+        self._value = None
+        self.value = value
+    
+    # створює поле із вже перевіреного значення, минаючи setter (швидкий шлях завантаження)
+    @classmethod
+    def trusted(cls, value):
+        field = cls.__new__(cls)
+        field._value = value
+        return field
+    
+    
+# клас Ім'я
+class Name(Field):
+    __slots__ = ()
+    
+    @property
+    def value(self):
+        return self._value
+    
+    @value.setter
+    def value(self, new_value):
+        self._value = new_value
+
+
+# клас Телефон
+class Phone(Field): 
+    __slots__ = ()
+    
+    @property
+    def value(self):
+        return self._value 
+    
+    @value.setter
+    def value(self, new_value):
+        self._value = normalize_phone(new_value)
+
+        
+# перевіряє, що телефон нормалізований (а не "Error phone" чи None)
+def is_valid_phone(value) -> bool:
+    return bool(value) and value.startswith("+")
+
+
+# клас День народження        
+class Birthday(Field):
+    __slots__ = ()
+    
+    @property
+    def value(self):
+        return self._value
+    
+    @value.setter
+    def value(self, new_birthday:str):
+        self._value = normalize_birthday(new_birthday)
+
+
+#========================================================
+# Класс Record, который отвечает за логику 
+#  - добавления/удаления/редактирования
+# необязательных полей и хранения обязательного поля Name
+#=========================================================
+#
+# Поля зберігаються компактно (див. pack_phone/birthday_to_ordinal), а name, birthday
+# та phones повертають легкі об'єкти Name/Birthday/Phone, створені на льоту.
+#=========================================================
+class Record():
+    __slots__ = ("_name", "_birthday", "_phones", "_book")
+    
+    def __init__(self, name: Name, birthday: Birthday=None, phones: list[Phone]=None) -> None:
+        self._name = name.value
+        self._birthday = birthday_to_ordinal(birthday.value) if birthday else 0
+        self._phones = array("Q", [pack_phone(phone.value) for phone in phones or ()])
+        self._book = None           # книга, до якої належить запис (для підтримки індексів)
+    
+    # створює запис із вже упакованих значень (швидкий шлях завантаження)
+    @classmethod
+    def packed(cls, name: str, birthday: int, phones: array):
+        record = cls.__new__(cls)
+        record._name, record._birthday, record._phones, record._book = name, birthday, phones, None
+        return record
+    
+    # копія запису, що не належить жодній книзі
+    def copy(self):
+        return Record.packed(self._name, self._birthday, array("Q", self._phones))
+    
+    @property
+    def name(self) -> Name:
+        return Name.trusted(self._name)
+    
+    @name.setter
+    def name(self, name: Name):
+        self._name = name.value
+    
+    @property
+    def birthday(self) -> Birthday:
+        return Birthday.trusted(ordinal_to_birthday(self._birthday))
+    
+    @birthday.setter
+    def birthday(self, birthday: Birthday):
+        self._birthday = birthday_to_ordinal(birthday.value) if birthday else 0
+    
+    @property
+    def phones(self) -> list[Phone]:
+        return [Phone.trusted(unpack_phone(packed)) for packed in self._phones]
+    
+    @phones.setter
+    def phones(self, phones: list[Phone]):
+        self._phones = array("Q", [pack_phone(phone.value) for phone in phones])
+    
+    # Done - розширюємо існуючий список телефонів особи - Done
+    # НОВИМ телефоном або декількома телефонами для особи - Done
+    # телефони, які вже є у записі (або повторюються у списку), не додаються
+    def add_phone(self, new_phone: list[Phone]) -> str:
+        present, added = set(self._phones), []
+        if self._book is not None: self._book._record_changing(self._name)
+        for phone in new_phone:
+            packed = pack_phone(phone.value)
+            if packed in present: continue
+            present.add(packed)
+            self._phones.append(packed)
+            added.append(phone)
+        if not added: return f"The phones are already in the record of {self._name}"
+        if self._book is not None: self._book._record_changed("add_phone", self, added)
+        return f"The phones was/were added - [bold green]success[/bold green]"
+    
+    # Done - видаляємо телефони із списку телефонів особи - Done!
+    def del_phone(self, del_phone: Phone) -> str:
+        packed = pack_phone(del_phone.value)
+        if packed not in self._phones: return f"The error has occurred. You entered an incorrect phone number."
+        
+        self.remove_phones([del_phone])
+        return f"The phone {unpack_phone(packed)} was deleted - [bold green]success[/bold green]"
+    
+    # видаляє всі входження телефонів phones (множина або список) за один прохід
+    def remove_phones(self, phones) -> str:
+        removing = {pack_phone(phone.value) for phone in phones}
+        kept = array("Q", [packed for packed in self._phones if packed not in removing])
+        removed = [Phone.trusted(unpack_phone(packed)) for packed in dict.fromkeys(self._phones) if packed in removing]
+        if not removed: return f"The error has occurred. You entered an incorrect phone number."
+        
+        if self._book is not None: self._book._record_changing(self._name)
+        self._phones = kept
+        if self._book is not None: self._book._record_changed("del_phone", self, removed)
+        return f"The phones {', '.join(phone.value for phone in removed)} were deleted - [bold green]success[/bold green]"
+    
+    # заміняє телефони запису на phones (множина або список) за один прохід:
+    # спостерігачі отримують видалені (del_phone) та додані (add_phone) телефони
+    def replace_phones(self, phones) -> str:
+        new = array("Q", dict.fromkeys(pack_phone(phone.value) for phone in phones))
+        new_set, old_set = set(new), set(self._phones)
+        removed = [Phone.trusted(unpack_phone(packed)) for packed in dict.fromkeys(self._phones) if packed not in new_set]
+        added = [Phone.trusted(unpack_phone(packed)) for packed in new if packed not in old_set]
+        
+        if self._book is not None: self._book._record_changing(self._name)
+        self._phones = new
+        if self._book is not None:
+            if removed: self._book._record_changed("del_phone", self, removed)
+            if added: self._book._record_changed("add_phone", self, added)
+        return f"The phones of {self._name} were replaced - [bold green]success[/bold green]"
+    
+    # Done = редагування запису(телефону) у книзі особи - Done
+    def edit_phone(self, old_phone: Phone, new_phone: Phone) -> str:
+        packed = pack_phone(old_phone.value)
+        if packed not in self._phones: return f"The error has occurred. You entered an incorrect phone number."
+        
+        if self._book is not None: self._book._record_changing(self._name)
+        self._phones[self._phones.index(packed)] = pack_phone(new_phone.value)
+        replaced = Phone.trusted(unpack_phone(packed))
+        if self._book is not None: self._book._record_changed("edit_phone", self, replaced, new_phone)
+        return f"The person {self._name} has a new phone {new_phone.value} - [bold green]success[/bold green]"
+    
+    # повертає кількість днів до наступного дня народження
+    def days_to_birthday(self, now_date: datetime):
+        if self._birthday:
+            # дата народження зберігається порядковим номером, тому strptime не потрібен
+            birthday = next_birthday(self._birthday, now_date.date())
+            dif = (birthday - now_date.date()).days
+            return f"до {birthday.strftime('%d.%m.%Y')} залишилося = {dif} days"
+        else: return f"We have no information about {self._name}'s birthday."
+    
+    # змінює день народження для особи
+    def change_birthday(self, birthday: Birthday):
+        if self._book is not None: self._book._record_changing(self._name)
+        old_birthday = self.birthday
+        self.birthday = birthday
+        if self._book is not None: self._book._record_changed("change_birthday", self, old_birthday)
+        return f"Birthday for {self.name.value} is changed - [bold green]success[/bold green]"
+        
+
+
+# представлення запису у форматі файлу бази даних Name|Birthday|phone, phone
+def record_line(record) -> str:
+    return f"{record._name}|{ordinal_to_birthday(record._birthday)}|{', '.join(map(unpack_phone, record._phones))}"
+
+
+# записує рядки записів через write(text) блоками по chunk_records записів, повертає кількість записів
+# line(record) - представлення запису (за замовчуванням - формат файлу бази даних)
+def write_records(records, write, chunk_records=10_000, line=record_line) -> int:
+    count, chunk = 0, []
+    for record in records:
+        chunk.append(line(record))
+        if len(chunk) >= chunk_records:
+            write("\n".join(chunk) + "\n")
+            count += len(chunk)
+            chunk = []
+    if chunk: write("\n".join(chunk) + "\n")
+    return count + len(chunk)
+
+
+#-----------------------------------------
+# розбір блоку рядків формату Name|Birthday|phone, phone у записи
+# trusted=True - значення вже нормалізовані (файл записала книга), setter-и не викликаються
+# рядки без трьох полів пропускаються (звіт про них формує import, див. ParallelImport)
+#-------------------------------------------
+def parse_lines(lines: list[str], trusted=False) -> list[Record]:
+    records = []
+    make_record, normalize_many = Record.packed, normalizer.normalize_many
+    
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line or line.count("|") < 2: continue
+        name, birthday, phones = line.split("|", 2)
+        phones = [phone.replace(",", "").strip() for phone in phones.split(", ")]
+        phones = [phone for phone in phones if phone]
+        
+        if trusted:
+            birthday = None if birthday == "None" else birthday
+            phones = array("Q", [int(phone[1:]) if phone[0] == "+" else 0 for phone in phones])
+        else:
+            birthday = normalize_birthday(birthday)
+            phones = array("Q", [pack_phone(phone) for phone in normalize_many(phones, cache=False)])
+        records.append(make_record(name, birthday_to_ordinal(birthday), phones))
+    return records
+
+    
+class AddressBook(UserDict):
+    
+    def __init__(self, *args, **kwargs):
+        # зворотний індекс: упакований телефон -> ім'я власника (або множина імен, якщо власників декілька)
+        # (будується при першому зверненні, далі підтримується інкрементально)
+        self._phone_index = None
+        # календарний індекс: (місяць, день) -> множина імен з днем народження цього дня
+        self._birthday_index = None
+        # пошукові індекси: відсортовані імена та склеєні цифри телефонів
+        # (зміни телефонів потрапляють у хвіст індексу цифр, див. PhoneDigitsIndex.update)
+        self._name_index = None
+        self._phone_digits = None
+        # спостерігачі змін книги: об'єкти з методом on_change(event, record, *args)
+        self.observers = []
+        # рядки записів для друку (скидаються при зміні запису)
+        self.render_cache = RenderCache(RENDER_CACHE_SIZE)
+        super().__init__(*args, **kwargs)
+    
+    @property
+    def birthday_index(self) -> dict:
+        if self._birthday_index is None:
+            self._birthday_index = {}
+            for record in self.data.values():
+                self._index_birthday(record, record._birthday)
+        return self._birthday_index
+    
+    @property
+    def name_index(self) -> NameIndex:
+        if self._name_index is None:
+            self._name_index = NameIndex(self.data.keys())
+        return self._name_index
+    
+    @property
+    def phone_digits(self) -> PhoneDigitsIndex:
+        if self._phone_digits is None:
+            self._phone_digits = PhoneDigitsIndex(self.data.values())
+        return self._phone_digits
+    
+    @property
+    def phone_index(self) -> dict:
+        if self._phone_index is None:
+            self._phone_index = {}
+            for record in self.data.values():
+                self._index_phones(record, record._phones)
+        return self._phone_index
+    
+    def add_record(self, record):
+        self._record_changing(record._name)
+        old = self.data.get(record._name)
+        if old is not None:                     # запис з таким ім'ям перезаписується
+            old._book = None
+            self._unindex_phones(old, old._phones)
+            self._unindex_birthday(old, old._birthday)
+        elif self._name_index is not None:
+            self._name_index.add(record._name)
+        self.data[record._name] = record
+        record._book = self
+        self._index_phones(record, record._phones)
+        self._index_birthday(record, record._birthday)
+        self._update_phone_digits(record._name, record._phones)
+        self.render_cache.invalidate(record._name)
+        self._notify("add_record", record)
+    
+    def __setitem__(self, name, record):
+        self.add_record(record)
+    
+    def __delitem__(self, name):
+        if name in self.data: self._record_changing(name)
+        record = self.data.pop(name)
+        record._book = None
+        self._unindex_phones(record, record._phones)
+        self._unindex_birthday(record, record._birthday)
+        if self._name_index is not None: self._name_index.remove(name)
+        self._update_phone_digits(name, ())
+        self.render_cache.invalidate(name)
+        self._notify("del_record", record)
+    
+    #-----------------------------------------
+    # масове додавання або заміна записів за один прохід, повертає (додано, замінено)
+    # при великій кількості записів індекс імен будується заново при наступному пошуку
+    # замість вставки кожного імені у відсортований масив (O(n) на одну вставку)
+    #-------------------------------------------
+    def upsert_many(self, records) -> tuple:
+        records = list(records)
+        if len(records) > BULK_REINDEX: self._name_index = None
+        added = 0
+        for record in records:
+            if record._name not in self.data: added += 1
+            self.add_record(record)
+        return added, len(records) - added
+    
+    # масове видалення записів за іменами, повертає кількість видалених
+    def delete_many(self, names) -> int:
+        names = [name for name in dict.fromkeys(names) if name in self.data]
+        if len(names) > BULK_REINDEX: self._name_index = None
+        for name in names:
+            del self[name]
+        return len(names)
+    
+    # масове додавання записів (без перевірок перезапису - індекси будуються заново)
+    def add_records(self, records):
+        data = self.data
+        for record in records:
+            old = data.get(record._name)
+            if old is not None: old._book = None
+            data[record._name] = record
+            record._book = self
+        self._phone_index = None
+        self._birthday_index = None
+        self._name_index = None
+        self._phone_digits = None
+        self.render_cache.clear()
+    
+    #-----------------------------------------
+    # зміна запису, що належить книзі (викликається методами Record)
+    # події: "add_phone" (phones), "del_phone" (phones),
+    #        "edit_phone" (old_phone, new_phone), "change_birthday" (old_birthday)
+    #-------------------------------------------
+    def _record_changed(self, event, record, *args):
+        self.render_cache.invalidate(record._name)
+        if event in ("add_phone", "del_phone", "edit_phone"): self._update_phone_digits(record._name, record._phones)
+        
+        if event in ("add_phone", "del_phone"):
+            packed = [pack_phone(phone.value) for phone in args[0]]
+            if event == "add_phone": self._index_phones(record, packed)
+            else: self._unindex_phones(record, packed)
+        elif event == "edit_phone":
+            self._unindex_phones(record, [pack_phone(args[0].value)])
+            self._index_phones(record, [pack_phone(args[1].value)])
+        elif event == "change_birthday":
+            self._unindex_birthday(record, birthday_to_ordinal(args[0].value))
+            self._index_birthday(record, record._birthday)
+        self._notify(event, record, *args)
+    
+    # телефони запису name змінилися: індекс цифр оновлюється інкрементально,
+    # а після PhoneDigitsIndex.TAIL_LIMIT змінених записів будується заново при наступному пошуку
+    def _update_phone_digits(self, name, packed_phones):
+        if self._phone_digits is None: return
+        if not self._phone_digits.update(name, packed_phones): self._phone_digits = None
+    
+    # запис name зараз зміниться (викликається до зміни методами Record та книги):
+    # спостерігачі з методом before_change(book, name) ще бачать попередній стан запису (History)
+    def _record_changing(self, name):
+        for observer in self.observers:
+            before_change = getattr(observer, "before_change", None)
+            if before_change is not None: before_change(self, name)
+    
+    # повідомляє спостерігачів про зміну книги
+    def _notify(self, event, record, *args):
+        for observer in self.observers:
+            observer.on_change(event, record, *args)
+    
+    # додає упаковані телефони запису до зворотного індексу
+    def _index_phones(self, record, packed_phones):
+        if self._phone_index is None: return
+        index, name = self._phone_index, record._name
+        for packed in packed_phones:
+            if not packed: continue                 # "Error phone" не індексується
+            owners = index.get(packed)
+            if owners is None: index[packed] = name
+            elif isinstance(owners, set): owners.add(name)
+            elif owners != name: index[packed] = {owners, name}
+    
+    # прибирає упаковані телефони запису із зворотного індексу
+    def _unindex_phones(self, record, packed_phones):
+        if self._phone_index is None: return
+        index, name = self._phone_index, record._name
+        for packed in packed_phones:
+            owners = index.get(packed)
+            # у записі може залишитися копія цього ж номера
+            if owners is None or (record._book is self and packed in record._phones): continue
+            if isinstance(owners, set):
+                owners.discard(name)
+                if len(owners) == 1: index[packed] = owners.pop()
+            elif owners == name: del index[packed]
+    
+    # додає запис до календарного індексу
+    def _index_birthday(self, record, ordinal):
+        if self._birthday_index is None or not ordinal: return
+        born = datetime.date.fromordinal(ordinal)
+        self._birthday_index.setdefault((born.month, born.day), set()).add(record._name)
+    
+    # прибирає запис із календарного індексу
+    def _unindex_birthday(self, record, ordinal):
+        if self._birthday_index is None or not ordinal: return
+        born = datetime.date.fromordinal(ordinal)
+        names = self._birthday_index.get((born.month, born.day))
+        if names is None: return
+        names.discard(record._name)
+        if not names: del self._birthday_index[(born.month, born.day)]
+    
+    #-----------------------------------------
+    # дні народження у найближчі days днів, починаючи з today (включно)
+    # повертає список (дата святкування, запис), впорядкований за датою;
+    # 29 лютого у невисокосний рік потрапляє на 28 лютого.
+    # Вартість - O(days + результат), а не O(розміру книги)
+    #-------------------------------------------
+    def upcoming_birthdays(self, days: int, today: datetime.date=None) -> list:
+        today = today or datetime.date.today()
+        index, result, seen = self.birthday_index, [], set()
+        
+        for offset in range(min(days, 366)):
+            date = today + datetime.timedelta(days=offset)
+            keys = [(date.month, date.day)]
+            if date.month == 2 and date.day == 28 and not calendar.isleap(date.year): keys.append((2, 29))
+            for key in keys:
+                for name in sorted(index.get(key, ())):
+                    if name in seen: continue           # за рік вікно може дійти до тієї ж дати
+                    seen.add(name)
+                    result.append((date, self.data[name]))
+        return result
+    
+    #-----------------------------------------
+    # пошук за текстом: точне ім'я, префікс імені, підрядок цифр телефону
+    # та нечіткий збіг імені (відстань Левенштейна <= 2) - лише якщо ім'я чи префікс не знайдено,
+    # спочатку з відстанню 1, потім 2 (обхід індексу обмежений FUZZY_BUDGET)
+    # повертає не більше limit пар (вид збігу, запис), впорядкованих за видом збігу
+    #-------------------------------------------
+    def search(self, text: str, limit: int = 10) -> list[tuple]:
+        text = text.strip()
+        results, seen = [], set()
+        
+        def take(kind, names):
+            for name in names:
+                if len(results) >= limit: return
+                if name in seen: continue
+                seen.add(name)
+                results.append((kind, self.data[name]))
+        
+        digits = NON_DIGITS.sub("", text)
+        if any(char.isalpha() for char in text):
+            take("name", [name for name in (text, text.capitalize()) if name in self.data])
+            take("prefix", self.name_index.prefix(text, limit))
+        if digits and len(digits) == len(text.lstrip("+").replace(" ", "")):
+            take("phone", self.phone_digits.search(digits, limit))
+        if any(char.isalpha() for char in text) and not results and len(text) >= FUZZY_MIN_LENGTH:
+            for max_distance in (1, 2):
+                matches = self.name_index.fuzzy(text, max_distance, FUZZY_BUDGET)
+                if matches: break
+            for distance, name in sorted(matches):
+                take(f"fuzzy {distance}", [name])
+        return results
+    
+    # імена власників упакованого телефону
+    def _owners(self, packed) -> set:
+        owners = self.phone_index.get(packed) if packed else None
+        if owners is None: return set()
+        return set(owners) if isinstance(owners, set) else {owners}
+    
+    # повертає записи, яким належить телефон (O(1) за індексом)
+    def find_phone(self, phone: Phone) -> list[Record]:
+        return [self.data[name] for name in sorted(self._owners(pack_phone(phone.value)))]
+    
+    # перевіряє, чи належить телефон особі
+    def has_phone(self, name, phone: Phone) -> bool:
+        return name in self._owners(pack_phone(phone.value))
+    
+    # повертає {телефон: власники} для номерів, які вже є у книзі в інших осіб (або дублюються у списку)
+    def find_duplicates(self, phones: list[Phone], name=None) -> dict:
+        duplicates, seen = {}, set()
+        for phone in phones:
+            if not is_valid_phone(phone.value): continue
+            owners = self._owners(pack_phone(phone.value))
+            if owners or phone.value in seen:
+                duplicates[phone.value] = sorted(owners | ({name} if phone.value in seen else set()))
+            seen.add(phone.value)
+        return duplicates
+    
+    #-----------------------------------------
+    # завантаження записів книги із файлу
+    # файл читається блоками по chunk_size байт, тому пам'ять обмежена розміром блоку;
+    # trusted=True - швидкий шлях для файлів, які записала сама книга (без повторної перевірки)
+    # progress(count, seconds) - викликається приблизно кожні progress_every записів
+    #-------------------------------------------
+    def load_database(self, book, path, trusted=False, chunk_size=LOAD_CHUNK_SIZE, progress=None, progress_every=100_000):
+        started = time.perf_counter()
+        count, next_report = 0, progress_every
+        
+        with open(path, "r", buffering=chunk_size) as f_read:
+            while True:
+                lines = f_read.readlines(chunk_size)
+                if not lines:
+                    break
+                records = parse_lines(lines, trusted)
+                self.add_records(records)
+                
+                count += len(records)
+                if progress and count >= next_report:
+                    progress(count, time.perf_counter() - started)
+                    next_report = count + progress_every
+        
+        elapsed = time.perf_counter() - started
+        rate = count / elapsed if elapsed else 0
+        return f"The database has been loaded = {len(book)} records ({rate:.0f} records/s)"
+    
+    #-----------------------------------------
+    # збереження записів книги у файл  
+    # формат збереження даних:
+    #
+    # Lisa|15.08.1984|+44345345345, +89777111222, +99222333
+    # Alex|None|+380954448899, +450342233     
+    #-------------------------------------------
+    #
+    # файл пишеться блоками у тимчасовий файл поруч, який атомарно заміняє старий,
+    # тому збій під час запису не пошкоджує існуючу базу даних
+    #-------------------------------------------
+    def save_database(self, book, path, chunk_records=10_000):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f_out:
+            write_records(book.iter_sorted(), f_out.write, chunk_records)
+            f_out.flush()
+            os.fsync(f_out.fileno())
+        os.replace(tmp_path, path)
+        return f"The database is saved = {len(book)} records"  
+    
+    # рядок запису у форматі Name|Birthday|phone, phone для друку (з кешу, див. RenderCache)
+    def render(self, record, remember=True) -> str:
+        return self.render_cache.get(record, record_line, remember)
+    
+    # ітератор посторінкового друку
+    def __iter__(self):
+        return self._record_generator()
+    
+    # записи книги, починаючи з позиції start (або з імені start_name в алфавітному порядку),
+    # без копіювання всієї книги
+    def _iter_records(self, start=0, start_name=None):
+        if start_name is None:
+            return itertools.islice(self.data.values(), start, None)
+        index = self.name_index
+        return (self.data[index[i]] for i in range(index.position(start_name) + start, len(index)))
+    
+    # генератор посторінкового друку: сторінки формуються по мірі читання,
+    # тому перша сторінка доступна одразу незалежно від розміру книги
+    def _record_generator(self, N=1, start_name=None):
+        records = self._iter_records(start_name=start_name)
+        while batch := list(itertools.islice(records, N)):
+            yield batch
+    
+    #-----------------------------------------
+    # всі записи книги без копіювання у порядку:
+    #   None       - додавання до книги
+    #   "name"     - алфавітному (за індексом імен)
+    #   "birthday" - календарному (за індексом днів народження), записи без дати - в кінці
+    #-------------------------------------------
+    def iter_sorted(self, key=None):
+        if key is None:
+            yield from self.data.values()
+        elif key == "name":
+            yield from self._iter_records(start_name="")
+        elif key == "birthday":
+            index = self.birthday_index
+            for day in sorted(index):
+                for name in sorted(index[day]):
+                    yield self.data[name]
+            yield from (record for record in self.data.values() if not record._birthday)
+        else: raise ValueError(f"Unknown sort key {key}")
+    
+    # сторінка number (з 0) по N записів
+    def page(self, number, N, start_name=None) -> list:
+        return list(itertools.islice(self._iter_records(number * N, start_name), N))
+    
+    
+    
+          
+        
@@ -0,0 +1,232 @@
+'''
+Планувальник нагадувань про дні народження (команда remind on/off/next).
+
+Купа (heapq) містить найближчу дату нагадування для кожного календарного дня (місяць, день),
+а не для кожного контакту: контакти дня беруться з календарного індексу книги (birthday_index),
+який AddressBook підтримує інкрементально. Тому купа містить не більше 366 елементів,
+пам'ять та час планування не залежать від кількості контактів, а в момент нагадування
+обробляються лише контакти цього дня.
+
+Потік планувальника спить до найближчого нагадування (Condition.wait). Планувальник -
+спостерігач книги: add_record та change_birthday ставлять у купу день народження контакту,
+якого там ще немає, і будять потік, якщо нове нагадування раніше за поточне очікування.
+Видалені контакти та дні без контактів пропускаються при спрацюванні (лінива перевірка).
+
+Потік читає книгу (календарний індекс, записи) лише під блокуванням lock, яке бере і код, що змінює
+книгу (HW_11 - кожна команда запису), тому зміни та масове завантаження (add_records скидає індекс)
+не змінюють множини та словники під час читання. Приймач викликається вже без блокувань.
+Помилка під час нагадування записується в журнал (logging) і не зупиняє потік.
+
+Нагадування надсилаються приймачу (sink) - будь-якому callable, що приймає список рядків:
+StdoutSink (консоль) або FileSink (дописування у файл).
+'''
+
+import datetime
+import heapq
+import itertools
+import logging
+import threading
+import time
+from pathlib import Path
+
+from RecordBook import birthday_in_year, record_line
+
+# час доби, коли надсилаються нагадування дня
+REMIND_TIME = datetime.time(9, 0)
+# найдовший сон потоку (сек): після нього час перевіряється знову (зміна годинника, сон комп'ютера)
+MAX_SLEEP = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+# найближче (date або пізніше) святкування дня народження (month, day)
+def next_celebration(month, day, date) -> datetime.date:
+    celebration = birthday_in_year(month, day, date.year)
+    if celebration < date: celebration = birthday_in_year(month, day, date.year + 1)
+    return celebration
+
+
+# друк нагадувань у консоль
+class StdoutSink():
+    def __init__(self, write=print) -> None:
+        self.write = write
+
+    def __call__(self, lines):
+        self.write("\n".join(lines))
+
+
+# дописування нагадувань у файл (рядок на контакт)
+class FileSink():
+    def __init__(self, path) -> None:
+        self.path = Path(path)
+
+    def __call__(self, lines):
+        with open(self.path, "a", encoding="utf-8") as f_out:
+            f_out.writelines(line + "\n" for line in lines)
+
+
+class BirthdayScheduler():
+    #-----------------------------------------
+    # days_before - за скільки днів до дня народження нагадувати (0 - у день народження, до 364)
+    # clock       - поточний час (секунди epoch), для перевірок можна підставити свій годинник
+    # lock        - блокування книги, яке беруть і ті, хто змінює книгу (за замовчуванням - власне)
+    #-------------------------------------------
+    def __init__(self, book, sink, days_before=0, clock=time.time, lock=None) -> None:
+        self.book = book
+        self.sink = sink
+        self.days_before = days_before
+        self.clock = clock
+        self.lock = threading.RLock() if lock is None else lock
+        self.delivered = 0              # кількість надісланих нагадувань
+        self.failures = 0               # кількість нагадувань, що завершилися помилкою
+        self._heap = []                 # (порядковий номер дати нагадування, №, (місяць, день), ім'я або None)
+        self._scheduled = {}            # (місяць, день) -> дата нагадування всього дня у купі
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    def today(self) -> datetime.date:
+        return datetime.date.fromtimestamp(self.clock())
+
+    #-----------------------------------------
+    # дата нагадування про найближче (сьогодні або пізніше) святкування дня народження key;
+    # якщо до святкування вже менше days_before днів, нагадування - сьогодні
+    #-------------------------------------------
+    def _remind_date(self, key, today) -> datetime.date:
+        celebration = next_celebration(*key, today)
+        return max(celebration - datetime.timedelta(days=self.days_before), today)
+
+    # дата нагадування про наступне святкування після нагадування з датою remind
+    def _next_remind_date(self, key, remind) -> datetime.date:
+        celebration = next_celebration(*key, remind)
+        return next_celebration(*key, celebration + datetime.timedelta(days=1)) - datetime.timedelta(days=self.days_before)
+
+    #-----------------------------------------
+    # планує всі дні народження книги заново (після масового завантаження - load, import):
+    # O(кількості календарних днів) після побудови календарного індексу книги
+    #-------------------------------------------
+    def reschedule(self):
+        today = self.today()
+        with self.lock, self._condition:
+            self._scheduled = {key: self._remind_date(key, today).toordinal() for key in self.book.birthday_index}
+            self._heap = [(ordinal, next(self._counter), key, None) for key, ordinal in self._scheduled.items()]
+            heapq.heapify(self._heap)
+            self._condition.notify()
+
+    def start(self):
+        self.reschedule()
+        self._stopped = False
+        self.book.observers.append(self)
+        self._thread = threading.Thread(target=self._run, name="birthday-reminders", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self in self.book.observers:
+            self.book.observers.remove(self)
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # будить потік, щоб перевірити час (наприклад, після зміни годинника clock)
+    def wake(self):
+        with self._condition:
+            self._condition.notify()
+
+    #-----------------------------------------
+    # зміна книги (спостерігач AddressBook): новий день народження контакту ставиться в купу;
+    # якщо нагадування цього дня вже надіслано сьогодні, контакту нагадується окремо
+    #-------------------------------------------
+    def on_change(self, event, record, *args):
+        if event not in ("add_record", "change_birthday") or not record._birthday: return
+        born = datetime.date.fromordinal(record._birthday)
+        key = (born.month, born.day)
+        with self._condition:
+            remind = self._remind_date(key, self.today()).toordinal()
+            scheduled = self._scheduled.get(key)
+            if scheduled is None:
+                self._scheduled[key] = remind
+                entry = (remind, next(self._counter), key, None)
+            elif scheduled > remind:                # день вже спрацював, а контакт додано пізніше
+                entry = (remind, next(self._counter), key, record._name)
+            else: return
+            heapq.heappush(self._heap, entry)
+            if self._heap[0] is entry: self._condition.notify()
+
+    # час (секунди epoch) нагадування з порядковим номером дати ordinal
+    @staticmethod
+    def _due(ordinal) -> float:
+        return datetime.datetime.combine(datetime.date.fromordinal(ordinal), REMIND_TIME).timestamp()
+
+    #-----------------------------------------
+    # цикл потоку: чекає найближче нагадування, бере його з купи під _condition, а книгу читає
+    # окремо під lock (порядок блокувань як у спостерігача on_change: lock, потім _condition)
+    #-------------------------------------------
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    delay = self._due(self._heap[0][0]) - self.clock() if self._heap else MAX_SLEEP
+                    if delay <= 0: break
+                    self._condition.wait(min(delay, MAX_SLEEP))
+                if self._stopped: return
+                entry = heapq.heappop(self._heap)
+            try:
+                self._deliver(*entry)
+            except Exception:
+                self.failures += 1
+                logger.exception("Birthday reminders for %02d.%02d failed", entry[2][1], entry[2][0])
+
+    #-----------------------------------------
+    # надсилає приймачу нагадування елемента купи: всього дня key (name is None) або контакту name;
+    # нагадування дня плануються на наступний рік, день без контактів знімається з планування
+    #-------------------------------------------
+    def _deliver(self, ordinal, _, key, name):
+        date = datetime.date.fromordinal(ordinal)
+        with self.lock:
+            if name is None:
+                with self._condition:
+                    if self._scheduled.get(key) != ordinal: return          # застарілий елемент
+                    names = sorted(self.book.birthday_index.get(key, ()))
+                    if names:
+                        self._scheduled[key] = self._next_remind_date(key, date).toordinal()
+                        heapq.heappush(self._heap, (self._scheduled[key], next(self._counter), key, None))
+                    else: del self._scheduled[key]              # у цей день більше немає контактів
+            else: names = (name,)
+            records = map(self.book.data.get, names)
+            lines = [self.reminder_line(date, record) for record in records if record is not None and record._birthday]
+        if not lines: return
+        self.sink(lines)
+        self.delivered += len(lines)
+
+    # рядок нагадування: Birthday reminder 18.10.2026: Mike turns 36 in 3 days|Mike|02.10.1990|+380504995876
+    def reminder_line(self, date, record) -> str:
+        born = datetime.date.fromordinal(record._birthday)
+        celebration = next_celebration(born.month, born.day, date)
+        days = (celebration - date).days
+        when = "today" if days == 0 else f"in {days} days"
+        return f"Birthday reminder {celebration.strftime('%d.%m.%Y')}: {record._name} turns {celebration.year - born.year} {when}|{record_line(record)}"
+
+    # найближчі count нагадувань: список (дата нагадування, запис)
+    def upcoming(self, count) -> list:
+        with self.lock:
+            with self._condition:
+                entries = sorted(self._heap)
+                scheduled = dict(self._scheduled)
+            result, seen = [], set()
+            for ordinal, _, key, name in entries:
+                if name is None and scheduled.get(key) != ordinal: continue
+                for name in sorted(self.book.birthday_index.get(key, ())) if name is None else (name,):
+                    record = self.book.data.get(name)
+                    if record is None or name in seen: continue
+                    seen.add(name)
+                    result.append((datetime.date.fromordinal(ordinal), record))
+                    if len(result) >= count: return result
+            return result
+
+    def report(self) -> str:
+        failures = f", {self.failures} failed (see the log)" if self.failures else ""
+        return f"{len(self._scheduled)} birthday days are scheduled, {self.delivered} reminders were sent{failures}"
@@ -0,0 +1,63 @@
+'''
+Кеш рядків Name|Birthday|phone, phone для друку записів (show all, show book, phone, search, birthdays).
+
+Рядок запису зберігається під іменем запису, доки запис не зміниться: AddressBook скидає рядок
+при add_record, видаленні запису та будь-якій зміні через методи Record (add_phone, del_phone,
+edit_phone, change_birthday...), а масове додавання (add_records) очищує весь кеш.
+Кількість рядків обмежена maxsize: найдавніше використаний рядок витісняється (LRU).
+
+identity=True - рядок дійсний лише для того самого об'єкта Record (ConcurrentAddressBook: записи
+не змінюються на місці, нова версія запису - новий об'єкт, тому рядок старої версії не повертається).
+'''
+
+from collections import OrderedDict
+
+
+class RenderCache():
+    def __init__(self, maxsize, identity=False) -> None:
+        self.maxsize = maxsize
+        self.identity = identity
+        self._rows = OrderedDict()      # ім'я -> (запис або None, рядок)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    #-----------------------------------------
+    # рядок запису з кешу або render(record);
+    # remember=False - рядок не додається у кеш (суцільний перебір книги, більшої за кеш,
+    # витіснив би з кешу всі рядки, що використовуються часто)
+    #-------------------------------------------
+    def get(self, record, render, remember=True) -> str:
+        rows, name = self._rows, record._name
+        row = rows.get(name)
+        if row is not None and (not self.identity or row[0] is record):
+            self.hits += 1
+            try:
+                rows.move_to_end(name)
+            except KeyError:            # рядок щойно витіснив або скинув інший потік
+                pass
+            return row[1]
+
+        self.misses += 1
+        line = render(record)
+        if remember:
+            rows[name] = (record if self.identity else None, line)
+            if len(rows) > self.maxsize:
+                try:
+                    rows.popitem(last=False)
+                except KeyError:
+                    pass
+        return line
+
+    def invalidate(self, name):
+        self._rows.pop(name, None)
+
+    def clear(self):
+        self._rows.clear()
+
+    def report(self) -> str:
+        requests = self.hits + self.misses
+        rate = self.hits / requests if requests else 0
+        return f"render cache: {self.hits} hits, {self.misses} misses ({rate:.0%} hit rate), {len(self)} of {self.maxsize} rows"
@@ -0,0 +1,282 @@
+'''
+Зберігання AddressBook у базі даних SQLite (стандартний модуль sqlite3).
+
+SQLiteAddressBook - це AddressBook, у якого self.data та пошукові індекси працюють
+безпосередньо з базою даних, тому команди CLI (func_phone, func_add_rec, ...) працюють
+з нею без змін, а книга не завантажується у пам'ять повністю.
+
+Таблиці:
+    contacts(name, name_lower, birthday, month, day, phones)  - phones: упаковані телефони (array("Q").tobytes())
+    phones(phone, name)                                        - зворотний індекс телефонів
+Індекси: name_lower, (month, day), phone.
+name_lower - ім'я у нижньому регістрі (str.lower, як NameIndex): LIKE та COLLATE NOCASE SQLite
+не враховують регістр лише для латиниці, тому префікс кирилицею шукається діапазоном name_lower.
+
+Зміни записуються транзакціями по batch_size змін; команда save (save_database) фіксує решту.
+'''
+
+import datetime
+import sqlite3
+from array import array
+from collections.abc import Mapping, MutableMapping
+from pathlib import Path
+
+from RecordBook import AddressBook, Record
+from SearchIndex import PREFIX_END, NameIndex
+
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    name       TEXT PRIMARY KEY,
+    name_lower TEXT,
+    birthday INTEGER NOT NULL DEFAULT 0,
+    month    INTEGER,
+    day      INTEGER,
+    phones   BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contacts_birthday ON contacts (month, day);
+CREATE TABLE IF NOT EXISTS phones (
+    phone INTEGER NOT NULL,
+    name  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS phones_phone ON phones (phone);
+CREATE INDEX IF NOT EXISTS phones_name ON phones (name);
+"""
+
+
+# чи є файл базою даних SQLite (за розширенням)
+def is_sqlite_path(path) -> bool:
+    return Path(path).suffix.lower() in SQLITE_SUFFIXES
+
+
+# рядок таблиці contacts для запису
+def contact_row(record) -> tuple:
+    month = day = None
+    if record._birthday:
+        born = datetime.date.fromordinal(record._birthday)
+        month, day = born.month, born.day
+    return (record._name, record._name.lower(), record._birthday, month, day, record._phones.tobytes())
+
+
+# записи книги: Mapping ім'я -> Record поверх таблиці contacts
+class SQLiteRecords(MutableMapping):
+    def __init__(self, book) -> None:
+        self.book = book
+        self.db = book.db
+
+    def _record(self, row) -> Record:
+        phones = array("Q")
+        phones.frombytes(row[2])
+        record = Record.packed(row[0], row[1], phones)
+        record._book = self.book
+        return record
+
+    def __getitem__(self, name) -> Record:
+        row = self.db.execute("SELECT name, birthday, phones FROM contacts WHERE name = ?", (name,)).fetchone()
+        if row is None: raise KeyError(name)
+        return self._record(row)
+
+    def __contains__(self, name) -> bool:
+        return self.db.execute("SELECT 1 FROM contacts WHERE name = ?", (name,)).fetchone() is not None
+
+    def __setitem__(self, name, record):
+        self.store_many([record])
+
+    def __delitem__(self, name):
+        if self.db.execute("DELETE FROM contacts WHERE name = ?", (name,)).rowcount == 0: raise KeyError(name)
+        self.db.execute("DELETE FROM phones WHERE name = ?", (name,))
+        self.book._written(1)
+
+    def __iter__(self):
+        for (name,) in self.db.execute("SELECT name FROM contacts ORDER BY rowid"):
+            yield name
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
+
+    def values(self):
+        for row in self.db.execute("SELECT name, birthday, phones FROM contacts ORDER BY rowid"):
+            yield self._record(row)
+
+    # записи з умовою where у порядку order
+    def select(self, where="1", parameters=(), order="rowid"):
+        for row in self.db.execute(f"SELECT name, birthday, phones FROM contacts WHERE {where} ORDER BY {order}", parameters):
+            yield self._record(row)
+
+    # зберігає записи (нові або змінені) однією пачкою
+    def store_many(self, records):
+        rows = [contact_row(record) for record in records]
+        names = [(row[0],) for row in rows]
+        # UPSERT зберігає rowid, тобто порядок додавання записів
+        self.db.executemany("INSERT INTO contacts (name, name_lower, birthday, month, day, phones) VALUES (?, ?, ?, ?, ?, ?) "
+                            "ON CONFLICT (name) DO UPDATE SET birthday = excluded.birthday, month = excluded.month, "
+                            "day = excluded.day, phones = excluded.phones", rows)
+        self.db.executemany("DELETE FROM phones WHERE name = ?", names)
+        self.db.executemany("INSERT INTO phones (phone, name) VALUES (?, ?)",
+                            [(packed, record._name) for record in records for packed in record._phones if packed])
+        self.book._written(len(rows))
+
+
+# зворотний індекс телефонів: упакований телефон -> ім'я або множина імен (як AddressBook.phone_index)
+class SQLitePhoneIndex(Mapping):
+    def __init__(self, db) -> None:
+        self.db = db
+
+    def __getitem__(self, packed):
+        names = {name for (name,) in self.db.execute("SELECT name FROM phones WHERE phone = ?", (packed,))}
+        if not names: raise KeyError(packed)
+        return names.pop() if len(names) == 1 else names
+
+    def __iter__(self):
+        for (packed,) in self.db.execute("SELECT DISTINCT phone FROM phones"):
+            yield packed
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(DISTINCT phone) FROM phones").fetchone()[0]
+
+
+# календарний індекс: (місяць, день) -> множина імен (як AddressBook.birthday_index)
+class SQLiteBirthdayIndex(Mapping):
+    def __init__(self, db) -> None:
+        self.db = db
+
+    def __getitem__(self, key):
+        names = {name for (name,) in self.db.execute("SELECT name FROM contacts WHERE month = ? AND day = ?", key)}
+        if not names: raise KeyError(key)
+        return names
+
+    def __iter__(self):
+        yield from self.db.execute("SELECT DISTINCT month, day FROM contacts WHERE birthday != 0")
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM (SELECT DISTINCT month, day FROM contacts WHERE birthday != 0)").fetchone()[0]
+
+
+# пошук за іменем (префікс - запитом до бази, нечіткий - за списком імен у пам'яті)
+class SQLiteNameIndex():
+    def __init__(self, book) -> None:
+        self.book = book
+        self._names = None          # NameIndex для нечіткого пошуку, будується при першому зверненні
+
+    def prefix(self, prefix: str, limit: int) -> list[str]:
+        prefix = prefix.lower()
+        return [name for (name,) in self.book.db.execute(
+            "SELECT name FROM contacts WHERE name_lower >= ? AND name_lower < ? ORDER BY name_lower LIMIT ?",
+            (prefix, prefix + PREFIX_END, limit))]
+
+    def fuzzy(self, query: str, max_distance: int = 2, budget: int = None) -> list[tuple]:
+        if self._names is None:
+            self._names = NameIndex(name for (name,) in self.book.db.execute("SELECT name FROM contacts"))
+        return self._names.fuzzy(query, max_distance, budget)
+
+
+# пошук за цифрами телефону (як AddressBook.phone_digits)
+class SQLitePhoneDigits():
+    def __init__(self, db) -> None:
+        self.db = db
+
+    def search(self, digits: str, limit: int) -> list[str]:
+        return [name for (name,) in self.db.execute(
+            "SELECT DISTINCT name FROM phones WHERE CAST(phone AS TEXT) LIKE ? LIMIT ?", (f"%{digits}%", limit))]
+
+
+class SQLiteAddressBook(AddressBook):
+    def __init__(self, path, batch_size=1000) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self.batch_size = batch_size    # кількість змін в одній транзакції
+        self._pending = 0
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.executescript(SCHEMA)
+        self._migrate()
+        self.data = SQLiteRecords(self)
+        self._sqlite_names = SQLiteNameIndex(self)
+
+    # база, створена до появи name_lower: стовпець заповнюється, індекс NOCASE замінюється індексом name_lower
+    def _migrate(self):
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(contacts)")}
+        if "name_lower" not in columns:
+            self.db.execute("ALTER TABLE contacts ADD COLUMN name_lower TEXT")
+            self.db.create_function("lower_name", 1, str.lower, deterministic=True)
+            self.db.execute("UPDATE contacts SET name_lower = lower_name(name)")
+        self.db.execute("DROP INDEX IF EXISTS contacts_name_nocase")
+        self.db.execute("CREATE INDEX IF NOT EXISTS contacts_name_lower ON contacts (name_lower)")
+        self.db.commit()
+
+    # індекси AddressBook замінюються запитами до бази
+    @property
+    def phone_index(self):
+        return SQLitePhoneIndex(self.db)
+
+    @property
+    def birthday_index(self):
+        return SQLiteBirthdayIndex(self.db)
+
+    @property
+    def name_index(self):
+        return self._sqlite_names
+
+    @property
+    def phone_digits(self):
+        return SQLitePhoneDigits(self.db)
+
+    # рахує зміни та фіксує транзакцію кожні batch_size змін
+    def _written(self, count):
+        self._pending += count
+        if self._pending >= self.batch_size: self.commit()
+
+    def commit(self):
+        self.db.commit()
+        self._pending = 0
+
+    def close(self):
+        self.commit()
+        self.db.close()
+
+    def add_record(self, record):
+        self._sqlite_names._names = None
+        super().add_record(record)
+
+    def __delitem__(self, name):
+        self._sqlite_names._names = None
+        super().__delitem__(name)
+
+    # масове додавання записів (імпорт) - однією пачкою в транзакції
+    def add_records(self, records):
+        self.data.store_many(records)
+        for record in records: record._book = self
+        self._sqlite_names._names = None
+        self.render_cache.clear()
+
+    # зміна запису (методи Record) одразу записується у базу
+    def _record_changed(self, event, record, *args):
+        self.data.store_many([record])
+        super()._record_changed(event, record, *args)
+
+    def _iter_records(self, start=0, start_name=None):
+        if start_name is None:
+            return self.data.select(order=f"rowid LIMIT -1 OFFSET {int(start)}")
+        return self.data.select("name_lower >= ?", (start_name.lower(),), f"name_lower LIMIT -1 OFFSET {int(start)}")
+
+    def iter_sorted(self, key=None):
+        if key == "birthday":
+            return self.data.select(order="birthday = 0, month, day, name")
+        return super().iter_sorted(key)
+
+    # файл бази даних SQLite вже відкритий; інший файл (формату Name|Birthday|phones) імпортується
+    def load_database(self, book, path, *args, **kwargs):
+        if Path(path) == self.path:
+            return f"The database has been opened = {len(self)} records"
+        result = super().load_database(book, path, *args, **kwargs)
+        self.commit()
+        return result
+
+    # збереження у файл бази даних SQLite - фіксація транзакції, в інший файл - експорт
+    def save_database(self, book, path, *args, **kwargs):
+        if Path(path) == self.path:
+            self.commit()
+            return f"The database is saved = {len(self)} records"
+        return super().save_database(book, path, *args, **kwargs)
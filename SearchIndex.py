@@ -0,0 +1,197 @@
+'''
+Індекси для пошуку у AddressBook:
+- NameIndex - відсортований масив імен (без урахування регістру): пошук за префіксом через bisect
+  та нечіткий пошук (відстань Левенштейна <= 2) обходом масиву як префіксного дерева;
+- PhoneDigitsIndex - всі телефони книги, склеєні у рядок записів фіксованої довжини:
+  пошук підрядка цифр виконує str.find на рівні C. Довгий запит (від GRAM + STEP - 1 цифр) шукається
+  за індексом n-грамів: лише серед записів з рідкісним n-грамом запиту, без перегляду всього рядка.
+  Змінені записи не перебудовують рядок: їхні старі телефони пропускаються, а поточні шукаються
+  в окремому малому рядку (хвості).
+'''
+
+import itertools
+from array import array
+from bisect import bisect_left, insort
+
+# символ, більший за будь-який символ імені - верхня межа діапазону префікса
+PREFIX_END = "\U0010ffff"
+
+
+class NameIndex():
+    def __init__(self, names) -> None:
+        self._names = sorted(names, key=str.lower)
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, name):
+        insort(self._names, name, key=str.lower)
+
+    def remove(self, name):
+        i = bisect_left(self._names, name.lower(), key=str.lower)
+        while i < len(self._names) and self._names[i].lower() == name.lower():
+            if self._names[i] == name:
+                del self._names[i]
+                return
+            i += 1
+
+    # імена, що починаються з prefix (без урахування регістру), у алфавітному порядку
+    def prefix(self, prefix: str, limit: int) -> list[str]:
+        prefix = prefix.lower()
+        start = bisect_left(self._names, prefix, key=str.lower)
+        end = bisect_left(self._names, prefix + PREFIX_END, lo=start, key=str.lower)
+        return self._names[start:min(end, start + limit)]
+
+    # позиція першого імені, не меншого за name (для посторінкового друку "from <name>")
+    def position(self, name: str) -> int:
+        return bisect_left(self._names, name.lower(), key=str.lower)
+
+    def __getitem__(self, index):
+        return self._names[index]
+
+    # позиція першого імені від start, не меншого за bound: піддерева префікса зазвичай малі,
+    # тому межа шукається кроками 1, 2, 4, ... (галопом) і лише потім bisect-ом у знайденому проміжку
+    def _skip(self, bound, start) -> int:
+        names, total = self._names, len(self._names)
+        low, high, step = start, start, 1
+        while high < total and names[high].lower() < bound:
+            low, high, step = high + 1, high + step, step * 2
+        return bisect_left(names, bound, lo=low, hi=min(high, total), key=str.lower)
+
+    #-----------------------------------------
+    # нечіткий пошук: імена на відстані Левенштейна <= max_distance від query
+    # Відсортований масив обходиться як префіксне дерево: рядки таблиці відстаней
+    # для спільного з попереднім ім'ям префікса перевикористовуються, а якщо всі
+    # значення рядка більші за max_distance, всі імена з цим префіксом пропускаються bisect-ом.
+    # Рядок рахується лише у смузі |j - глибина| <= max_distance (Укконен): клітинки поза смугою
+    # вже більші за max_distance і зберігаються як max_distance + 1.
+    # budget - найбільша кількість переглянутих імен (обхід зупиняється, знайдене повертається)
+    # повертає список (відстань, ім'я)
+    #-------------------------------------------
+    def fuzzy(self, query: str, max_distance: int = 2, budget: int = None) -> list[tuple]:
+        query = query.lower()
+        names, total = self._names, len(self._names)
+        size, over = len(query), max_distance + 1
+        rows = [[min(j, over) for j in range(size + 1)]]    # rows[k] - рядок таблиці після k символів префікса
+        previous, result, i = "", [], 0
+        budget = float("inf") if budget is None else budget
+
+        while i < total and budget > 0:
+            word = names[i].lower()
+            common, limit = 0, min(len(word), len(previous), len(rows) - 1)
+            while common < limit and word[common] == previous[common]: common += 1
+            del rows[common + 1:]
+
+            pruned = 0
+            budget -= 1
+            for depth in range(common, len(word)):
+                char, above = word[depth], rows[-1]
+                row = [over] * (size + 1)
+                best = row[0] = depth + 1 if depth < max_distance else over
+                low = max(1, depth + 1 - max_distance)
+                value = row[low - 1]
+                for j in range(low, min(size, depth + 1 + max_distance) + 1):
+                    # мінімум з вставки, видалення та заміни (без виклику min - це внутрішній цикл)
+                    value += 1
+                    if above[j] < value: value = above[j] + 1
+                    if above[j - 1] + (query[j - 1] != char) < value: value = above[j - 1] + (query[j - 1] != char)
+                    row[j] = value
+                    if value < best: best = value
+                rows.append(row)
+                if best > max_distance:
+                    pruned = depth + 1
+                    break
+            previous = word
+
+            if pruned:
+                i = self._skip(word[:pruned] + PREFIX_END, i + 1)
+                continue
+            if rows[-1][-1] <= max_distance: result.append((rows[-1][-1], names[i]))
+            i += 1
+        return result
+
+
+class PhoneDigitsIndex():
+    # довжина одного запису: до 15 цифр E.164, доповнених пробілами, та "\n"
+    WIDTH = 16
+    # скільки змінених записів тримається у хвості, далі індекс будується заново
+    TAIL_LIMIT = 10_000
+    # n-грами цифр телефону довжини GRAM з позицій, кратних STEP: будь-яке входження запиту
+    # з GRAM + STEP - 1 цифр містить такий n-грам на одному з STEP сусідніх зсувів запиту
+    GRAM = 4
+    STEP = 3
+
+    def __init__(self, records) -> None:
+        self._blob, self._owners = self._build((record._name, record._phones) for record in records)
+        self._grams = self._build_grams(self._blob)
+        self._changed = {}          # ім'я -> поточні упаковані телефони записів, змінених після побудови
+        self._tail = ("", [])       # рядок та власники телефонів змінених записів (None - перебудувати)
+
+    @staticmethod
+    def _build(items) -> tuple:
+        entries, owners = [], []
+        for name, phones in items:
+            for packed in phones:
+                if not packed: continue
+                entries.append(f"{packed:<15}\n")
+                owners.append(name)
+        return "".join(entries), owners
+
+    # n-грам -> номери записів рядка blob, у яких він стоїть на позиції, кратній STEP
+    @classmethod
+    def _build_grams(cls, blob) -> dict:
+        grams, gram, step, width = {}, cls.GRAM, cls.STEP, cls.WIDTH
+        for entry in range(len(blob) // width):
+            digits = blob[entry * width:(entry + 1) * width].rstrip()
+            for position in range(0, len(digits) - gram + 1, step):
+                postings = grams.get(digits[position:position + gram])
+                if postings is None: postings = grams[digits[position:position + gram]] = array("I")
+                postings.append(entry)
+        return grams
+
+    #-----------------------------------------
+    # номери записів основного рядка, що можуть містити digits (у порядку книги);
+    # з вікон по STEP зсувів запиту обирається вікно з найкоротшими списками записів
+    #-------------------------------------------
+    def _candidates(self, digits):
+        grams, gram, step = self._grams, self.GRAM, self.STEP
+        def postings(offset): return grams.get(digits[offset:offset + gram], ())
+        start = min(range(len(digits) - gram - step + 2), key=lambda t: sum(len(postings(offset)) for offset in range(t, t + step)))
+        return sorted(set(itertools.chain.from_iterable(postings(offset) for offset in range(start, start + step))))
+
+    #-----------------------------------------
+    # телефони запису name змінилися (phones - упаковані телефони, порожні - запис видалено):
+    # старі телефони запису в основному рядку далі пропускаються, поточні - у хвості.
+    # повертає False, якщо змінених записів забагато і індекс краще побудувати заново
+    #-------------------------------------------
+    def update(self, name, phones) -> bool:
+        self._changed[name] = tuple(phones)
+        self._tail = None
+        return len(self._changed) <= self.TAIL_LIMIT
+
+    # імена власників телефонів, що містять digits, у порядку книги (без повторів), далі - змінені записи
+    def search(self, digits: str, limit: int) -> list[str]:
+        result, seen = [], set()
+        tail = self._tail
+        if tail is None: tail = self._tail = self._build(self._changed.items())
+        width = self.WIDTH
+        if len(digits) >= self.GRAM + self.STEP - 1:
+            blob, owners = self._blob, self._owners
+            for entry in self._candidates(digits):
+                if len(result) >= limit: break
+                name = owners[entry]
+                if name in seen or name in self._changed or digits not in blob[entry * width:(entry + 1) * width]: continue
+                seen.add(name)
+                result.append(name)
+            sources = ((tail[0], tail[1], ()),)
+        else: sources = ((self._blob, self._owners, self._changed), (tail[0], tail[1], ()))
+        for blob, owners, skip in sources:
+            position = blob.find(digits)
+            while position != -1 and len(result) < limit:
+                entry = position // width
+                name = owners[entry]
+                if name not in seen and name not in skip:
+                    seen.add(name)
+                    result.append(name)
+                position = blob.find(digits, (entry + 1) * width)
+        return result
@@ -0,0 +1,148 @@
+'''
+Мережевий (asyncio) режим: багато клієнтів працюють з однією книгою.
+
+Протокол - рядки UTF-8 (JSON lines). Запит - команда CLI рядком або JSON-об'єктом:
+    phone Mike
+    {"id": 7, "command": "add phone Mike +380509998877"}
+Відповідь - один JSON-рядок на кожен запит:
+    {"id": 7, "ok": true, "result": "The phones was/were added - success"}
+
+Команди запису ставляться у чергу єдиного задання-записувача: воно застосовує всі зміни,
+що накопичилися (group commit), фіксує їх один раз (commit) і лише після цього відповідає клієнтам.
+threaded=True (потокобезпечна книга, ConcurrentAddressBook) - команди читання та група змін
+виконуються у пулі потоків (run_in_executor), тому повільний запит не зупиняє цикл подій та інших
+клієнтів; інакше (SQLite - з'єднання одного потоку) команди виконуються в циклі подій.
+'''
+
+import asyncio
+import itertools
+import json
+
+
+# стан з'єднання клієнта (наприклад, посторінковий друк show book)
+class Session():
+    _ids = itertools.count(1)
+
+    def __init__(self, peer) -> None:
+        self.id = next(self._ids)
+        self.peer = peer
+        self.pages = None           # генератор сторінок show book
+
+
+#-----------------------------------------
+# execute(command, session) -> (ok, result) - виконує команду (читання або запису)
+# is_write(command)  -> bool - чи змінює команда книгу
+# is_exit(command)   -> bool - чи завершує команда сесію клієнта
+# commit()           - фіксує групу змін (збереження, fsync журналу, commit SQLite)
+# commit_delay       - скільки секунд записувач чекає інші зміни перед фіксацією групи
+# max_batch          - найбільша кількість змін в одній групі
+# threaded           - виконувати команди у пулі потоків (execute та commit потокобезпечні)
+#-------------------------------------------
+class BookServer():
+    def __init__(self, execute, is_write, is_exit, commit, commit_delay=0.002, max_batch=1000, threaded=False) -> None:
+        self.execute = execute
+        self.is_write = is_write
+        self.is_exit = is_exit
+        self.commit = commit
+        self.commit_delay = commit_delay
+        self.max_batch = max_batch
+        self.threaded = threaded
+        self.sessions = 0
+        self.groups = 0             # кількість зафіксованих груп змін
+        self.writes = 0             # кількість застосованих змін
+        self._queue = None
+
+    async def serve(self, host, port, ready=None):
+        self._queue = asyncio.Queue()
+        writer_task = asyncio.create_task(self._writer())
+        server = await asyncio.start_server(self._client, host, port, backlog=4096)
+        if ready: ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            writer_task.cancel()
+
+    # обробка одного з'єднання: запити виконуються по черзі, відповіді - у порядку запитів
+    async def _client(self, reader, writer):
+        session = Session(writer.get_extra_info("peername"))
+        self.sessions += 1
+        try:
+            while line := await reader.readline():
+                request_id, command = self._parse(line)
+                if command is None:
+                    ok, result = False, "Incorrect request"
+                elif self.is_write(command):
+                    done = asyncio.get_running_loop().create_future()
+                    await self._queue.put((command, session, done))
+                    ok, result = await done
+                else:
+                    ok, result = await self._run(self._execute, command, session)
+                writer.write((json.dumps({"id": request_id, "ok": ok, "result": result}, ensure_ascii=False) + "\n").encode("utf-8"))
+                await writer.drain()
+                if command is not None and self.is_exit(command): break
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    # (id, команда) із рядка запиту; команда None - невірний запит
+    @staticmethod
+    def _parse(line: bytes) -> tuple:
+        text = line.decode("utf-8", errors="replace").strip()
+        if not text.startswith("{"): return None, text
+        try:
+            request = json.loads(text)
+        except ValueError:
+            return None, None
+        command = request.get("command") if isinstance(request, dict) else None
+        return (request.get("id") if isinstance(request, dict) else None), (command if isinstance(command, str) else None)
+
+    # виконує команду; виключення обробника (наприклад, IsADirectoryError, PermissionError)
+    # повертається клієнту як помилка і не зупиняє записувача
+    def _execute(self, command, session) -> tuple:
+        try:
+            return self.execute(command, session)
+        except Exception as error:
+            return False, f"{type(error).__name__} {error}"
+
+    # виконує func(*args) у пулі потоків (threaded) або одразу в циклі подій
+    async def _run(self, func, *args):
+        if self.threaded: return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+        return func(*args)
+
+    # застосовує групу змін та фіксує її; повертає результати команд групи
+    def _apply(self, batch) -> list:
+        results = [self._execute(command, session) for command, session, _ in batch]
+        try:
+            self.commit()
+        except Exception as error:
+            results = [(False, f"The changes were applied, but not saved: {type(error).__name__} {error}")] * len(batch)
+        self.groups += 1
+        self.writes += len(batch)
+        return results
+
+    # єдиний записувач: застосовує групу змін, фіксує її один раз та відповідає всім клієнтам групи
+    async def _writer(self):
+        while True:
+            batch = [await self._queue.get()]
+            if self.commit_delay: await asyncio.sleep(self.commit_delay)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            results = [(False, "The server failed to apply the changes")] * len(batch)
+            try:
+                results = await self._run(self._apply, batch)
+            finally:
+                # кожен клієнт групи отримує відповідь, навіть якщо група не виконалася
+                for (_, _, done), result in zip(batch, results):
+                    if not done.done(): done.set_result(result)
+
+
+# запускає сервер до переривання (Ctrl+C)
+def run_server(server: BookServer, host, port, ready=None):
+    try:
+        asyncio.run(server.serve(host, port, ready))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,250 @@
+'''
+Бінарний знімок AddressBook (*.snap), який відкривається через mmap без розбору файлу.
+
+Формат (little-endian, n - кількість записів, w - найбільша кількість телефонів у записі):
+    заголовок     "HWSNAP01", n (uint64), w (uint64)
+    phones        n * w uint64   - упаковані телефони, рядок запису доповнюється нулями до w
+    name_offsets  (n + 1) uint64 - зміщення імен у heap
+    birthdays     n int32        - порядкові номери дат (0 - невідома)
+    sorted_names  n uint32       - номери записів в алфавітному порядку (без урахування регістру)
+    counts        n uint16       - кількість телефонів запису
+    heap          імена в UTF-8 підряд
+
+SnapshotAddressBook читає записи зі знімка лише при зверненні до них (Record створюється
+при кожному читанні), тому відкриття книги не залежить від її розміру, а пам'ять росте
+лише зі сторінками файлу, які були прочитані. Змінені, додані та видалені записи
+зберігаються поверх знімка у пам'яті, команда save записує новий знімок.
+'''
+
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableMapping, Sequence
+from pathlib import Path
+
+from RecordBook import AddressBook, Record
+from SearchIndex import NameIndex
+
+MAGIC = b"HWSNAP01"
+HEADER = struct.Struct("<8sQQ")
+SNAPSHOT_SUFFIXES = (".snap",)
+
+
+# чи є файл бінарним знімком (за розширенням)
+def is_snapshot_path(path) -> bool:
+    return Path(path).suffix.lower() in SNAPSHOT_SUFFIXES
+
+
+#-----------------------------------------
+# записує записи у файл знімка path (через тимчасовий файл, як save_database),
+# повертає кількість записів
+#-------------------------------------------
+def write_snapshot(records, path) -> int:
+    names, heap, offsets = [], bytearray(), array("Q", [0])
+    birthdays, counts, phones = array("i"), array("H"), array("Q")
+    for record in records:
+        names.append(record._name)
+        heap += record._name.encode("utf-8")
+        offsets.append(len(heap))
+        birthdays.append(record._birthday)
+        counts.append(len(record._phones))
+        phones.extend(record._phones)
+
+    count, width = len(names), max(counts, default=0)
+    order = array("I", sorted(range(count), key=lambda i: names[i].lower()))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f_out:
+        f_out.write(HEADER.pack(MAGIC, count, width))
+        # телефони фіксованої ширини: рядки записуються блоками, щоб не будувати всю таблицю в пам'яті
+        zeros, position, block = array("Q", bytes(8 * width)), 0, array("Q")
+        for phones_count in counts:
+            block.extend(phones[position:position + phones_count])
+            block.extend(zeros[phones_count:])
+            position += phones_count
+            if len(block) >= 1 << 20:
+                f_out.write(block.tobytes())
+                block = array("Q")
+        f_out.write(block.tobytes())
+        for column in (offsets, birthdays, order, counts):
+            f_out.write(column.tobytes())
+        f_out.write(heap)
+        f_out.flush()
+        os.fsync(f_out.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+
+# знімок, відкритий через mmap: стовпці - memoryview поверх сторінок файлу (без копіювання)
+class SnapshotView():
+    def __init__(self, path) -> None:
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.width = HEADER.unpack_from(self._map)
+        if magic != MAGIC: raise ValueError(f"{path} isn't an address book snapshot")
+
+        n, w, view = self.count, self.width, memoryview(self._map)
+        position = HEADER.size
+        self._phones_at = position
+        position += 8 * n * w
+        self._offsets = view[position:position + 8 * (n + 1)].cast("Q")
+        position += 8 * (n + 1)
+        self._birthdays = view[position:position + 4 * n].cast("i")
+        position += 4 * n
+        self._sorted = view[position:position + 4 * n].cast("I")
+        position += 4 * n
+        self._counts = view[position:position + 2 * n].cast("H")
+        self._heap_at = position + 2 * n
+
+    def __len__(self) -> int:
+        return self.count
+
+    def name(self, i) -> str:
+        return self._map[self._heap_at + self._offsets[i]:self._heap_at + self._offsets[i + 1]].decode("utf-8")
+
+    def record(self, i) -> Record:
+        start = self._phones_at + 8 * i * self.width
+        phones = array("Q")
+        phones.frombytes(self._map[start:start + 8 * self._counts[i]])
+        return Record.packed(self.name(i), self._birthdays[i], phones)
+
+    # номер запису з іменем name або -1 (бінарний пошук за таблицею sorted_names)
+    def find(self, name) -> int:
+        names = SortedNames(self)
+        i = bisect_left(names, name.lower(), key=str.lower)
+        while i < len(names) and names[i].lower() == name.lower():
+            if names[i] == name: return self._sorted[i]
+            i += 1
+        return -1
+
+    def close(self):
+        for column in (self._offsets, self._birthdays, self._sorted, self._counts): column.release()
+        self._map.close()
+        self._file.close()
+
+
+# імена знімка в алфавітному порядку як послідовність (для bisect та NameIndex)
+class SortedNames(Sequence):
+    def __init__(self, snapshot) -> None:
+        self.snapshot = snapshot
+
+    def __getitem__(self, i):
+        if isinstance(i, slice): return [self[j] for j in range(*i.indices(len(self)))]
+        return self.snapshot.name(self.snapshot._sorted[i])
+
+    def __len__(self) -> int:
+        return len(self.snapshot)
+
+
+# NameIndex поверх таблиці sorted_names знімка (лише для читання)
+class SnapshotNameIndex(NameIndex):
+    def __init__(self, snapshot) -> None:
+        self._names = SortedNames(snapshot)
+
+
+# записи книги: знімок + змінені (changed), додані (added) та видалені (deleted) записи у пам'яті
+class SnapshotRecords(MutableMapping):
+    def __init__(self, book, snapshot) -> None:
+        self.book = book
+        self.snapshot = snapshot
+        self.changed, self.added, self.deleted = {}, {}, set()
+
+    def _in_snapshot(self, name) -> int:
+        if name in self.deleted: return -1
+        return self.snapshot.find(name)
+
+    def __getitem__(self, name) -> Record:
+        record = self.added.get(name) or self.changed.get(name)
+        if record is not None: return record
+        i = self._in_snapshot(name)
+        if i < 0: raise KeyError(name)
+        return self._own(self.snapshot.record(i))
+
+    def __contains__(self, name) -> bool:
+        return name in self.added or name in self.changed or self._in_snapshot(name) >= 0
+
+    def __setitem__(self, name, record):
+        if name not in self.added and self._in_snapshot(name) >= 0: self.changed[name] = record
+        else: self.added[name] = record
+
+    def __delitem__(self, name):
+        if name in self.added:
+            del self.added[name]
+        elif self._in_snapshot(name) >= 0:
+            self.changed.pop(name, None)
+            self.deleted.add(name)
+        else: raise KeyError(name)
+
+    def __iter__(self):
+        for i in range(len(self.snapshot)):
+            name = self.snapshot.name(i)
+            if name not in self.deleted: yield name
+        yield from self.added
+
+    def __len__(self) -> int:
+        return len(self.snapshot) - len(self.deleted) + len(self.added)
+
+    # записи у порядку знімка, далі - додані
+    def values(self):
+        snapshot, changed, deleted = self.snapshot, self.changed, self.deleted
+        for i in range(len(snapshot)):
+            if changed or deleted:
+                name = snapshot.name(i)
+                if name in deleted: continue
+                if name in changed:
+                    yield changed[name]
+                    continue
+            yield self._own(snapshot.record(i))
+        yield from self.added.values()
+
+    def _own(self, record) -> Record:
+        record._book = self.book
+        return record
+
+
+class SnapshotAddressBook(AddressBook):
+    def __init__(self, path) -> None:
+        super().__init__()
+        self.path = Path(path)
+        if not self.path.exists(): write_snapshot([], self.path)
+        self._open()
+
+    def _open(self):
+        self.snapshot = SnapshotView(self.path)
+        self.data = SnapshotRecords(self, self.snapshot)
+        self._snapshot_names = SnapshotNameIndex(self.snapshot)
+
+    # поки імена не змінювалися, пошук за іменем працює за таблицею знімка
+    @property
+    def name_index(self):
+        if self.data.added or self.data.deleted: return super().name_index
+        return self._snapshot_names
+
+    # зміна запису (методи Record) - запис зберігається поверх знімка
+    def _record_changed(self, event, record, *args):
+        self.data[record._name] = record
+        super()._record_changed(event, record, *args)
+
+    def close(self):
+        self.snapshot.close()
+
+    # файл знімка вже відкритий; інший файл (формату Name|Birthday|phones) додається поверх знімка
+    def load_database(self, book, path, *args, **kwargs):
+        if Path(path) == self.path:
+            return f"The snapshot has been opened = {len(self)} records"
+        return super().load_database(book, path, *args, **kwargs)
+
+    # збереження у файл знімка - новий знімок (змінені записи вливаються у нього), в інший файл - експорт
+    def save_database(self, book, path, *args, **kwargs):
+        if Path(path) != self.path:
+            return super().save_database(book, path, *args, **kwargs)
+
+        tmp_path = self.path.with_name(self.path.name + ".new")
+        count = write_snapshot(self.data.values(), tmp_path)
+        self.close()                    # відображений файл не можна замінити у Windows
+        os.replace(tmp_path, self.path)
+        self._open()
+        self._name_index = None
+        return f"The snapshot is saved = {count} records"
@@ -0,0 +1,37 @@
+'''
+Бенчмарки AddressBook. Запуск з кореня репозиторію, наприклад:
+    python -m benchmarks.bench_memory --records 1000000
+    python -m benchmarks.run --records 10000 100000 --out results.json   - весь набір сценаріїв у JSON
+
+Спільні допоміжні функції бенчмарків: build_book (згенерована книга) та best_time (кращий час з повторів).
+'''
+
+import itertools
+import time
+
+from RecordBook import AddressBook, parse_lines
+from benchmarks.generator import generate_lines
+
+# кількість рядків, що розбираються та додаються в книгу за раз (пам'ять не росте з розміром книги)
+BUILD_CHUNK = 100_000
+
+
+#-----------------------------------------
+# книга book (за замовчуванням - нова AddressBook) з count згенерованих записів (generate_lines)
+# рядки без realistic вже нормалізовані, тому розбираються без перевірок (trusted)
+#-------------------------------------------
+def build_book(count, realistic=False, book=None) -> AddressBook:
+    book, lines = AddressBook() if book is None else book, generate_lines(count, realistic=realistic)
+    while chunk := list(itertools.islice(lines, BUILD_CHUNK)):
+        book.add_records(parse_lines(chunk, trusted=not realistic))
+    return book
+
+
+# кращий час виконання func з repeat повторів: (секунди, результат func)
+def best_time(func, repeat=3) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
@@ -0,0 +1,54 @@
+'''
+Аналітика днів народження для всієї книги: цикл по записах (Record.days_to_birthday, вік та місяць
+через datetime для кожного запису) проти векторних обчислень BirthdayColumns (NumPy).
+Результати обох способів порівнюються.
+
+    python -m benchmarks.bench_birthdays --records 1000000
+'''
+
+import argparse
+import datetime
+
+from BirthdayAnalytics import BirthdayColumns
+from RecordBook import birthday_in_year, next_birthday
+from benchmarks import best_time, build_book
+
+
+# дні до дня народження, вік та кількість за місяцями - по одному запису
+def per_record(book, today):
+    now, days, ages, months = datetime.datetime.combine(today, datetime.time()), [], [], [0] * 12
+    for record in book.iter_sorted():
+        if not record._birthday: continue
+        record.days_to_birthday(now)                        # поточний API: рядок для одного запису
+        born = datetime.date.fromordinal(record._birthday)
+        days.append((next_birthday(record._birthday, today) - today).days)
+        ages.append(today.year - born.year - (birthday_in_year(born.month, born.day, today.year) > today))
+        months[born.month - 1] += 1
+    return days, ages, months
+
+
+def vectorized(book, today):
+    columns = BirthdayColumns(book)
+    return columns.days_to_birthday(today), columns.ages(today), columns.per_month()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="birthday analytics: per-record loop vs NumPy")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    book = build_book(args.records, realistic=True)
+    today = datetime.date(2024, 2, 29)
+
+    loop_time, expected = best_time(lambda: per_record(book, today))
+    numpy_time, result = best_time(lambda: vectorized(book, today))
+    same = (list(result[0]) == expected[0] and list(result[1]) == expected[1] and list(result[2]) == expected[2])
+
+    print(f"records: {len(book)}, with a birthday: {len(expected[0])}")
+    print(f"per-record loop:   {loop_time:8.3f} s")
+    print(f"NumPy (vectorized):{numpy_time:8.3f} s  ({loop_time / numpy_time:.0f}x)")
+    print("results are the same" if same else "RESULTS DIFFER")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+'''
+Пошук дублікатів (Dedupe.dedupe) на книгах різного розміру: час роботи, кількість оцінених пар
+та частка знайдених дублікатів, доданих у книгу навмисно (--duplicates від кількості записів):
+    ім'я в іншому регістрі та один спільний телефон
+    ім'я з доданою літерою та та сама дата народження
+    інше ім'я, спільний телефон та та сама дата народження
+Дублікати другого та третього виду додаються лише для записів з датою народження.
+
+    python -m benchmarks.bench_dedupe --records 100000 1000000 2000000
+'''
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from Dedupe import dedupe
+from RecordBook import AddressBook, parse_lines
+from benchmarks.generator import generate_lines
+
+
+# рядки книги з count записів та навмисних дублікатів; повертає (рядки, пари імен дублікатів)
+def book_with_duplicates(count, share, seed=21) -> tuple:
+    rnd = random.Random(seed)
+    lines = list(generate_lines(count, realistic=True))
+    duplicates, expected = [], set()
+    for number, line in enumerate(rnd.sample(lines, int(count * share))):
+        name, birthday, phones = line.rstrip("\n").split("|")
+        phone = phones.split(", ")[0]
+        kind = number % 3
+        if kind == 0: duplicate = f"{name.upper()}|None|{phone}"
+        elif kind == 1: duplicate = f"{name}a|{birthday}|+38073{rnd.randrange(10_000_000):07d}"
+        else: duplicate = f"Contact{number}|{birthday}|{phone}"
+        # без дати народження дубліката не впізнати: інше ім'я та один телефон - ознака різних людей з одним номером
+        if kind != 0 and birthday == "None": continue
+        duplicates.append(duplicate + "\n")
+        expected.add(frozenset((name, duplicate.split("|")[0])))
+    return lines + duplicates, expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="duplicate detection: time and recall")
+    parser.add_argument("--records", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--duplicates", type=float, default=0.01, help="share of injected duplicates")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = os.path.join(tmp, "book.dedupe")
+        for count in args.records:
+            lines, expected = book_with_duplicates(count, args.duplicates)
+            book = AddressBook()
+            book.add_records(parse_lines(lines))
+
+            started = time.perf_counter()
+            result = dedupe(book, report_path)
+            elapsed = time.perf_counter() - started
+
+            with open(report_path, "r", encoding="utf-8") as f_read:
+                found = {frozenset(line.split("|")[2:4]) for line in f_read if line.startswith("pair|")}
+            recall = len(expected & found) / len(expected) if expected else 1.0
+            print(f"records: {len(book):>9}  time: {elapsed:7.2f} s  ({elapsed / len(book) * 1e6:5.1f} us/record)  "
+                  f"recall: {recall:.1%}  pairs found: {len(found)}")
+            print(f"    {result.splitlines()[0]}")
+
+
+if __name__ == "__main__":
+    main()
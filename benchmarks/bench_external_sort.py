@@ -0,0 +1,66 @@
+'''
+Злиття (merge) та порівняння (diff) файлів бази даних зовнішнім сортуванням: час та пік пам'яті
+процесу для різних розмірів файлів та обмежень пам'яті (--memory, МБ). Кожен прогін виконується
+у свіжому процесі, щоб пік пам'яті (ru_maxrss) не змішувався з генерацією файлів.
+
+    python -m benchmarks.bench_external_sort --records 100000 1000000 --memory 8 64
+'''
+
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ExternalSort import diff_files, merge_files
+from benchmarks.generator import generate_file, generate_lines
+
+
+# "сьогоднішня" копія книги: 1% контактів видалено, 1% отримали новий телефон, 1% нових контактів
+def write_changed_copy(path, count, seed=23):
+    rnd = random.Random(seed)
+    with open(path, "w") as f_out:
+        for line in generate_lines(count):
+            change = rnd.random()
+            if change < 0.01: continue
+            if change < 0.02: line = line.rstrip("\n") + f", +38067{rnd.randrange(10_000_000):07d}\n"
+            f_out.write(line)
+        f_out.writelines(f"New{i}|None|+38063{i:07d}\n" for i in range(count // 100))
+
+
+# виконується у свіжому процесі: (час merge, час diff, пік пам'яті процесу в МБ)
+def run_once(old_path, new_path, tmp, memory_mb) -> tuple:
+    started = time.perf_counter()
+    merge_files([old_path, new_path], os.path.join(tmp, "merged.csv"), memory_mb)
+    merged = time.perf_counter() - started
+    started = time.perf_counter()
+    diff_files(old_path, new_path, os.path.join(tmp, "changes.diff"), memory_mb)
+    compared = time.perf_counter() - started
+    return merged, compared, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="external merge sort: merge and diff of database files")
+    parser.add_argument("--records", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--memory", type=int, nargs="+", default=[8, 64], help="memory limits in MB")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.records:
+            old_path = generate_file(os.path.join(tmp, "old.csv"), count)
+            new_path = os.path.join(tmp, "new.csv")
+            write_changed_copy(new_path, count)
+            size = (os.path.getsize(old_path) + os.path.getsize(new_path)) / 2**20
+            for memory_mb in args.memory:
+                with ProcessPoolExecutor(1, mp_context=context) as executor:
+                    merged, compared, peak = executor.submit(run_once, old_path, new_path, tmp, memory_mb).result()
+                print(f"records: {count:>9}  files: {size:7.1f} MB  --memory {memory_mb:>4}  "
+                      f"merge: {merged:7.2f} s  diff: {compared:7.2f} s  peak RSS: {peak:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
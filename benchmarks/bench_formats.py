@@ -0,0 +1,81 @@
+'''
+Пропускна здатність форматів файлу: текстовий Name|Birthday|phones (save_database / load_database)
+проти JSON Lines (*.jsonl) та стовпців NumPy (*.npz, якщо встановлено numpy).
+Для кожного формату - час запису та читання, розмір файлу та пік пам'яті запису (tracemalloc,
+окремий прогін), який не залежить від розміру книги.
+
+    python -m benchmarks.bench_formats --records 1000000
+'''
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from ExportFormats import export_book, import_book, missing_dependency
+from RecordBook import AddressBook
+from benchmarks.generator import generate_file
+
+
+def text_save(book, path):
+    book.save_database(book, path)
+
+
+def text_load(path, trusted):
+    fresh = AddressBook()
+    fresh.load_database(fresh, path, trusted=trusted)
+    return fresh
+
+
+def export_load(path, trusted):
+    fresh = AddressBook()
+    import_book(fresh, path, trusted=trusted)
+    return fresh
+
+
+# пік пам'яті (МБ), виділеної під час func()
+def peak_memory(func) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="file formats: text vs JSON Lines vs NumPy columns")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        book = text_load(generate_file(os.path.join(tmp, "source.csv"), args.records, realistic=True), trusted=False)
+        print(f"records: {len(book)}")
+        print(f"{'format':16}{'save s':>9}{'load s':>9}{'load rec/s':>12}{'MB':>8}{'save peak MB':>14}")
+
+        formats = [("text", "book.csv", text_save, text_load), ("jsonl", "book.jsonl", export_book, export_load),
+                   ("npz", "book.npz", export_book, export_load)]
+        for name, file_name, save, load in formats:
+            path = os.path.join(tmp, file_name)
+            if missing_dependency(path):
+                print(f"{name:16}skipped - {missing_dependency(path)}")
+                continue
+
+            started = time.perf_counter()
+            save(book, path)
+            saved = time.perf_counter() - started
+            peak = peak_memory(lambda: save(book, path))
+            for trusted in (False, True):
+                started = time.perf_counter()
+                loaded = load(path, trusted)
+                elapsed = time.perf_counter() - started
+                if len(loaded) != len(book): print(f"    {name}: {len(loaded)} records loaded instead of {len(book)}")
+                label = f"{name} trusted" if trusted else name
+                print(f"{label:16}{saved:9.3f}{elapsed:9.3f}{len(loaded) / elapsed:12.0f}"
+                      f"{os.path.getsize(path) / 2**20:8.1f}{peak:14.1f}")
+                del loaded
+
+
+if __name__ == "__main__":
+    main()
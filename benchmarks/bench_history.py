@@ -0,0 +1,73 @@
+'''
+Версії книги для undo (History, HAMT) проти повної копії книги на кожну контрольну точку:
+на книзі з --records записів виконується --versions команд (зміна телефону або дати народження
+випадкового запису, кожна команда - нова версія). Вимірюються час зміни разом з фіксацією версії,
+пам'ять історії (tracemalloc) на одну версію, час повної копії книги та undo до початку
+(з перевіркою, що книга повернулася до початкового стану).
+
+    python -m benchmarks.bench_history --records 1000000 --versions 10000
+'''
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from History import History
+from RecordBook import Birthday, Phone, record_line
+from benchmarks import build_book
+
+
+def main():
+    parser = argparse.ArgumentParser(description="undo history: persistent map versions vs full copies")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--versions", type=int, default=10_000)
+    args = parser.parse_args()
+
+    book = build_book(args.records)
+    names = list(book.data)
+    rnd = random.Random(24)
+    touched = rnd.sample(names, min(args.versions, len(names)))
+    before = {name: record_line(book.data[name]) for name in touched}
+
+    started = time.perf_counter()
+    copies = [record.copy() for record in book.data.values()]
+    copy_time = time.perf_counter() - started
+    del copies
+
+    def change(number):
+        record = book[touched[number % len(touched)]]
+        if number % 2: record.change_birthday(Birthday(f"{rnd.randrange(1, 29):02d}.{rnd.randrange(1, 13):02d}.1990"))
+        else: record.add_phone([Phone(f"+38067{number:07d}")])
+        history.commit(f"change {number}")
+
+    # перша половина версій - час (без tracemalloc), друга - пам'ять
+    history = History(limit=args.versions + 1)
+    history.attach(book)
+    half = args.versions // 2
+    started = time.perf_counter()
+    for number in range(half):
+        change(number)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    memory = tracemalloc.get_traced_memory()[0]
+    for number in range(half, args.versions):
+        change(number)
+    memory = tracemalloc.get_traced_memory()[0] - memory
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    result = history.undo(book, args.versions)
+    undo_time = time.perf_counter() - started
+    restored = all(record_line(book.data[name]) == line for name, line in before.items())
+
+    print(f"records: {len(book)}  versions: {args.versions}")
+    print(f"full copy of the book:   {copy_time * 1000:9.1f} ms per checkpoint")
+    print(f"change + version:        {elapsed / half * 1e6:9.1f} us per version, "
+          f"{memory / (args.versions - half):,.0f} bytes per version")
+    print(f"undo to the start:       {undo_time * 1000:9.1f} ms, book restored: {restored}")
+    print(f"    {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+'''
+Масштабування паралельного імпорту (ParallelImport.import_parallel) за кількістю процесів
+у порівнянні з послідовним load_database.
+
+    python -m benchmarks.bench_import --records 1000000 --workers 1 2 4 8
+'''
+
+import argparse
+import os
+import tempfile
+import time
+
+from ParallelImport import import_parallel
+from RecordBook import AddressBook
+from benchmarks.generator import generate_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="parallel import scaling")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = generate_file(os.path.join(tmp, "book.csv"), args.records)
+        print(f"records: {args.records}, file: {os.path.getsize(path) / 2**20:.0f} MB, cores: {os.cpu_count()}")
+
+        book = AddressBook()
+        started = time.perf_counter()
+        book.load_database(book, path)
+        baseline = time.perf_counter() - started
+        print(f"load_database:          {baseline:6.2f} s")
+
+        for workers in sorted(set(args.workers)):
+            book = AddressBook()
+            started = time.perf_counter()
+            import_parallel(book, path, workers)
+            elapsed = time.perf_counter() - started
+            print(f"import --workers {workers:<3}:   {elapsed:6.2f} s  (x{baseline / elapsed:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+'''
+Порівняння пам'яті на один запис: попередні класи (Field/Record з __dict__ та списком Phone)
+проти поточних (__slots__, телефони в array("Q"), день народження - порядковий номер дати).
+
+    python -m benchmarks.bench_memory --records 1000000
+'''
+
+import argparse
+import itertools
+import tracemalloc
+
+from RecordBook import AddressBook, parse_lines
+from benchmarks.generator import generate_lines
+
+
+# класи у тому вигляді, в якому вони були до компактного зберігання
+class LegacyField():
+    def __init__(self, value) -> None:
+        self.value = value
+
+
+class LegacyRecord():
+    def __init__(self, name, birthday, phones) -> None:
+        self.name = name
+        self.birthday = birthday
+        self.phones = []
+        self.phones.extend(phones)
+
+
+def build_legacy(lines):
+    book = {}
+    for line in lines:
+        name, birthday, phones = line.rstrip("\n").split("|")
+        book[name] = LegacyRecord(LegacyField(name), LegacyField(None if birthday == "None" else birthday),
+                                  [LegacyField(phone) for phone in phones.split(", ")])
+    return book
+
+
+def build_compact(lines, with_index=False):
+    book = AddressBook()
+    while chunk := list(itertools.islice(lines, 100_000)):
+        book.add_records(parse_lines(chunk, trusted=True))
+    if with_index: book.phone_index
+    return book
+
+
+# повертає кількість байт, виділених під книгу, у розрахунку на один запис
+def measure(build, count, **kwargs) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    book = build(generate_lines(count), **kwargs)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del book
+    return (after - before) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AddressBook memory per record")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    legacy = measure(build_legacy, args.records)
+    compact = measure(build_compact, args.records)
+    indexed = measure(build_compact, args.records, with_index=True)
+
+    print(f"records:               {args.records}")
+    print(f"before (dict objects): {legacy:8.1f} bytes/record")
+    print(f"after (slots, arrays): {compact:8.1f} bytes/record  ({legacy / compact:.1f}x less)")
+    print(f"after + phone index:   {indexed:8.1f} bytes/record")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+'''
+Вартість нормалізації одного телефону: попередній setter Phone (re.sub + список кодів операторів)
+проти PhoneNormalizer (прекомпільовані шаблони, таблиця правил, кеш) на холодному та теплому кеші.
+
+    python -m benchmarks.bench_phone --numbers 200000
+'''
+
+import argparse
+import random
+import re
+import time
+
+from PhoneRules import PhoneNormalizer
+
+
+# нормалізація у тому вигляді, в якому вона була у setter-і Phone
+def legacy_normalize(new_value):
+    result = re.sub("\\D", "", new_value)
+    if len(result) == 12 and result.startswith("38"): return f"+{result}"
+    elif len(result) == 10 and result[:3] in ["093", "073", "063", "050", "066", "099", "095", "097", "067",
+                                              "039", "068", "096", "098"]: return f"+38{result}"
+    return "Error phone"
+
+
+# count номерів у різних форматах; distinct - кількість різних номерів (повтори потрапляють у кеш)
+def generate_numbers(count, distinct, seed=10):
+    rnd = random.Random(seed)
+    formats = ["+38050{:07d}", "050 {:07d}", "(067) {:07d}", "+44 7911 {:06d}", "+1 555 {:07d}", "+48 601 {:06d}"]
+    return [rnd.choice(formats).format(rnd.randrange(distinct)) for _ in range(count)]
+
+
+def per_number(func, numbers) -> float:
+    started = time.perf_counter()
+    func(numbers)
+    return (time.perf_counter() - started) / len(numbers) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="phone normalization cost per number")
+    parser.add_argument("--numbers", type=int, default=200_000)
+    parser.add_argument("--distinct", type=int, default=20_000)
+    args = parser.parse_args()
+
+    numbers = generate_numbers(args.numbers, args.distinct)
+    normalizer = PhoneNormalizer()
+
+    print(f"numbers: {len(numbers)}, countries in rules: {len(normalizer.countries)}")
+    print(f"legacy setter logic:        {per_number(lambda values: [legacy_normalize(value) for value in values], numbers):7.0f} ns/number")
+    print(f"normalize_many (cold cache): {per_number(normalizer.normalize_many, numbers):7.0f} ns/number")
+    print(f"normalize_many (warm cache): {per_number(normalizer.normalize_many, numbers):7.0f} ns/number")
+    print(f"normalize_many (no cache):   {per_number(lambda values: normalizer.normalize_many(values, cache=False), numbers):7.0f} ns/number")
+
+
+if __name__ == "__main__":
+    main()
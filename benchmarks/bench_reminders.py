@@ -0,0 +1,82 @@
+'''
+Планувальник нагадувань (Reminders.BirthdayScheduler) на великій книзі проти щоденного
+перебору всіх записів (cron: для кожного запису - дні до дня народження):
+- планування всієї книги (календарний індекс та купа) та розмір купи;
+- вартість change_birthday з планувальником-спостерігачем і без нього;
+- рік нагадувань з підставленим годинником: час доби нагадувань та кількість нагадувань,
+  що має збігтися з кількістю контактів з датою народження.
+
+    python -m benchmarks.bench_reminders --records 1000000
+'''
+
+import argparse
+import datetime
+import random
+import time
+
+from RecordBook import Birthday, next_birthday
+from Reminders import BirthdayScheduler
+from benchmarks import build_book
+
+
+# щоденний перебір книги: контакти, яким сьогодні нагадати
+def daily_scan(book, today) -> int:
+    return sum(1 for record in book.data.values() if record._birthday and next_birthday(record._birthday, today) == today)
+
+
+def change_birthdays(book, names, rnd) -> float:
+    started = time.perf_counter()
+    for name in names:
+        book[name].change_birthday(Birthday(f"{rnd.randrange(1, 29):02d}.{rnd.randrange(1, 13):02d}.1990"))
+    return (time.perf_counter() - started) / len(names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="birthday reminders: heap scheduler vs daily scan")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--changes", type=int, default=10_000)
+    args = parser.parse_args()
+
+    book = build_book(args.records, realistic=True)
+    start = datetime.date(2027, 1, 1)
+
+    started = time.perf_counter()
+    daily_scan(book, start)
+    scan_time = time.perf_counter() - started
+
+    rnd = random.Random(25)
+    names = rnd.sample(list(book.data), min(args.changes, len(book)))
+    book.birthday_index
+    plain = change_birthdays(book, names, rnd)
+
+    now = [datetime.datetime.combine(start, datetime.time(0, 0)).timestamp()]
+    sent = []
+    scheduler = BirthdayScheduler(book, sent.extend, clock=lambda: now[0])
+    started = time.perf_counter()
+    scheduler.start()
+    schedule_time = time.perf_counter() - started
+    observed = change_birthdays(book, names, rnd)
+
+    # рік нагадувань: щодня о 9:00 будимо потік і чекаємо, доки він надішле нагадування дня
+    started = time.perf_counter()
+    for day in range(365):
+        now[0] = datetime.datetime.combine(start + datetime.timedelta(days=day), datetime.time(9, 0, 1)).timestamp()
+        scheduler.wake()
+        while scheduler._heap and scheduler._due(scheduler._heap[0][0]) <= now[0]:
+            time.sleep(0.0005)
+    year_time = time.perf_counter() - started
+    time.sleep(0.01)
+    scheduler.stop()
+    # change_birthday додав дати народження частині контактів без дати
+    with_birthday = sum(1 for record in book.data.values() if record._birthday)
+
+    print(f"records: {len(book)}  with birthday: {with_birthday}")
+    print(f"daily scan of the book:     {scan_time * 1000:9.1f} ms per day")
+    print(f"schedule the whole book:    {schedule_time * 1000:9.1f} ms (heap: {len(scheduler._heap)} entries)")
+    print(f"change_birthday:            {plain * 1e6:9.1f} us without the scheduler, {observed * 1e6:.1f} us with it")
+    print(f"a year of reminders:        {year_time:9.2f} s ({year_time / 365 * 1000:.1f} ms per day), "
+          f"{len(sent)} reminders for {with_birthday} contacts")
+
+
+if __name__ == "__main__":
+    main()
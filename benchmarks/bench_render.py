@@ -0,0 +1,62 @@
+'''
+Повторний друк незмінної книги: рядки записів, які кожного разу формуються заново
+(f-рядок з record.name.value, record.birthday.value та phone.value, як до кешу друку;
+show all - record_line),
+проти AddressBook.render (кеш рядків). Сценарії: всі сторінки show book /10, phone <name>
+та show all у файл; кожен сценарій повторюється --repeat разів, кращий час.
+
+    python -m benchmarks.bench_render --records 100000
+'''
+
+import argparse
+import os
+import random
+
+import HW_11
+from RecordBook import record_line, write_records
+from benchmarks import best_time, build_book
+
+
+# рядок запису без кешу (так формували рядки show book, show all та phone до кешу друку)
+def render_fresh(record) -> str:
+    return f"{record.name.value}|{record.birthday.value}|{', '.join(map(lambda phone: phone.value, record.phones))}"
+
+
+# render - рядок для show book та phone, line - для show all (до кешу - record_line)
+def scenarios(book, names, render, line) -> dict:
+    def pages():
+        for batch in book._record_generator(N=10):
+            "\n".join(map(render, batch))
+
+    def phones():
+        for name in names:
+            render(book[name]).rpartition("|")[2]
+
+    def show_all():
+        with open(os.devnull, "w") as f_out:
+            write_records(book.iter_sorted(), f_out.write, HW_11.STREAM_CHUNK, line=line)
+
+    return {"show book /10 (all pages)": pages, "phone <name>": phones, "show all > file": show_all}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="repeated views: fresh rendering vs render cache")
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=10_000, help="names for the phone scenario")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    book = build_book(args.records, realistic=True)
+    book.render_cache.maxsize = max(book.render_cache.maxsize, len(book))
+    names = random.Random(22).sample(list(book.data), min(args.lookups, len(book)))
+
+    fresh, cached = scenarios(book, names, render_fresh, record_line), scenarios(book, names, book.render, book.render)
+    print(f"records: {len(book)}")
+    for scenario in fresh:
+        before, after = best_time(fresh[scenario], args.repeat)[0], best_time(cached[scenario], args.repeat)[0]
+        print(f"{scenario:28} fresh {before * 1000:9.1f} ms   cached {after * 1000:9.1f} ms   ({before / after:.1f}x)")
+    print(book.render_cache.report())
+
+
+if __name__ == "__main__":
+    main()
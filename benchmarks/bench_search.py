@@ -0,0 +1,61 @@
+'''
+Затримка пошуку (search) на згенерованій книзі: префікс імені, підрядок телефону, нечіткий збіг,
+а також пошук одразу після зміни книги (add_record, add phone, видалення перед кожним пошуком).
+
+    python -m benchmarks.bench_search --records 1000000
+'''
+
+import argparse
+import itertools
+import statistics
+import time
+
+from RecordBook import Phone, Record, Name
+from benchmarks import build_book
+
+QUERIES = {"prefix": ["Ol", "Mari", "Taras12", "Sofia9999"],
+           "phone": ["5011", "0671234", "380931112233"],
+           "fuzzy": ["Olean123", "Mikee4567", "Tars777"]}
+
+
+def timed(func, repeat) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AddressBook.search latency")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    book = build_book(args.records)
+    started = time.perf_counter()
+    book.name_index, book.phone_digits
+    print(f"records: {len(book)}, index build: {time.perf_counter() - started:.2f} s")
+
+    for kind, queries in QUERIES.items():
+        for query in queries:
+            timings = timed(lambda: book.search(query), args.repeat)
+            print(f"{kind:7} {query:14} median {statistics.median(timings):7.2f} ms   max {max(timings):7.2f} ms")
+
+    # зміна книги перед кожним пошуком: новий запис, новий телефон, видалення запису
+    counter = itertools.count()
+    def write_then_search():
+        number = next(counter)
+        book.add_record(Record(Name(f"Added{number}"), None, [Phone(f"+38093{number:07d}")]))
+        book[f"Added{number}"].add_phone([Phone(f"+38094{number:07d}")])
+        if number: del book[f"Added{number - 1}"]
+        found = book.search(f"38094{number:07d}")
+        assert found and found[0][1].name.value == f"Added{number}", "the changed record isn't found"
+
+    timings = timed(write_then_search, args.repeat)
+    print(f"after a write          median {statistics.median(timings):7.2f} ms   max {max(timings):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+'''
+Час старту: load_database (розбір текстового файлу) проти відкриття бінарного знімка через mmap
+та перших запитів до нього (phone <name>, перша сторінка show book).
+
+    python -m benchmarks.bench_snapshot --records 5000000
+'''
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from RecordBook import AddressBook
+from Snapshot import SnapshotAddressBook, write_snapshot
+from concurrent.futures import ProcessPoolExecutor
+from benchmarks.generator import generate_file
+
+
+# поточна резидентна пам'ять процесу (МБ, Linux)
+def current_rss() -> float:
+    with open("/proc/self/statm") as f_read:
+        return int(f_read.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+# відкриття знімка та перші запити (виконується у свіжому процесі, щоб пам'ять не змішувалася із завантаженням)
+def open_snapshot(snap_path, name) -> tuple:
+    rss_before = current_rss()
+    started = time.perf_counter()
+    snapshot = SnapshotAddressBook(snap_path)
+    opened = time.perf_counter() - started
+    phones = [phone.value for phone in snapshot[name].phones]
+    first_page = next(snapshot._record_generator(N=10, start_name="M"))
+    elapsed = time.perf_counter() - started
+    rss_growth = current_rss() - rss_before
+    snapshot.close()
+    return opened, elapsed, phones, len(first_page), rss_growth
+
+
+def main():
+    parser = argparse.ArgumentParser(description="startup time: text load vs mmap snapshot")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path = generate_file(os.path.join(tmp, "book.csv"), args.records)
+        snap_path = os.path.join(tmp, "book.snap")
+
+        book = AddressBook()
+        started = time.perf_counter()
+        book.load_database(book, text_path, trusted=True)
+        print(f"records: {args.records}")
+        print(f"load_database (trusted):   {time.perf_counter() - started:8.3f} s")
+        write_snapshot(book.data.values(), snap_path)
+        print(f"snapshot size:             {os.path.getsize(snap_path) / 2**20:8.1f} MB")
+        del book
+
+        name = f"Ben{args.records // 2 + 2}"
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            opened, elapsed, phones, page, rss_growth = executor.submit(open_snapshot, snap_path, name).result()
+        print(f"snapshot open:             {opened * 1000:8.3f} ms")
+        print(f"open + phone + first page: {elapsed * 1000:8.3f} ms  ({name}: {', '.join(phones)}, page of {page})")
+        print(f"RSS growth:                {rss_growth:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
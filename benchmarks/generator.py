@@ -0,0 +1,74 @@
+'''
+Детермінований генератор адресної книги у форматі файлу бази даних:
+    Name|DD.MM.YYYY|+380XXXXXXXXX, +380XXXXXXXXX
+
+realistic=True - телефони у різних форматах введення (050 111 22 33, (067)..., +44 ..., +48 ...),
+кількість телефонів 1..5, вік за нормальним розподілом, будь-які дні місяця (включно з 29.02);
+malformed - частка невірних рядків: невірний телефон, неіснуюча дата, дата у форматі YYYY-MM-DD,
+рядок без поля.
+'''
+
+import calendar
+import datetime
+import random
+
+FIRST_NAMES = ["Alex", "Anna", "Ben", "Bohdan", "Daria", "Dmytro", "Iryna", "Ivan", "Kate", "Lisa",
+               "Maksym", "Maria", "Mike", "Mykola", "Natalia", "Oksana", "Oleksandr", "Olena",
+               "Petro", "Roman", "Sofia", "Sven", "Taras", "Viktoria", "Yulia"]
+OPERATORS = ["50", "63", "66", "67", "68", "73", "93", "95", "96", "97", "98", "99", "39"]
+
+# формати введення телефонів (realistic=True) та їх ваги
+PHONE_FORMATS = [("+380{op}{n:07d}", 40), ("0{op} {a:03d} {b:02d} {c:02d}", 25), ("(0{op}){n:07d}", 10),
+                 ("380{op}{n:07d}", 10), ("+44 7911 {n6:06d}", 5), ("+48 601 {n6:06d}", 5), ("+1 555 {n:07d}", 5)]
+PHONE_COUNTS = [1, 1, 1, 2, 2, 2, 2, 3, 3, 4, 5]
+MALFORMED = ["phone", "date", "date format", "field"]
+
+
+# дата народження: вік ~ N(40, 15) років, будь-який день року
+def realistic_birthday(rnd, today=datetime.date(2024, 1, 1)) -> str:
+    year = min(max(int(rnd.gauss(today.year - 40, 15)), 1925), today.year - 1)
+    day = rnd.randrange(366 if calendar.isleap(year) else 365)
+    born = datetime.date(year, 1, 1) + datetime.timedelta(days=day)
+    return born.strftime("%d.%m.%Y")
+
+
+def realistic_phone(rnd) -> str:
+    template = rnd.choices([template for template, _ in PHONE_FORMATS], [weight for _, weight in PHONE_FORMATS])[0]
+    n = rnd.randrange(10_000_000)
+    return template.format(op=rnd.choice(OPERATORS), n=n, a=n // 10_000, b=n // 100 % 100, c=n % 100, n6=n % 1_000_000)
+
+
+# невірний рядок для запису name (kind - один з MALFORMED)
+def malformed_line(rnd, name, kind) -> str:
+    if kind == "phone": return f"{name}|None|{rnd.randrange(100_000)}"
+    if kind == "date": return f"{name}|31.02.{rnd.randint(1950, 2005)}|+38050{rnd.randrange(10_000_000):07d}"
+    if kind == "date format": return f"{name}|{rnd.randint(1950, 2005)}-0{rnd.randint(1, 9)}-1{rnd.randint(0, 9)}|+38050{rnd.randrange(10_000_000):07d}"
+    return f"{name}|+38050{rnd.randrange(10_000_000):07d}"
+
+
+# генерує рядки книги з count контактів (однаковий seed - однакова книга)
+def generate_lines(count: int, seed: int = 11, realistic: bool = False, malformed: float = 0.0):
+    rnd = random.Random(seed)
+    for i in range(count):
+        name = f"{FIRST_NAMES[i % len(FIRST_NAMES)]}{i}"
+
+        if malformed and rnd.random() < malformed:
+            yield malformed_line(rnd, name, rnd.choice(MALFORMED)) + "\n"
+            continue
+
+        if realistic:
+            birthday = realistic_birthday(rnd) if rnd.random() < 0.7 else "None"
+            phones = [realistic_phone(rnd) for _ in range(rnd.choice(PHONE_COUNTS))]
+        else:
+            if rnd.random() < 0.7:
+                birthday = f"{rnd.randint(1, 28):02d}.{rnd.randint(1, 12):02d}.{rnd.randint(1940, 2010)}"
+            else: birthday = "None"
+            phones = [f"+380{rnd.choice(OPERATORS)}{rnd.randrange(10_000_000):07d}" for _ in range(rnd.choice((1, 1, 2, 2, 2, 3)))]
+        yield f"{name}|{birthday}|{', '.join(phones)}\n"
+
+
+# записує згенеровану книгу у файл
+def generate_file(path, count: int, seed: int = 11, realistic: bool = False, malformed: float = 0.0):
+    with open(path, "w") as f_out:
+        f_out.writelines(generate_lines(count, seed, realistic, malformed))
+    return path
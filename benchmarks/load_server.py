@@ -0,0 +1,83 @@
+'''
+Генератор навантаження для серверного режиму (python HW_11.py --serve): connections клієнтів
+одночасно надсилають запити протягом duration секунд; друкує QPS та затримки p50/p99.
+
+Книга сервера - згенерована benchmarks.generator (імена Alex0, Anna1, ...):
+    python -c "from benchmarks.generator import generate_file; generate_file('bench.csv', 100000)"
+    python HW_11.py --db bench.csv --serve --port 8765
+    python -m benchmarks.load_server --port 8765 --connections 1000 --records 100000 --writes 0.05 --setup "load trusted" "journal on"
+'''
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.generator import FIRST_NAMES
+
+
+def percentile(values, fraction) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+# один клієнт: запит - відповідь, доки не закінчиться час
+async def client(host, port, records, writes, deadline, latencies, errors, seed):
+    rnd = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+    try:
+        while time.perf_counter() < deadline:
+            i = rnd.randrange(records)
+            name = f"{FIRST_NAMES[i % len(FIRST_NAMES)]}{i}"
+            if rnd.random() < writes:
+                command = f"change birthday {name} {rnd.randint(1, 28):02d}.{rnd.randint(1, 12):02d}.{rnd.randint(1950, 2005)}"
+            else:
+                command = rnd.choice((f"phone {name}", f"birthday {name}", f"search {name[:3]}", f"find phone +38050{i:07d}"))
+            started = time.perf_counter()
+            writer.write((json.dumps({"id": i, "command": command}) + "\n").encode("utf-8"))
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - started)
+            if not response["ok"]: errors.append(response["result"])
+    finally:
+        writer.close()
+
+
+async def run(args):
+    # підготовчі команди (завантаження книги, журнальний режим) - до вимірювання
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    for command in args.setup:
+        writer.write((command + "\n").encode("utf-8"))
+        await writer.drain()
+        print(f"{command}: {json.loads(await reader.readline())['result']}")
+    writer.close()
+
+    latencies, errors = [], []
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*[client(args.host, args.port, args.records, args.writes, deadline, latencies, errors, seed)
+                           for seed in range(args.connections)])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"connections: {args.connections}, requests: {len(latencies)}, errors: {len(errors)}, writes: {args.writes:.0%}")
+    print(f"QPS: {len(latencies) / elapsed:.0f}")
+    print(f"latency p50: {percentile(latencies, 0.50) * 1000:.2f} ms, p99: {percentile(latencies, 0.99) * 1000:.2f} ms")
+    if errors: print(f"first error: {errors[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="load generator for HW_11.py --serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--records", type=int, default=100_000, help="records in the server book (benchmarks.generator)")
+    parser.add_argument("--writes", type=float, default=0.05, help="fraction of write requests")
+    parser.add_argument("--setup", nargs="*", default=["load trusted"], help='commands before the run, e.g. "load trusted" "journal on"')
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+'''
+Набір сценаріїв продуктивності на згенерованих книгах; результати - у JSON для порівняння версій.
+
+    python -m benchmarks.run --records 10000 100000 1000000 --out results.json
+    python -m benchmarks.run --records 100000 --compare results.json --threshold 0.2
+
+Сценарії: load (з перевіркою), load trusted, save, phone <name> (пошук запису), find phone,
+посторінковий друк, days_to_birthday, birthdays N, show all (у файл), розбір та диспетчеризація команд.
+Для кожного сценарію - кращий час з --repeat повторів та кількість операцій за секунду.
+Книга генерується з realistic=True та часткою --malformed невірних рядків.
+'''
+
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+
+import HW_11
+from RecordBook import AddressBook
+from benchmarks import best_time
+from benchmarks.generator import FIRST_NAMES, generate_file
+
+COMMANDS = ["phone Mike12", "add phone Mike12 +380501112233", "show book /10", "change birthday Ann 01.01.1990",
+            "birthdays 7", "search Ol", "find phone +380501113330", "hello", "good bye", "unknown command"]
+
+
+# сценарії для книги з count записів: {назва: (кількість операцій, функція)}
+def scenarios(book, text_path, out_path, count, operations) -> dict:
+    rnd = random.Random(16)
+    names = [f"{FIRST_NAMES[i % len(FIRST_NAMES)]}{i}" for i in rnd.sample(range(count), min(count, operations))]
+    names = [name for name in names if name in book.data]
+    phones = [record.phones[0] for record in map(book.data.get, names) if record._phones]
+    now = datetime.datetime(2024, 6, 1)
+    pages = max(1, min(count // 10, operations // 10))
+
+    def load():
+        fresh = AddressBook()
+        fresh.load_database(fresh, text_path)
+
+    def load_trusted():
+        fresh = AddressBook()
+        fresh.load_database(fresh, out_path, trusted=True)
+
+    def dispatch():
+        for line in itertools.islice(itertools.cycle(COMMANDS), operations):
+            cmd, _ = HW_11.parcer_commands(line)
+            if cmd: HW_11.get_handler(cmd)
+
+    return {"load": (count, load),
+            "save": (count, lambda: book.save_database(book, out_path)),
+            "load trusted": (count, load_trusted),
+            "phone <name>": (len(names), lambda: [HW_11.func_phone(name) for name in names]),
+            "find phone": (len(phones), lambda: [book.find_phone(phone) for phone in phones]),
+            "show book /10": (pages, lambda: list(itertools.islice(book._record_generator(N=10), pages))),
+            "show book /10 from": (pages, lambda: list(itertools.islice(book._record_generator(N=10, start_name="M"), pages))),
+            "days_to_birthday": (len(names), lambda: [book.data[name].days_to_birthday(now) for name in names]),
+            "birthdays 30": (10, lambda: [book.upcoming_birthdays(30, now.date()) for _ in range(10)]),
+            "show all > file": (count, lambda: HW_11.func_all_phone(f"> {os.devnull}")),
+            "command dispatch": (operations, dispatch)}
+
+
+def run(args) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.records:
+            text_path = generate_file(os.path.join(tmp, f"book_{count}.csv"), count, realistic=True, malformed=args.malformed)
+            out_path = os.path.join(tmp, f"saved_{count}.csv")
+            book = AddressBook()
+            book.load_database(book, text_path)
+            book.save_database(book, out_path)
+            HW_11.book = book
+
+            for scenario, (operations, func) in scenarios(book, text_path, out_path, count, args.operations).items():
+                if args.only and scenario not in args.only: continue
+                seconds, _ = best_time(func, args.repeat)
+                key = f"{scenario} @ {count}"
+                results[key] = {"scenario": scenario, "records": count, "operations": operations,
+                                "seconds": round(seconds, 6), "ops_per_s": round(operations / seconds if seconds else 0, 1)}
+                print(f"{key:34} {seconds * 1000:10.2f} ms  {results[key]['ops_per_s']:12.0f} ops/s")
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+# порівняння з попередніми результатами: сценарії, що сповільнилися більше ніж на threshold
+def compare(results, baseline_path, threshold) -> list[str]:
+    with open(baseline_path, "r") as f_read:
+        baseline = json.load(f_read)["results"]
+    regressions = []
+    for key, result in results.items():
+        old = baseline.get(key)
+        if not old or not old["ops_per_s"]: continue
+        change = result["ops_per_s"] / old["ops_per_s"] - 1
+        print(f"{key:34} {old['ops_per_s']:12.0f} -> {result['ops_per_s']:12.0f} ops/s  ({change:+.0%})")
+        if change < -threshold: regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AddressBook benchmark suite")
+    parser.add_argument("--records", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--operations", type=int, default=10_000, help="operations in lookup/dispatch scenarios")
+    parser.add_argument("--malformed", type=float, default=0.01, help="fraction of malformed lines in the book")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="*", help="run only these scenarios")
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", metavar="JSON", help="compare with previous results")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown reported as a regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    HW_11.print = lambda *values, **kwargs: None      # сценарії не друкують результати команд
+    results = run(args)
+
+    report = {"meta": {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+                       "date": datetime.datetime.now().isoformat(timespec="seconds"), "malformed": args.malformed,
+                       "repeat": args.repeat},
+              "results": results}
+    if args.out:
+        with open(args.out, "w") as f_out:
+            json.dump(report, f_out, indent=2, ensure_ascii=False)
+        print(f"results are written to {args.out}")
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        print(f"regressions: {', '.join(regressions)}" if regressions else "no regressions")
+        if regressions: raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+'''
+Стрес-перевірка ConcurrentAddressBook: потоки-читачі та потоки-записувачі працюють з однією книгою.
+
+Записувачі змінюють лише телефон (edit_phone на новий унікальний номер) та дату народження,
+тому в кожному записі завжди рівно 2 телефони, а телефони не повторюються. Читачі перевіряють
+це для кожного прочитаного запису та сторінки (і що рядок друку з кешу збігається із записом); наприкінці індекси книги порівнюються
+з індексами, побудованими заново. Друкує пропускну здатність читання для різної кількості читачів.
+
+    python -m benchmarks.stress_concurrency --records 100000 --readers 1 2 4 8 --writers 2
+'''
+
+import argparse
+import itertools
+import random
+import threading
+import time
+from array import array
+
+from ConcurrentBook import ConcurrentAddressBook
+from RecordBook import AddressBook, Birthday, Phone, Record, record_line
+
+
+# книга Name0..Name{records - 1}, у кожного запису рівно 2 унікальні телефони - це перевіряють читачі,
+# тому книга не генерується benchmarks.build_book
+def two_phone_book(records) -> ConcurrentAddressBook:
+    book = ConcurrentAddressBook()
+    book.add_records([Record.packed(f"Name{i}", 0, array("Q", [380500000000 + 2 * i, 380500000001 + 2 * i])) for i in range(records)])
+    return book
+
+
+def writer(book, records, stop, seed, counter, errors):
+    rnd = random.Random(seed)
+    phones = itertools.count(380600000000 + seed * 10_000_000)
+    while not stop.is_set():
+        name = f"Name{rnd.randrange(records)}"
+        record = book[name]
+        if rnd.random() < 0.7:
+            old = record.phones[rnd.randrange(2)]
+            record.edit_phone(old, Phone.trusted(f"+{next(phones)}"))
+        else:
+            record.change_birthday(Birthday(f"{rnd.randint(1, 28):02d}.{rnd.randint(1, 12):02d}.{rnd.randint(1950, 2005)}"))
+        counter[seed] += 1
+
+
+def reader(book, records, stop, seed, counter, errors):
+    rnd = random.Random(seed)
+    while not stop.is_set():
+        kind = rnd.random()
+        if kind < 0.6:
+            record = book[f"Name{rnd.randrange(records)}"]
+            if len(record.phones) != 2: errors.append(f"{record.name.value} has {len(record.phones)} phones")
+        elif kind < 0.9:
+            phone = Phone.trusted(f"+{380500000000 + rnd.randrange(2 * records)}")
+            for owner in book.find_phone(phone):
+                if phone.value not in [p.value for p in owner.phones]: errors.append(f"{owner.name.value} doesn't own {phone.value}")
+        else:
+            page = book.page(rnd.randrange(max(1, records // 100)), 100)
+            if any(len(record._phones) != 2 for record in page): errors.append("page with a broken record")
+            if any(book.render(record) != record_line(record) for record in page): errors.append("stale rendered row")
+        counter[seed] += 1
+
+
+# індекси книги збігаються з індексами, побудованими заново з її записів
+def check_invariants(book, errors):
+    fresh = AddressBook()
+    fresh.add_records([record.copy() for record in book.snapshot()])
+    if book.phone_index != fresh.phone_index: errors.append("phone index differs from the records")
+    if book.birthday_index != fresh.birthday_index: errors.append("birthday index differs from the records")
+    if list(book.name_index) != list(fresh.name_index): errors.append("name index differs from the records")
+    phones = [packed for record in book.snapshot() for packed in record._phones]
+    if len(phones) != len(set(phones)) or len(phones) != 2 * len(book): errors.append("phones are lost or duplicated")
+
+
+def run(book, records, readers, writers, duration) -> tuple:
+    stop, errors = threading.Event(), []
+    read_counts, write_counts = [0] * readers, [0] * (writers + 1)
+    threads = [threading.Thread(target=reader, args=(book, records, stop, i, read_counts, errors)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(book, records, stop, i + 1, write_counts, errors)) for i in range(writers)]
+    for thread in threads: thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads: thread.join()
+    return sum(read_counts) / duration, sum(write_counts) / duration, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ConcurrentAddressBook stress test")
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+
+    book = two_phone_book(args.records)
+    book.phone_index, book.birthday_index, book.name_index   # індекси будуються до вимірювання
+    failed = False
+    for readers in args.readers:
+        reads, writes, errors = run(book, args.records, readers, args.writers, args.duration)
+        check_invariants(book, errors)
+        print(f"readers: {readers:<3} writers: {args.writers:<3} reads/s: {reads:9.0f}  writes/s: {writes:7.0f}  errors: {len(errors)}")
+        for error in errors[:5]: print(f"    {error}")
+        failed = failed or bool(errors)
+    print("FAILED" if failed else "OK - invariants hold")
+
+
+if __name__ == "__main__":
+    main()